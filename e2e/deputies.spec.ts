@@ -37,6 +37,17 @@ test.describe('Deputies Page', () => {
     await expect(searchInput).toHaveValue('Test');
   });
 
+  test('search ignores stopwords such as "da"', async ({ page }) => {
+    const firstDeputy = page.locator('a[href^="/deputado/"]').first();
+    await expect(firstDeputy).toBeVisible({ timeout: 10000 });
+    const href = await firstDeputy.getAttribute('href');
+    const firstName = (await firstDeputy.innerText()).trim().split(/\s+/)[0];
+
+    // "da" is not in the search index; the query must still match on the other token
+    await page.getByPlaceholder(/Buscar por nome/i).fill(`${firstName} da`);
+    await expect(page.locator(`a[href="${href}"]`).first()).toBeVisible();
+  });
+
   test('displays table headers', async ({ page }) => {
     // Should show sortable table headers
     await expect(page.getByText('Deputado').first()).toBeVisible();
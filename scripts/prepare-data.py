@@ -3,25 +3,47 @@
 CEAP Dashboard Data Preparation Script
 
 Reads the processed CSV files and generates optimized JSON files
-for the dashboard frontend.
+for the dashboard frontend. Expenses can be a single combined CSV or
+year partitions (despesas_<year>.csv, or a despesas/ directory).
 
 Usage:
     python scripts/prepare-data.py
+    python scripts/prepare-data.py --rescore [--rules my-rules.json]
+    python scripts/prepare-data.py --diff previous latest
+    python scripts/prepare-data.py --preview [0.1]   # stratified sample, written to public/data-preview/
 
 Output files (in public/data/):
     - aggregations.json: Summary metrics, monthly/category breakdowns
     - deputies.json: Per-deputy data with risk scores
     - fraud-flags.json: Red flag details
     - mismatches.json: CNPJ activity mismatches
+    - suppliers/: Per-CNPJ supplier profiles (index.json + <prefix>.json shards)
+    - search-index.json: Prefix search index over deputies, suppliers and CNPJs
+    - distributions.json: Histograms, percentile ranks and quantile sketches
+    - outliers.json: Atypical transactions by category, deputy and value
+    - party-network.json / region-network.json: Shared suppliers between parties, UFs and regions
+    - data-quality.json: Column profile, invalid CNPJ/CPF, duplicates, monthly completeness
+    - spotlights/: Case studies rebuilt from the specs in scripts/spotlights/
+    - changes.json: Per-deputy changes since the previous run (snapshot history)
     - manifest.json: Data provenance and reproducibility metadata
 """
 
+import argparse
+import gzip
 import json
 import hashlib
 import os
+import re
 import sys
+import time
+import tracemalloc
+import unicodedata
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from pathlib import Path
+from statistics import NormalDist
 
 import pandas as pd
 import numpy as np
@@ -60,18 +82,260 @@ OUTPUT_DIR = SCRIPT_DIR.parent / "public" / "data"
 # Ensure output directory exists
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Content-addressed history of past runs (objects/<sha256>.json.gz + runs/<run_id>.json)
+SNAPSHOT_DIR = PROJECT_ROOT / "data" / "snapshots"
+SNAPSHOT_FILES = ("aggregations.json", "deputies.json", "fraud-flags.json", "mismatches.json", "manifest.json")
+
+# Declarative spotlight specs (scripts/spotlights/<id>.json) rebuilt into public/data/spotlights/
+SPOTLIGHT_SPEC_DIR = SCRIPT_DIR / "spotlights"
+
+# Risk thresholds JSON imported by the frontend (src/constants/thresholds.ts, src/utils/thresholds.ts)
+FRONTEND_THRESHOLDS_PATH = SCRIPT_DIR.parent / "src" / "constants" / "risk-thresholds.json"
+
+# Declarative risk rules. The scoring engine (apply_risk_rules), the manifest's
+# methodology block and the frontend thresholds JSON are all derived from this dict.
+#
+# Score = base weight from the HHI band + penalty of every signal whose field is
+# strictly above its threshold, rounded to 2 decimals and capped at max_score.
+# Signals with penalty 0 only raise a red flag. Flags are emitted in list order and
+# formatted with the deputy's signal values. A string threshold names another rule
+# value ("hhi_thresholds.moderate") and follows it when that value is overridden.
+RISK_RULES = {
+    "benford_threshold": {
+        "chi2_critical_001": 20.09,
+        "chi2_critical_005": 15.51,
+        "degrees_of_freedom": 8,
+        "min_transactions": 50,
+    },
+    "hhi_thresholds": {
+        "low": 1500,
+        "moderate": 2500,
+        "high": 3000,
+        "very_high": 5000,
+    },
+    "base_weights": {
+        "hhi_critical": 0.9,
+        "hhi_high": 0.7,
+        "hhi_moderate": 0.4,
+        "hhi_low": 0.2,
+    },
+    "signals": [
+        {"id": "hhi_above_moderate", "field": "hhi", "above": "hhi_thresholds.moderate", "penalty": 0.0,
+         "flag": "Concentracao alta de fornecedores (HHI={hhi:.0f})"},
+        {"id": "top_supplier_above_50pct", "field": "topSupplierPct", "above": 50, "penalty": 0.10,
+         "flag": "Top fornecedor representa {topSupplierPct:.1f}% dos gastos"},
+        {"id": "round_values_above_20pct", "field": "roundValuePct", "above": 20, "penalty": 0.10,
+         "flag": "{roundValuePct:.1f}% valores redondos (suspeito)"},
+        {"id": "benford_significant", "field": "benfordSignificant", "above": 0, "penalty": 0.15,
+         "flag": "Desvio significativo da Lei de Benford (chi2={benfordChi2:.1f})"},
+        {"id": "zscore_party_above_2std", "field": "zScoreParty", "above": 2.0, "penalty": 0.08,
+         "flag": "Gasto {zScoreParty:.1f}σ acima da media do partido"},
+        {"id": "zscore_state_above_2std", "field": "zScoreState", "above": 2.0, "penalty": 0.08,
+         "flag": "Gasto {zScoreState:.1f}σ acima da media do estado"},
+        {"id": "atypical_transactions_above_5pct", "field": "outlierPct", "above": 5, "penalty": 0.0,
+         "flag": "{outlierCount:.0f} transacoes atipicas para a categoria/mes ({outlierPct:.1f}%)"},
+    ],
+    "max_score": 1.0,
+    "risk_level_thresholds": {
+        "critico": 0.75,
+        "alto": 0.55,
+        "medio": 0.35,
+        "baixo": 0.0,
+    },
+}
+
+# Bootstrap confidence intervals for deputy signals (fixed seed for reproducibility)
+BOOTSTRAP = {
+    "replicates": 200,
+    "seed": 42,
+    "level": 0.95,
+    "batch_elements": 4_000_000,  # resampled rows held in memory per replicate batch
+}
+
+# Transaction outliers: modified z-score 0.6745 * (x - median) / MAD within category x month
+OUTLIER_RULES = {
+    "z_threshold": 3.5,     # Iglewicz & Hoaglin cut-off
+    "min_group_size": 10,   # smaller category-months are not scored
+    "top_transactions": 500,
+}
+
+# --preview: every stage runs on a stratified sample (deputy x month) and writes to
+# <OUTPUT_DIR>-preview/. Money totals are scaled by the stratum weights N_h / n_h.
+PREVIEW = {
+    "fraction": 0.1,
+    "seed": 42,
+    "min_per_stratum": 2,   # rows kept from every stratum (whole stratum if smaller), so variances exist
+    "level": 0.95,          # normal-approximation intervals on the estimated totals
+    "dir_suffix": "-preview",
+}
+
+
+# Expense inputs, in order of preference:
+#   1. data/processed/despesas/ directory (any *.csv inside, e.g. despesas/ano=2024/part-0.csv)
+#   2. year-partitioned files data/processed/despesas_<year>.csv
+#   3. the legacy combined file
+EXPENSES_PARTITION_DIR = "despesas"
+EXPENSES_PARTITION_GLOB = "despesas_[0-9][0-9][0-9][0-9].csv"
+EXPENSES_COMBINED_FILE = "despesas_combined_2023_2025.csv"
+
+# Columns read as text in every partition so they concatenate with one schema
+# (a partition whose CNPJs happen to be all digits would otherwise parse as int and lose zeros)
+EXPENSE_TEXT_COLUMNS = {
+    "txNomeParlamentar": str,
+    "cpf": str,
+    "sgUF": str,
+    "sgPartido": str,
+    "txtDescricao": str,
+    "txtFornecedor": str,
+    "txtCNPJCPF": str,
+}
+
+LOAD_WORKERS = 8
+
+# Per-stage instrumentation: one {"stage", "wallMs", "peakMB"} record per timed_stage() block.
+# peakMB is only measured while tracemalloc is tracing (--profile), as tracing slows the run.
+STAGE_METRICS = []
+
+
+@contextmanager
+def timed_stage(name):
+    """Record wall time (and peak traced memory when profiling) of a top-level pipeline stage."""
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_METRICS.append({
+            "stage": name,
+            "wallMs": round((time.perf_counter() - start) * 1000, 1),
+            "peakMB": round(tracemalloc.get_traced_memory()[1] / 1e6, 1) if tracing else None,
+        })
+
+
+def print_stage_metrics():
+    print("\nStage timings:")
+    for record in STAGE_METRICS:
+        peak = f"  peak {record['peakMB']:>8.1f} MB" if record["peakMB"] is not None else ""
+        print(f"  {record['stage']:<16} {record['wallMs']:>9.1f} ms{peak}")
+
+# CNAE reference table (cnpj, razao_social, cnae_principal[, cnae_descricao, uf]), e.g. extracted
+# from the Receita Federal open CNPJ dump. Without it mismatch_analysis.csv is passed through.
+CNAE_REFERENCE_FILE = "cnae_reference.csv"
+
+# Expense category -> CNAE prefixes (classes/groups) of activities compatible with it.
+# Categories not listed here are not checked.
+CATEGORY_CNAE_PREFIXES = {
+    "COMBUSTÍVEIS E LUBRIFICANTES.": ("4731", "4732", "4681", "4530", "4520"),
+    "TELEFONIA": ("61", "4752", "4742", "9512"),
+    "SERVIÇOS POSTAIS": ("53", "1813", "8219"),
+    "PASSAGEM AÉREA - SIGEPA": ("511", "7911", "7912", "7990"),
+    "PASSAGEM AÉREA - RPA": ("511", "7911", "7912", "7990"),
+    "PASSAGEM AÉREA - REEMBOLSO": ("511", "7911", "7912", "7990"),
+    "PASSAGENS TERRESTRES, MARÍTIMAS OU FLUVIAIS": ("4922", "4929", "501", "509", "5229", "7911", "7912"),
+    "LOCAÇÃO OU FRETAMENTO DE VEÍCULOS AUTOMOTORES": ("7711", "4923", "4924", "4929", "4511", "4930"),
+    "LOCAÇÃO OU FRETAMENTO DE AERONAVES": ("511", "7719", "3316", "5240"),
+    "LOCAÇÃO OU FRETAMENTO DE EMBARCAÇÕES": ("501", "502", "509", "7719", "5030"),
+    "SERVIÇO DE TÁXI, PEDÁGIO E ESTACIONAMENTO": ("4923", "5221", "5222", "5223", "5229"),
+    "HOSPEDAGEM ,EXCETO DO PARLAMENTAR NO DISTRITO FEDERAL.": ("551", "559", "7911", "7912"),
+    "FORNECIMENTO DE ALIMENTAÇÃO DO PARLAMENTAR": ("561", "562", "4711", "4712", "4721", "4722", "4723", "4729", "1091"),
+    "SERVIÇO DE SEGURANÇA PRESTADO POR EMPRESA ESPECIALIZADA.": ("801", "802", "803", "8121"),
+    "DIVULGAÇÃO DA ATIVIDADE PARLAMENTAR.": ("73", "18", "58", "59", "60", "63", "7420", "8230", "8219", "1721", "4761"),
+    "CONSULTORIAS, PESQUISAS E TRABALHOS TÉCNICOS.": ("62", "63", "69", "70", "71", "72", "73", "74", "78", "82", "85", "94"),
+    "PARTICIPAÇÃO EM CURSO, PALESTRA OU EVENTO SIMILAR": ("85", "8230", "94", "7319", "5590"),
+    "ASSINATURA DE PUBLICAÇÕES": ("581", "6391", "6319", "4761", "4618"),
+    "AQUISIÇÃO DE TOKENS E CERTIFICADOS DIGITAIS": ("62", "631", "8299", "4751", "4651"),
+}
+
+
+def discover_expense_files():
+    """Return the expense CSVs to load, as a list of Paths."""
+    partition_dir = DATA_DIR / EXPENSES_PARTITION_DIR
+    if partition_dir.is_dir():
+        files = sorted(partition_dir.rglob("*.csv"))
+        if files:
+            return files
+
+    files = sorted(DATA_DIR.glob(EXPENSES_PARTITION_GLOB))
+    if files:
+        return files
+
+    combined = DATA_DIR / EXPENSES_COMBINED_FILE
+    return [combined] if combined.exists() else []
+
+
+def _file_metadata(path):
+    """SHA256, size and mtime of an input file."""
+    sha256_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha256_hash.update(chunk)
+    stat = path.stat()
+    return {
+        "file": str(path.relative_to(DATA_DIR)),
+        "sha256": sha256_hash.hexdigest(),
+        "size_bytes": stat.st_size,
+        "last_modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+    }
+
+
+def _load_expense_partition(path):
+    """Parse one expense CSV and fingerprint it (runs in a worker thread)."""
+    df = pd.read_csv(path, low_memory=False, dtype=EXPENSE_TEXT_COLUMNS)
+    meta = _file_metadata(path)
+    meta["record_count"] = len(df)
+    if "numAno" in df.columns and not df.empty:
+        meta["years"] = sorted(int(y) for y in df["numAno"].dropna().unique())
+    return df, meta
+
 
 def load_data():
-    """Load all required CSV files."""
+    """
+    Load all required CSV files.
+
+    Expense partitions are parsed concurrently in a thread pool, and the ancillary
+    HHI/fraud/mismatch/enrichment files are loaded in the same pool so they overlap
+    with the (much larger) expense parse.
+    """
     print("Loading data files...")
 
     data = {}
+    expense_files = discover_expense_files()
+    ancillary = {
+        "hhi": ("hhi_analysis.csv", "HHI records", ""),
+        "fraud": ("fraud_analysis_full_matrix.csv", "fraud analysis records", ""),
+        "mismatches": ("mismatch_analysis.csv", "mismatch records", ""),
+        "cnae": (CNAE_REFERENCE_FILE, "CNAE reference records", " (mismatches fall back to mismatch_analysis.csv)"),
+        "enrichment": ("deputy_enrichment.csv", "deputy enrichment records", " (run process_enrichment.py)"),
+    }
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS, thread_name_prefix="loader") as pool:
+        expense_futures = [pool.submit(_load_expense_partition, path) for path in expense_files]
+        ancillary_futures = {
+            key: pool.submit(pd.read_csv, DATA_DIR / filename)
+            for key, (filename, _, _) in ancillary.items()
+            if (DATA_DIR / filename).exists()
+        }
+        partitions = [future.result() for future in expense_futures]
+        for key, (filename, label, hint) in ancillary.items():
+            if key in ancillary_futures:
+                data[key] = ancillary_futures[key].result()
+                print(f"  - Loaded {len(data[key]):,} {label}")
+            else:
+                print(f"  ! Warning: {DATA_DIR / filename} not found{hint}")
+                data[key] = pd.DataFrame()
 
     # Main expenses data
-    expenses_path = DATA_DIR / "despesas_combined_2023_2025.csv"
-    if expenses_path.exists():
-        data["expenses"] = pd.read_csv(expenses_path, low_memory=False)
-        print(f"  - Loaded {len(data['expenses']):,} expense records")
+    data["sources"] = [meta for _, meta in partitions]
+    if partitions:
+        frames = [df for df, _ in partitions]
+        data["expenses"] = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        print(f"  - Loaded {len(data['expenses']):,} expense records from {len(partitions)} file(s) "
+              f"in {time.perf_counter() - start:.2f}s")
+        for meta in data["sources"]:
+            print(f"      {meta['file']}: {meta['record_count']:,} records")
 
         # Filter out party leadership rows (entries without CPF are not individual deputies)
         if "cpf" in data["expenses"].columns:
@@ -84,50 +348,262 @@ def load_data():
             filtered_count = before_count - len(data["expenses"])
             print(f"  - Filtered out {filtered_count:,} party leadership records (no CPF)")
             print(f"  - Remaining: {len(data['expenses']):,} deputy expense records")
-    else:
-        print(f"  ! Warning: {expenses_path} not found")
-        data["expenses"] = pd.DataFrame()
 
-    # HHI analysis
-    hhi_path = DATA_DIR / "hhi_analysis.csv"
-    if hhi_path.exists():
-        data["hhi"] = pd.read_csv(hhi_path)
-        print(f"  - Loaded {len(data['hhi']):,} HHI records")
-    else:
-        print(f"  ! Warning: {hhi_path} not found")
-        data["hhi"] = pd.DataFrame()
-
-    # Fraud analysis
-    fraud_path = DATA_DIR / "fraud_analysis_full_matrix.csv"
-    if fraud_path.exists():
-        data["fraud"] = pd.read_csv(fraud_path)
-        print(f"  - Loaded {len(data['fraud']):,} fraud analysis records")
-    else:
-        print(f"  ! Warning: {fraud_path} not found")
-        data["fraud"] = pd.DataFrame()
-
-    # CNPJ mismatches
-    mismatch_path = DATA_DIR / "mismatch_analysis.csv"
-    if mismatch_path.exists():
-        data["mismatches"] = pd.read_csv(mismatch_path)
-        print(f"  - Loaded {len(data['mismatches']):,} mismatch records")
+        # Money as int64 centavos, converted once here; sums and shares run on these integers
+        value_col = "vlrLiquido" if "vlrLiquido" in data["expenses"].columns else "vlrDocumento"
+        if value_col in data["expenses"].columns:
+            data["expenses"] = data["expenses"].assign(valueCents=to_centavos(data["expenses"][value_col]))
     else:
-        print(f"  ! Warning: {mismatch_path} not found")
-        data["mismatches"] = pd.DataFrame()
-
-    # Deputy enrichment data (attendance, education, profession)
-    enrichment_path = DATA_DIR / "deputy_enrichment.csv"
-    if enrichment_path.exists():
-        data["enrichment"] = pd.read_csv(enrichment_path)
-        print(f"  - Loaded {len(data['enrichment']):,} deputy enrichment records")
-    else:
-        print(f"  ! Warning: {enrichment_path} not found (run process_enrichment.py)")
-        data["enrichment"] = pd.DataFrame()
+        print(f"  ! Warning: no expense files found in {DATA_DIR} "
+              f"({EXPENSES_PARTITION_DIR}/, {EXPENSES_PARTITION_GLOB} or {EXPENSES_COMBINED_FILE})")
+        data["expenses"] = pd.DataFrame()
 
     return data
 
 
-def validate_expenses(df: pd.DataFrame) -> tuple:
+# Money: expense values are held as int64 centavos from load time. Sums, group totals and
+# shares run on the integers, so they are exact whatever the order or partitioning of the
+# work, and are converted to reais (to_reais) only when a record is serialized.
+def to_centavos(values):
+    """int64 centavos from a column of reais (missing -> 0), rounded half away from zero."""
+    reais = pd.to_numeric(pd.Series(values), errors="coerce").fillna(0).to_numpy(dtype=float)
+    return (np.sign(reais) * np.floor(np.abs(reais) * 100 + 0.5)).astype(np.int64)
+
+
+def to_reais(centavos):
+    """Reais from integer centavos (a float, or a float array for arrays)."""
+    if np.ndim(centavos):
+        return np.asarray(centavos, dtype=np.int64) / 100
+    return int(centavos) / 100
+
+
+def value_cents(expenses_df):
+    """The valueCents column of a frame, converting the value column if load_data did not."""
+    if "valueCents" in expenses_df.columns:
+        return expenses_df["valueCents"].to_numpy()
+    value_col = "vlrLiquido" if "vlrLiquido" in expenses_df.columns else "vlrDocumento"
+    if value_col not in expenses_df.columns:
+        return np.zeros(len(expenses_df), dtype=np.int64)
+    return to_centavos(expenses_df[value_col])
+
+
+def year_month(expenses_df):
+    """YYYYMM of every row as floats, NaN where numAno or numMes is missing or not a number."""
+    year = pd.to_numeric(expenses_df["numAno"], errors="coerce")
+    month = pd.to_numeric(expenses_df["numMes"], errors="coerce")
+    return (year * 100 + month).to_numpy(dtype=float)
+
+
+def transaction_weights(expenses_df):
+    """Transactions each row stands for: the stratum weight of a --preview sample, otherwise 1."""
+    if "sampleWeight" in expenses_df.columns:
+        return expenses_df["sampleWeight"].to_numpy()
+    return np.ones(len(expenses_df), dtype=np.int64)
+
+
+def weighted_count(weights):
+    """Transaction count from summed row weights (exact integers outside --preview)."""
+    return int(np.rint(weights))
+
+
+# Data-quality profile (data-quality.json)
+PROFILE_DISTINCT_PRECISION = 12  # HyperLogLog registers = 2**precision (~1.6% standard error)
+PROFILE_DATE_COLUMNS = ("datEmissao",)
+PROFILE_INVALID_EXAMPLES = 10
+# Added by the pipeline (sampleWeight/sampleStratum only by --preview), not profiled
+DERIVED_COLUMNS = ("valueCents", "supplierKey", "supplierEntity", "sampleWeight", "sampleStratum")
+CNPJ_WEIGHTS = (np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]), np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]))
+CPF_WEIGHTS = (np.arange(10, 1, -1), np.arange(11, 1, -1))
+
+
+def distinct_estimate(values, precision=PROFILE_DISTINCT_PRECISION):
+    """HyperLogLog estimate of the number of distinct non-null values, in one hashing pass."""
+    values = values.dropna()
+    if values.empty:
+        return 0
+    m = 1 << precision
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+    registers = np.zeros(m, dtype=np.uint8)
+    rest = hashes << np.uint64(precision)
+    # Rank = leading zeros of the remaining bits + 1 (frexp's exponent is the bit length)
+    bit_length = np.frexp(rest.astype(float))[1]
+    rank = np.where(rest == 0, 64 - precision + 1, 64 - bit_length + 1).astype(np.uint8)
+    np.maximum.at(registers, (hashes >> np.uint64(64 - precision)).astype(np.intp), rank)
+
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.power(2.0, -registers.astype(float)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros > 0:
+        estimate = m * np.log(m / zeros)  # Linear counting for small cardinalities
+    return int(round(estimate))
+
+
+def _check_digits_valid(digits, weights):
+    """Row mask: the last two columns of a digit matrix match the modulo-11 check digits."""
+    valid = np.ones(len(digits), dtype=bool)
+    for position, w in enumerate(weights):
+        n = len(w)
+        remainder = (digits[:, :n] * w).sum(axis=1) % 11
+        expected = np.where(remainder < 2, 0, 11 - remainder)
+        valid &= digits[:, n] == expected
+    # Repeated-digit numbers (000..., 111...) pass the arithmetic but are never issued
+    return valid & (digits != digits[:, :1]).any(axis=1)
+
+
+def document_validity(documents):
+    """
+    Classify normalized CNPJ/CPF strings (digits only) by length and check digits.
+
+    Returns:
+        Series of "cnpj", "cpf", "invalidCnpj", "invalidCpf", "invalidLength" or "empty"
+    """
+    documents = documents.fillna("").astype(str)
+    lengths = documents.str.len().to_numpy()
+    kinds = np.full(len(documents), "invalidLength", dtype=object)
+    kinds[lengths == 0] = "empty"
+    for length, weights, valid_kind in ((14, CNPJ_WEIGHTS, "cnpj"), (11, CPF_WEIGHTS, "cpf")):
+        rows = np.flatnonzero(lengths == length)
+        if len(rows) == 0:
+            continue
+        buffer = "".join(documents.to_numpy()[rows]).encode("ascii")
+        digits = (np.frombuffer(buffer, dtype=np.uint8).reshape(-1, length) - ord("0")).astype(np.int64)
+        valid = _check_digits_valid(digits, weights)
+        kinds[rows] = np.where(valid, valid_kind, "invalid" + valid_kind.capitalize())
+    return pd.Series(kinds, index=documents.index)
+
+
+def _document_summary(codes, uniques):
+    """Counts per document class plus the most frequent invalid raw values (from a factorized column)."""
+    # Numbers read back from float columns carry a '.0' suffix that is not part of the document
+    raw = pd.Series(uniques, dtype=object).astype(str)
+    unique_kinds = document_validity(normalize_document(raw.str.replace(r"\.0$", "", regex=True))).to_numpy()
+    kinds = np.where(codes >= 0, unique_kinds[np.maximum(codes, 0)], "empty")
+    counts = pd.Series(kinds).value_counts()
+    invalid = np.isin(unique_kinds, ["invalidCnpj", "invalidCpf", "invalidLength"])
+    frequency = np.bincount(codes[codes >= 0], minlength=len(raw))
+    order = [i for i in np.argsort(-frequency, kind="stable") if invalid[i]][:PROFILE_INVALID_EXAMPLES]
+    return {
+        "checked": int(len(kinds) - counts.get("empty", 0)),
+        **{kind: int(counts.get(kind, 0)) for kind in ("cnpj", "cpf", "invalidCnpj", "invalidCpf", "invalidLength", "empty")},
+        "invalidExamples": [{"value": raw.iloc[i], "count": int(frequency[i])} for i in order],
+    }
+
+
+def profile_expenses(df):
+    """
+    Column profile of the expenses frame for data-quality.json, one pass per column.
+
+    Numeric columns are read once for nulls, min/max and a HyperLogLog distinct estimate.
+    Text columns are factorized once; stripping, date parsing, lengths and CNPJ/CPF check
+    digits then run on the distinct values only and are mapped back through the codes
+    (their distinct count is exact). The filled masks are grouped by month in a single
+    groupby for the completeness matrix. validate_expenses reads its counts from this
+    profile instead of rescanning the frame.
+    """
+    print("\nProfiling expense data...")
+    columns = [c for c in df.columns if c not in DERIVED_COLUMNS]
+    profile = {
+        "meta": {"rows": len(df), "columns": len(columns), "distinctPrecision": PROFILE_DISTINCT_PRECISION},
+        "columns": {},
+        "documents": {},
+        "duplicates": {},
+        "checks": {},
+        "completeness": {"columns": [], "months": [], "transactions": [], "filledPct": []},
+    }
+    if df.empty:
+        return profile
+
+    deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in df.columns else "nomeParlamentar"
+    value_col = "vlrLiquido" if "vlrLiquido" in df.columns else "vlrDocumento"
+    cnpj_col = "txtCNPJCPF" if "txtCNPJCPF" in df.columns else None
+
+    filled, factorized = {}, {}
+    for col in columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series):
+            nulls = series.isna().to_numpy()
+            present = series[~nulls]
+            stats = {"dtype": str(series.dtype), "nulls": int(nulls.sum()), "empty": 0}
+            stats["min"] = float(present.min()) if len(present) else None
+            stats["max"] = float(present.max()) if len(present) else None
+            stats["negative"] = int((present < 0).sum())
+            stats["zero"] = int((present == 0).sum())
+            stats["distinct"] = distinct_estimate(present)
+            filled[col] = ~nulls
+        else:
+            # Text: one factorize pass, then every string operation runs on the distinct values only
+            codes, uniques = pd.factorize(series)
+            factorized[col] = (codes, uniques)
+            text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+            blank = (text == "").to_numpy()
+            nulls = codes < 0
+            empty = np.zeros(len(codes), dtype=bool)
+            empty[~nulls] = blank[codes[~nulls]]
+            stats = {"dtype": str(series.dtype), "nulls": int(nulls.sum()), "empty": int(empty.sum())}
+            filled[col] = ~(nulls | empty)
+            present = text[~blank]
+            if col in PROFILE_DATE_COLUMNS:
+                dates = pd.to_datetime(present, errors="coerce")
+                unparseable = np.zeros(len(text), dtype=bool)
+                unparseable[np.flatnonzero(~blank)] = dates.isna().to_numpy()
+                stats["unparseable"] = int(unparseable[codes[~nulls]].sum())
+                stats["min"] = dates.min().strftime("%Y-%m-%d") if dates.notna().any() else None
+                stats["max"] = dates.max().strftime("%Y-%m-%d") if dates.notna().any() else None
+            else:
+                lengths = present.str.len()
+                stats["minLength"] = int(lengths.min()) if len(lengths) else None
+                stats["maxLength"] = int(lengths.max()) if len(lengths) else None
+            stats["distinct"] = int(present.nunique())
+        stats["filledPct"] = round(float(filled[col].mean() * 100), 2)
+        profile["columns"][col] = stats
+
+    # CNPJ/CPF check digits: supplier documents and the deputy CPF
+    if cnpj_col in factorized:
+        profile["documents"]["supplier"] = _document_summary(*factorized[cnpj_col])
+    if "cpf" in factorized:
+        profile["documents"]["deputyCpf"] = _document_summary(*factorized["cpf"])
+
+    # Duplicates: identical rows, repeated document ids and same deputy/supplier/value/date
+    profile["duplicates"]["exactRows"] = int(df.duplicated(subset=columns).sum())
+    if "ideDocumento" in df.columns:
+        ids = df["ideDocumento"]
+        profile["duplicates"]["documentIds"] = int(ids[ids.notna()].duplicated().sum())
+    key = [c for c in (deputy_col, cnpj_col, value_col, "datEmissao") if c and c in df.columns]
+    if len(key) == 4:
+        profile["duplicates"]["sameDeputySupplierValueDate"] = int(df.duplicated(subset=key).sum())
+
+    # Range checks used by validate_expenses
+    checks = profile["checks"]
+    if value_col in df.columns:
+        checks["negativeValues"] = profile["columns"][value_col]["negative"]
+    if "numAno" in df.columns and profile["columns"]["numAno"]["min"] is not None:
+        checks["yearRange"] = [int(profile["columns"]["numAno"]["min"]), int(profile["columns"]["numAno"]["max"])]
+    if "numMes" in df.columns:
+        month_valid = pd.to_numeric(df["numMes"], errors="coerce").between(1, 12)
+        checks["invalidMonths"] = int((~month_valid).sum())
+
+        # Completeness matrix: share of filled values per column and month
+        if "numAno" in df.columns:
+            month = year_month(df)
+            dated = month_valid.to_numpy() & ~np.isnan(month)
+            matrix = pd.DataFrame({c: m[dated] for c, m in filled.items()}).groupby(month[dated].astype(np.int64))
+            counts = matrix.size()
+            pct = matrix.sum().div(counts, axis=0) * 100
+            profile["completeness"] = {
+                "columns": list(pct.columns),
+                "months": [f"{m // 100}-{m % 100:02d}" for m in pct.index],
+                "transactions": [int(c) for c in counts],
+                "filledPct": [[round(float(v), 2) for v in row] for row in pct.to_numpy()],
+            }
+
+    supplier_docs = profile["documents"].get("supplier", {})
+    invalid_docs = supplier_docs.get("invalidCnpj", 0) + supplier_docs.get("invalidCpf", 0) + supplier_docs.get("invalidLength", 0)
+    print(f"  - Profiled {len(columns)} columns x {len(df):,} rows")
+    print(f"  - Invalid supplier documents: {invalid_docs:,}; exact duplicate rows: {profile['duplicates']['exactRows']:,}")
+    return profile
+
+
+def validate_expenses(df: pd.DataFrame, profile=None) -> tuple:
     """
     Validate expense data schema and integrity using Pydantic schemas.
 
@@ -191,41 +667,39 @@ def validate_expenses(df: pd.DataFrame) -> tuple:
     else:
         print("  Stage 2: Skipped (Pydantic schemas not available)")
 
-    # Stage 3: Data quality checks
+    # Stage 3: Data quality checks, read from the column profile (one pass over the frame)
     print("  Stage 3: Running data quality checks...")
+    if profile is None:
+        profile = profile_expenses(df)
+    columns = profile["columns"]
+    checks = profile["checks"]
 
     # Check for negative values
-    if value_col in df.columns:
-        neg_count = (df[value_col] < 0).sum()
-        if neg_count > 0:
-            warnings.append(f"Found {neg_count:,} negative values in {value_col}")
+    neg_count = checks.get("negativeValues", 0)
+    if neg_count > 0:
+        warnings.append(f"Found {neg_count:,} negative values in {value_col}")
 
     # Check for null values in critical columns
     for col in [deputy_col, value_col]:
-        if col in df.columns:
-            null_count = df[col].isna().sum()
+        if col in columns:
+            null_count = columns[col]["nulls"]
             if null_count > 0:
                 null_pct = (null_count / len(df)) * 100
                 warnings.append(f"Found {null_count:,} null values in {col} ({null_pct:.1f}%)")
 
     # Check year range
-    if 'numAno' in df.columns:
-        min_year = df['numAno'].min()
-        max_year = df['numAno'].max()
+    if "yearRange" in checks:
+        min_year, max_year = (int(y) for y in checks["yearRange"])
         if min_year < 2000 or max_year > 2030:
             warnings.append(f"Unusual year range: {min_year}-{max_year}")
 
     # Check month values
-    if 'numMes' in df.columns:
-        invalid_months = df[(df['numMes'] < 1) | (df['numMes'] > 12)]
-        if len(invalid_months) > 0:
-            errors.append(f"Found {len(invalid_months):,} records with invalid month values")
+    if checks.get("invalidMonths", 0) > 0:
+        errors.append(f"Found {checks['invalidMonths']:,} records with invalid month values")
 
     # Check CNPJ format (if present)
-    cnpj_col = 'txtCNPJCPF' if 'txtCNPJCPF' in df.columns else None
-    if cnpj_col:
-        empty_cnpj = df[cnpj_col].isna() | (df[cnpj_col].astype(str).str.strip() == '')
-        empty_count = empty_cnpj.sum()
+    if "txtCNPJCPF" in columns:
+        empty_count = columns["txtCNPJCPF"]["nulls"] + columns["txtCNPJCPF"]["empty"]
         if empty_count > 0:
             empty_pct = (empty_count / len(df)) * 100
             warnings.append(f"Found {empty_count:,} records with empty CNPJ ({empty_pct:.1f}%)")
@@ -262,14 +736,15 @@ def generate_aggregations(expenses_df):
     if "numAno" in df.columns and "numMes" in df.columns:
         df["month"] = df["numAno"].astype(str) + "-" + df["numMes"].astype(str).str.zfill(2)
 
-    # Get value column
-    value_col = "vlrLiquido" if "vlrLiquido" in df.columns else "vlrDocumento"
-    if value_col not in df.columns:
-        value_col = df.select_dtypes(include=[np.number]).columns[0]
+    # Values in integer centavos; every total below is exact and converted to reais on output
+    df["cents"] = value_cents(df)
+    # Transactions per row (stratum weights in --preview), so counts are summed like values
+    df["rows"] = transaction_weights(df)
 
     # Calculate meta
-    total_spending = df[value_col].sum()
-    total_transactions = len(df)
+    total_cents = int(df["cents"].sum())
+    total_spending = to_reais(total_cents)
+    total_transactions = weighted_count(df["rows"].sum())
 
     # Unique deputies
     deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in df.columns else "nomeParlamentar"
@@ -281,10 +756,9 @@ def generate_aggregations(expenses_df):
     # Unique suppliers - count distinct CNPJ/CPF
     cnpj_col = "txtCNPJCPF" if "txtCNPJCPF" in df.columns else None
     if cnpj_col and cnpj_col in df.columns:
-        # Filter out empty/null values and count unique
-        valid_cnpjs = df[cnpj_col].dropna()
-        valid_cnpjs = valid_cnpjs[valid_cnpjs.astype(str).str.strip() != ""]
-        total_suppliers = valid_cnpjs.nunique()
+        # Distinct canonical document keys ('083.808...' and '083808...' count once)
+        keys, _ = supplier_identity(df)
+        total_suppliers = len(pd.unique(keys[keys >= 0]))
         print(f"  - Found {total_suppliers:,} unique suppliers (CNPJ/CPF)")
     else:
         # Fallback to txtFornecedor if no CNPJ column
@@ -294,8 +768,10 @@ def generate_aggregations(expenses_df):
         else:
             total_suppliers = 40000
 
-    # Period
-    if "numAno" in df.columns:
+    # Period covered by the partitions actually loaded
+    if "month" in df.columns:
+        period = {"start": df["month"].min(), "end": df["month"].max()}
+    elif "numAno" in df.columns:
         start_year = df["numAno"].min()
         end_year = df["numAno"].max()
         period = {"start": f"{start_year}-01", "end": f"{end_year}-12"}
@@ -305,24 +781,22 @@ def generate_aggregations(expenses_df):
     # By month
     by_month = []
     if "month" in df.columns:
-        monthly = df.groupby("month").agg({
-            value_col: "sum",
-            deputy_col if deputy_col in df.columns else df.columns[0]: "count"
-        }).reset_index()
-        monthly.columns = ["month", "value", "transactionCount"]
+        monthly = df.groupby("month").agg({"cents": "sum", "rows": "sum"}).reset_index()
+        monthly.columns = ["month", "cents", "transactionCount"]
+        monthly["transactionCount"] = np.rint(monthly["transactionCount"]).astype(np.int64)
+        monthly.insert(1, "value", to_reais(monthly.pop("cents").to_numpy()))
         by_month = monthly.sort_values("month").to_dict("records")
 
     # By category
     by_category = []
     category_col = "txtDescricao" if "txtDescricao" in df.columns else None
     if category_col and category_col in df.columns:
-        cat_agg = df.groupby(category_col).agg({
-            value_col: "sum",
-            df.columns[0]: "count"
-        }).reset_index()
-        cat_agg.columns = ["category", "value", "transactionCount"]
-        cat_agg["pct"] = (cat_agg["value"] / cat_agg["value"].sum() * 100).round(2)
-        cat_agg = cat_agg.sort_values("value", ascending=False)
+        cat_agg = df.groupby(category_col).agg({"cents": "sum", "rows": "sum"}).reset_index()
+        cat_agg.columns = ["category", "cents", "transactionCount"]
+        cat_agg["transactionCount"] = np.rint(cat_agg["transactionCount"]).astype(np.int64)
+        cat_agg["pct"] = (cat_agg["cents"] / total_cents * 100).round(2) if total_cents else 0.0
+        cat_agg.insert(1, "value", to_reais(cat_agg["cents"].to_numpy()))
+        cat_agg = cat_agg.sort_values("cents", ascending=False).drop(columns="cents")
         by_category = cat_agg.to_dict("records")
 
     # By party
@@ -330,12 +804,13 @@ def generate_aggregations(expenses_df):
     party_col = "sgPartido" if "sgPartido" in df.columns else None
     if party_col and party_col in df.columns and deputy_col in df.columns:
         party_agg = df.groupby(party_col).agg({
-            value_col: "sum",
+            "cents": "sum",
             deputy_col: "nunique"
         }).reset_index()
-        party_agg.columns = ["party", "value", "deputyCount"]
-        party_agg["avgPerDeputy"] = (party_agg["value"] / party_agg["deputyCount"]).round(2)
-        party_agg = party_agg.sort_values("value", ascending=False)
+        party_agg.columns = ["party", "cents", "deputyCount"]
+        party_agg.insert(1, "value", to_reais(party_agg["cents"].to_numpy()))
+        party_agg["avgPerDeputy"] = (party_agg["cents"] / party_agg["deputyCount"] / 100).round(2)
+        party_agg = party_agg.sort_values("cents", ascending=False).drop(columns="cents")
         by_party = party_agg.to_dict("records")
 
     # By state
@@ -343,18 +818,19 @@ def generate_aggregations(expenses_df):
     state_col = "sgUF" if "sgUF" in df.columns else None
     if state_col and state_col in df.columns and deputy_col in df.columns:
         state_agg = df.groupby(state_col).agg({
-            value_col: "sum",
+            "cents": "sum",
             deputy_col: "nunique"
         }).reset_index()
-        state_agg.columns = ["uf", "value", "deputyCount"]
-        state_agg["avgPerDeputy"] = (state_agg["value"] / state_agg["deputyCount"]).round(2)
-        state_agg = state_agg.sort_values("value", ascending=False)
+        state_agg.columns = ["uf", "cents", "deputyCount"]
+        state_agg.insert(1, "value", to_reais(state_agg["cents"].to_numpy()))
+        state_agg["avgPerDeputy"] = (state_agg["cents"] / state_agg["deputyCount"] / 100).round(2)
+        state_agg = state_agg.sort_values("cents", ascending=False).drop(columns="cents")
         by_state = state_agg.to_dict("records")
 
     aggregations = {
         "meta": {
             "totalTransactions": int(total_transactions),
-            "totalSpending": float(total_spending),
+            "totalSpending": total_spending,
             "totalDeputies": int(total_deputies),
             "totalSuppliers": int(total_suppliers),
             "period": period,
@@ -373,40 +849,57 @@ def generate_aggregations(expenses_df):
     return aggregations
 
 
-def is_round_value(value):
-    """Check if a value is a round number (ends in .00, or is divisible by 100)."""
-    if pd.isna(value):
-        return False
-    # Check if it's a whole number or ends in .00
-    return value % 1 == 0 and value % 100 == 0
+# Benford's expected first-digit distribution (%)
+BENFORD_EXPECTED = {
+    1: 30.1, 2: 17.6, 3: 12.5, 4: 9.7,
+    5: 7.9, 6: 6.7, 7: 5.8, 8: 5.1, 9: 4.6
+}
 
 
-def get_first_digit(value):
-    """Extract the first digit from a positive number."""
-    if pd.isna(value) or value <= 0:
-        return None
-    # Convert to string and get first non-zero digit
-    s = str(abs(value)).lstrip('0').replace('.', '').replace('-', '')
-    if len(s) == 0:
-        return None
-    return int(s[0])
+def round_value_mask(values):
+    """Round numbers (whole and divisible by 100), vectorized; NaN is not round."""
+    return (values % 100 == 0).fillna(False).to_numpy(dtype=bool)
 
 
-def calculate_benford_analysis(values):
+def first_digits(values):
     """
-    Calculate Benford's Law analysis for a series of values.
-    Returns digit distribution, chi-squared, p-value, and significance.
+    First digit of each positive value, vectorized (NaN for missing or non-positive values).
+
+    Matches the old string-based extraction: values below 0.1 yield 0, which counts
+    towards the minimum sample size but not towards any digit bucket.
     """
-    # Benford's expected distribution
-    BENFORD_EXPECTED = {
-        1: 30.1, 2: 17.6, 3: 12.5, 4: 9.7,
-        5: 7.9, 6: 6.7, 7: 5.8, 8: 5.1, 9: 4.6
-    }
+    v = values.to_numpy(dtype=float)
+    digits = np.full(len(v), np.nan)
+    positive = v > 0
+    exponent = np.floor(np.log10(v, where=positive, out=np.zeros_like(v)))
+    # The epsilon absorbs float error in v / 10**k (e.g. 0.3 / 0.1 = 2.999...)
+    leading = np.floor(v / np.power(10.0, exponent) + 1e-9)
+    digits[positive] = np.where(v[positive] < 0.1, 0, np.minimum(leading[positive], 9))
+    return pd.Series(digits, index=values.index)
+
+
+def benford_significance(chi2, rules=None):
+    """(pValue, significant) of a Benford chi² against the df=8 critical values of the rules."""
+    # Critical values: p<0.05 = 15.51, p<0.01 = 20.09
+    thresholds = (rules or RISK_RULES)["benford_threshold"]
+    if chi2 > thresholds["chi2_critical_001"]:
+        return 0.01, True
+    if chi2 > thresholds["chi2_critical_005"]:
+        return 0.05, True
+    return 0.10, False
 
-    # Get first digits
-    first_digits = values.apply(get_first_digit).dropna()
 
-    if len(first_digits) < 50:  # Need enough data for meaningful analysis
+def benford_from_counts(counts, sample_size, rules=None):
+    """
+    Benford's Law result from first-digit counts.
+
+    Args:
+        counts: 9 counts for digits 1-9
+        sample_size: number of values with an extracted first digit (minimum sample check)
+        rules: rule set whose benford_threshold applies (RISK_RULES by default)
+    """
+    thresholds = (rules or RISK_RULES)["benford_threshold"]
+    if sample_size < thresholds["min_transactions"]:  # Need enough data for meaningful analysis
         return {
             "chi2": 0,
             "pValue": 1.0,
@@ -414,16 +907,14 @@ def calculate_benford_analysis(values):
             "digitDistribution": [{"digit": d, "observed": 0, "expected": BENFORD_EXPECTED[d]} for d in range(1, 10)]
         }
 
-    # Count occurrences
-    digit_counts = first_digits.value_counts().reindex(range(1, 10), fill_value=0)
-    total = digit_counts.sum()
+    total = sum(counts)
 
     # Calculate observed percentages and chi-squared
     chi2 = 0
     digit_distribution = []
 
     for digit in range(1, 10):
-        observed_count = digit_counts.get(digit, 0)
+        observed_count = counts[digit - 1]
         observed_pct = (observed_count / total * 100) if total > 0 else 0
         expected_pct = BENFORD_EXPECTED[digit]
         expected_count = total * expected_pct / 100
@@ -438,18 +929,7 @@ def calculate_benford_analysis(values):
             "expected": expected_pct
         })
 
-    # Determine significance (df=8)
-    # Critical values: p<0.05 = 15.51, p<0.01 = 20.09
-    if chi2 > 20.09:
-        p_value = 0.01
-        significant = True
-    elif chi2 > 15.51:
-        p_value = 0.05
-        significant = True
-    else:
-        p_value = 0.10
-        significant = False
-
+    p_value, significant = benford_significance(chi2, rules)
     return {
         "chi2": round(chi2, 2),
         "pValue": p_value,
@@ -458,7 +938,906 @@ def calculate_benford_analysis(values):
     }
 
 
-def generate_deputies(expenses_df, hhi_df, fraud_df, enrichment_df=None):
+def calculate_benford_analysis(values, rules=None):
+    """
+    Calculate Benford's Law analysis for a series of values.
+    Returns digit distribution, chi-squared, p-value, and significance.
+    """
+    digits = first_digits(values).dropna()
+    counts = digits.value_counts().reindex(range(1, 10), fill_value=0).tolist()
+    return benford_from_counts(counts, len(digits), rules)
+
+
+def hhi_level(hhi, rules=None):
+    """HHI band label using the rule thresholds (same bands as getHHIRiskLevel in the frontend)."""
+    t = (rules or RISK_RULES)["hhi_thresholds"]
+    if hhi > t["high"]:
+        return "CRITICO"
+    if hhi > t["moderate"]:
+        return "ALTO"
+    if hhi > t["low"]:
+        return "MEDIO"
+    return "BAIXO"
+
+
+def score_transaction_outliers(expenses_df, rules=None):
+    """
+    Robust z-score of every transaction within its category and month.
+
+    One grouped pass: the group median, then the median absolute deviation (MAD) of the
+    same groups, z = 0.6745 * (x - median) / MAD. Where more than half the values are
+    identical (MAD = 0) the mean absolute deviation is used instead (scaled by 1.2533).
+    Only unusually high values are flagged; groups below min_group_size get NaN, and so do
+    rows with a missing category, year or month, which belong to no group.
+
+    Returns:
+        DataFrame aligned with expenses_df: groupMedian, robustZ, isOutlier
+    """
+    rules = rules or OUTLIER_RULES
+    value_col = "vlrLiquido" if "vlrLiquido" in expenses_df.columns else "vlrDocumento"
+    empty = pd.DataFrame({"groupMedian": np.nan, "robustZ": np.nan, "isOutlier": False}, index=expenses_df.index)
+    if expenses_df.empty or "txtDescricao" not in expenses_df.columns or "numMes" not in expenses_df.columns:
+        return empty
+
+    year = expenses_df["numAno"] if "numAno" in expenses_df.columns else 0
+    group = pd.Series(
+        pd.MultiIndex.from_arrays([expenses_df["txtDescricao"], year, expenses_df["numMes"]]).factorize()[0],
+        index=expenses_df.index,
+    )
+    # Rows missing part of the key are left out; factorize would pool them (code -1 or a NaN key)
+    keyed = expenses_df["txtDescricao"].notna() & expenses_df["numMes"].notna()
+    if "numAno" in expenses_df.columns:
+        keyed &= expenses_df["numAno"].notna()
+    values = expenses_df[value_col].astype(float).where(keyed)
+
+    grouped = values.groupby(group)
+    median = grouped.transform("median")
+    deviation = (values - median).abs()
+    by_deviation = deviation.groupby(group)
+    mad = by_deviation.transform("median")
+    mean_ad = by_deviation.transform("mean")
+    size = grouped.transform("size")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(mad > 0, 0.6745 * (values - median) / mad,
+                     np.where(mean_ad > 0, (values - median) / (1.253314 * mean_ad), 0.0))
+    z = pd.Series(z, index=expenses_df.index).where(keyed & (size >= rules["min_group_size"]))
+
+    return pd.DataFrame({
+        "groupMedian": median,
+        "robustZ": z,
+        "isOutlier": (z > rules["z_threshold"]).to_numpy(),
+    }, index=expenses_df.index)
+
+
+def compute_deputy_signals(expenses_df, mismatch_cnpjs=(), outlier_scores=None, rules=None):
+    """
+    Per-deputy fraud-matrix signals in grouped, vectorized passes over the expenses frame.
+
+    Replaces the external fraud_analysis_full_matrix.csv: weekend share (from datEmissao),
+    round-value share, Benford first-digit counts and chi², supplier HHI from value shares
+    and the number of distinct CNPJs flagged as activity mismatches. With outlier_scores
+    (score_transaction_outliers) the atypical transactions are counted as well. Benford chi²
+    is only computed for deputies with the rules' min_transactions first digits.
+
+    Returns:
+        DataFrame indexed by deputy name
+    """
+    deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in expenses_df.columns else "nomeParlamentar"
+    value_col = "vlrLiquido" if "vlrLiquido" in expenses_df.columns else "vlrDocumento"
+    supplier_col = "txtFornecedor" if "txtFornecedor" in expenses_df.columns else "fornecedor"
+    cnpj_col = "txtCNPJCPF" if "txtCNPJCPF" in expenses_df.columns else None
+
+    if expenses_df.empty:
+        return pd.DataFrame()
+
+    values = expenses_df[value_col]
+    digits = first_digits(values)
+    frame = pd.DataFrame({
+        "deputy": expenses_df[deputy_col].to_numpy(),
+        "value": values.to_numpy(),
+        "round": round_value_mask(values),
+        "digit": digits.to_numpy(),
+    })
+    if "datEmissao" in expenses_df.columns:
+        issued = pd.to_datetime(expenses_df["datEmissao"], errors="coerce")
+        frame["dated"] = issued.notna().to_numpy()
+        frame["weekend"] = (issued.dt.dayofweek >= 5).to_numpy()
+    else:
+        frame["dated"] = False
+        frame["weekend"] = False
+
+    grouped = frame.groupby("deputy")
+    signals = grouped.agg(
+        transactionCount=("value", "size"),
+        roundCount=("round", "sum"),
+        datedCount=("dated", "sum"),
+        weekendCount=("weekend", "sum"),
+        digitSample=("digit", "count"),
+    )
+    signals["roundPct"] = signals["roundCount"] / signals["transactionCount"] * 100
+    signals["weekendPct"] = np.where(
+        signals["datedCount"] > 0, signals["weekendCount"] / signals["datedCount"].clip(lower=1) * 100, 0.0
+    )
+
+    # Benford: digit counts matrix (deputy x 1..9), chi² accumulated digit by digit in the same
+    # order as benford_from_counts so both paths agree to the last bit
+    digit_counts = (
+        frame.dropna(subset=["digit"]).groupby(["deputy", "digit"]).size()
+        .unstack(fill_value=0).reindex(index=signals.index, columns=range(1, 10), fill_value=0)
+    )
+    for d in range(1, 10):
+        signals[f"digit{d}"] = digit_counts[d].to_numpy()
+    total = digit_counts.sum(axis=1).to_numpy(dtype=float)
+    chi2 = np.zeros(len(signals))
+    for d in range(1, 10):
+        expected = total * BENFORD_EXPECTED[d] / 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            chi2 = chi2 + np.where(expected > 0, (digit_counts[d].to_numpy() - expected) ** 2 / expected, 0.0)
+    min_sample = (rules or RISK_RULES)["benford_threshold"]["min_transactions"]
+    signals["chi2"] = np.where(signals["digitSample"] >= min_sample, chi2, 0.0)
+
+    # HHI from each supplier entity's share of the deputy's spending (0-10,000), summed in centavos
+    keys, entities = supplier_identity(expenses_df)
+    if supplier_col in expenses_df.columns or cnpj_col:
+        identified = entities != SUPPLIER_KEY_MISSING
+        supplier_totals = pd.DataFrame({
+            "deputy": frame["deputy"].to_numpy()[identified], "supplier": entities[identified],
+            "value": value_cents(expenses_df)[identified],
+        }).groupby(["deputy", "supplier"])["value"].sum()
+        deputy_totals = supplier_totals.groupby(level=0).transform("sum")
+        shares = (supplier_totals / deputy_totals.where(deputy_totals != 0)) * 100
+        signals["hhi"] = (shares ** 2).groupby(level=0).sum().reindex(signals.index, fill_value=0.0)
+    else:
+        signals["hhi"] = 0.0
+
+    # Distinct CNPJs per deputy that appear in the activity mismatch list
+    signals["cnpjMismatches"] = 0
+    if cnpj_col and len(mismatch_cnpjs) > 0:
+        flagged_keys = document_keys(canonical_documents(pd.Series(list(mismatch_cnpjs), dtype=object)))
+        flagged = np.isin(keys, flagged_keys)
+        signals["cnpjMismatches"] = (
+            pd.Series(keys[flagged]).groupby(frame["deputy"].to_numpy()[flagged]).nunique()
+            .reindex(signals.index, fill_value=0).astype(int)
+        )
+
+    # Atypical transactions (robust z above the threshold) per deputy
+    signals["outlierCount"] = 0
+    signals["outlierValue"] = 0.0
+    signals["maxRobustZ"] = 0.0
+    if outlier_scores is not None:
+        scored = pd.DataFrame({
+            "deputy": frame["deputy"],
+            "outlier": outlier_scores["isOutlier"].to_numpy(),
+            "value": np.where(outlier_scores["isOutlier"].to_numpy(), value_cents(expenses_df), 0),
+            "z": outlier_scores["robustZ"].to_numpy(),
+        }).groupby("deputy").agg(outlierCount=("outlier", "sum"), outlierValue=("value", "sum"), maxRobustZ=("z", "max"))
+        scored = scored.reindex(signals.index)
+        signals["outlierCount"] = scored["outlierCount"].fillna(0).astype(int)
+        signals["outlierValue"] = to_reais(scored["outlierValue"].fillna(0).to_numpy())
+        signals["maxRobustZ"] = scored["maxRobustZ"].fillna(0.0)
+
+    print(f"  - Computed fraud signals for {len(signals):,} deputies")
+    return signals
+
+
+def _batched_group_zscores(totals, groups):
+    """group_zscores for every replicate row of totals (replicates x deputies) at once."""
+    codes, uniques = pd.factorize(pd.Series(groups), sort=True)
+    replicates, deputies = totals.shape
+    keys = (np.arange(replicates)[:, None] * len(uniques) + codes[None, :]).ravel()
+    size = np.bincount(codes, minlength=len(uniques))[codes]
+    sums = np.bincount(keys, weights=totals.ravel(), minlength=replicates * len(uniques))
+    mean = (sums[keys] / np.repeat(size[None, :], replicates, axis=0).ravel()).reshape(replicates, deputies)
+    squares = np.bincount(keys, weights=((totals - mean) ** 2).ravel(), minlength=replicates * len(uniques))
+    std = np.sqrt(squares[keys].reshape(replicates, deputies) / size[None, :])
+    std = np.where((size[None, :] >= 2) & (std > 0), std, 1.0)
+    return (totals - mean) / std
+
+
+def bootstrap_deputy_intervals(expenses_df, deputies, replicates=None, seed=None, level=None, rules=None):
+    """
+    Percentile bootstrap intervals for Benford chi², round-value %, HHI and the party/state
+    spending z-scores of every deputy, stored in place as deputy["confidence"].
+
+    All deputies are resampled together: rows are sorted by deputy, and one uniform draw
+    per row and replicate picks a row from the same deputy's block (start + floor(u * n)).
+    Statistics then come from bincounts over (replicate, deputy) keys, in replicate
+    batches sized by BOOTSTRAP["batch_elements"]. HHI is resampled from the same
+    supplier shares as the value deputies.json and fraud-flags.json report.
+    """
+    replicates = BOOTSTRAP["replicates"] if replicates is None else replicates
+    seed = BOOTSTRAP["seed"] if seed is None else seed
+    level = BOOTSTRAP["level"] if level is None else level
+    if not deputies or expenses_df.empty or replicates <= 0:
+        return deputies
+
+    deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in expenses_df.columns else "nomeParlamentar"
+    value_col = "vlrLiquido" if "vlrLiquido" in expenses_df.columns else "vlrDocumento"
+    start_time = time.perf_counter()
+
+    # Active deputies only, in deputies.json order; rows grouped into contiguous blocks
+    position = {d["name"]: i for i, d in enumerate(deputies)}
+    group = expenses_df[deputy_col].map(position)
+    rows = expenses_df[group.notna()]
+    group = group[group.notna()].astype(np.int64).to_numpy()
+    order = np.argsort(group, kind="stable")
+    group = group[order]
+    values = rows[value_col].to_numpy(dtype=float)[order]
+    round_flags = round_value_mask(rows[value_col]).astype(float)[order]
+    digits = first_digits(rows[value_col]).to_numpy()[order]
+    digit_codes = np.where(np.isnan(digits), 10, digits).astype(np.int64)  # 10 = no first digit
+    supplier_codes = pd.factorize(supplier_identity(rows)[1][order])[0]
+    n_suppliers = int(supplier_codes.max()) + 1 if len(supplier_codes) else 1
+    pair_codes, pair_uniques = pd.factorize(group * n_suppliers + np.maximum(supplier_codes, 0))
+    pair_deputy = pair_uniques // n_suppliers
+
+    n_deputies = len(deputies)
+    counts = np.bincount(group, minlength=n_deputies)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    row_start = starts[group]
+    row_count = counts[group]
+    n_pairs = len(pair_uniques)
+    min_sample = (rules or RISK_RULES)["benford_threshold"]["min_transactions"]
+    expected_pct = np.array([BENFORD_EXPECTED[d] for d in range(1, 10)]) / 100
+    parties = [d["party"] for d in deputies]
+    ufs = [d["uf"] for d in deputies]
+
+    stats = {key: [] for key in ("benfordChi2", "roundValuePct", "hhi", "zScoreParty", "zScoreState")}
+    rng = np.random.default_rng(seed)
+    batch = max(1, min(replicates, BOOTSTRAP["batch_elements"] // max(len(values), 1)))
+    for first in range(0, replicates, batch):
+        b = min(batch, replicates - first)
+        picks = row_start[None, :] + (rng.random((b, len(values)), dtype=np.float32) * row_count[None, :]).astype(np.int64)
+        picks = np.minimum(picks, (row_start + row_count - 1)[None, :]).ravel()  # float32 rounding at the block edge
+        deputy_keys = (np.arange(b)[:, None] * n_deputies + group[None, :]).ravel()
+        picked_values = values[picks]
+
+        totals = np.bincount(deputy_keys, weights=picked_values, minlength=b * n_deputies).reshape(b, n_deputies)
+        rounds = np.bincount(deputy_keys, weights=round_flags[picks], minlength=b * n_deputies)
+        stats["roundValuePct"].append(rounds.reshape(b, n_deputies) / counts[None, :] * 100)
+
+        digit_counts = np.bincount(
+            deputy_keys * 11 + digit_codes[picks], minlength=b * n_deputies * 11
+        ).reshape(b, n_deputies, 11)
+        observed = digit_counts[:, :, 1:10]
+        total = observed.sum(axis=2, keepdims=True)
+        expected = total * expected_pct
+        with np.errstate(divide="ignore", invalid="ignore"):
+            chi2 = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0).sum(axis=2)
+        stats["benfordChi2"].append(np.where(digit_counts[:, :, :10].sum(axis=2) >= min_sample, chi2, 0.0))
+
+        pair_keys = (np.arange(b)[:, None] * n_pairs).repeat(len(values), axis=1).ravel() + pair_codes[picks]
+        pair_totals = np.bincount(pair_keys, weights=picked_values, minlength=b * n_pairs).reshape(b, n_pairs)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shares = np.nan_to_num(pair_totals / totals[:, pair_deputy] * 100)
+        hhi = np.bincount(
+            (np.arange(b)[:, None] * n_deputies + pair_deputy[None, :]).ravel(), weights=(shares ** 2).ravel(),
+            minlength=b * n_deputies,
+        )
+        stats["hhi"].append(hhi.reshape(b, n_deputies))
+
+        stats["zScoreParty"].append(_batched_group_zscores(totals, parties))
+        stats["zScoreState"].append(_batched_group_zscores(totals, ufs))
+
+    tail = (1 - level) / 2 * 100
+    bounds = {
+        key: np.percentile(np.concatenate(parts), [tail, 100 - tail], axis=0)
+        for key, parts in stats.items()
+    }
+    for i, d in enumerate(deputies):
+        d["confidence"] = {
+            "level": level,
+            "replicates": replicates,
+            **{key: [round(float(b[0, i]), 2), round(float(b[1, i]), 2)] for key, b in bounds.items()},
+        }
+
+    print(f"  - Bootstrap intervals: {replicates} replicates x {len(values):,} rows "
+          f"in {time.perf_counter() - start_time:.2f}s (seed {seed})")
+    return deputies
+
+
+def preview_output_dir():
+    """Where --preview writes: the output directory's name plus PREVIEW["dir_suffix"]."""
+    return OUTPUT_DIR.with_name(OUTPUT_DIR.name + PREVIEW["dir_suffix"])
+
+
+def risk_score_ranges(deputies, rules=None):
+    """
+    Set deputy["preview"] riskScoreRange/riskLevelRange from the bootstrap bounds, in place.
+
+    The rules are monotone in every signal, so scoring the lower and the upper bounds
+    (each taken together with the point value) brackets the deputy's riskScore. Needs
+    deputy["confidence"] on every deputy; otherwise nothing is set.
+    """
+    rules = rules or RISK_RULES
+    if not deputies or not all("confidence" in d and "preview" in d for d in deputies):
+        return deputies
+
+    signals = deputy_risk_signals(deputies)
+    signals["zScoreParty"] = [d["zScoreParty"] for d in deputies]
+    signals["zScoreState"] = [d["zScoreState"] for d in deputies]
+    ranges = []
+    for side, pick in ((0, np.minimum), (1, np.maximum)):
+        bound = signals.copy()
+        for field in ("hhi", "roundValuePct", "benfordChi2", "zScoreParty", "zScoreState"):
+            bound[field] = pick(bound[field].to_numpy(dtype=float), [d["confidence"][field][side] for d in deputies])
+        bound["benfordSignificant"] = bound["benfordChi2"] > rules["benford_threshold"]["chi2_critical_005"]
+        ranges.append(apply_risk_rules(bound, rules)[:2])
+    (low, low_level), (high, high_level) = ranges
+    for i, d in enumerate(deputies):
+        d["preview"]["riskScoreRange"] = [float(low[i]), float(high[i])]
+        d["preview"]["riskLevelRange"] = [str(low_level[i]), str(high_level[i])]
+    return deputies
+
+
+def sample_expenses(expenses_df, fraction=None, seed=None):
+    """
+    Stratified sample of the expenses for --preview: strata are deputy x month.
+
+    Each stratum keeps ceil(fraction * N_h) rows (at least PREVIEW["min_per_stratum"],
+    or the whole stratum when smaller), picked by a seeded random key. Every kept row
+    carries sampleWeight = N_h / n_h and its sampleStratum code, and valueCents is
+    multiplied by the weight, so every centavo sum downstream is the expansion
+    (Horvitz-Thompson) estimate of the full-data total. The reais value columns are
+    left as sampled, so per-transaction statistics (Benford, round values, outliers)
+    describe real transactions.
+
+    Returns:
+        tuple: (sample, strata) where strata has population and sampled row counts per stratum code
+    """
+    fraction = PREVIEW["fraction"] if fraction is None else fraction
+    seed = PREVIEW["seed"] if seed is None else seed
+    deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in expenses_df.columns else "nomeParlamentar"
+    keys = [c for c in (deputy_col, "numAno", "numMes") if c in expenses_df.columns]
+    if expenses_df.empty or not keys:
+        return expenses_df, pd.DataFrame({"population": [], "sampled": []})
+
+    stratum = expenses_df.groupby(keys, sort=True, dropna=False).ngroup().to_numpy()
+    population = np.bincount(stratum)
+    sampled = np.maximum(PREVIEW["min_per_stratum"], np.ceil(fraction * population))
+    sampled = np.minimum(population, sampled).astype(np.int64)
+
+    # Rows ordered by stratum, then by a random key; the first n_h of each block are kept
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(stratum)), stratum))
+    starts = np.cumsum(population) - population
+    rank = np.arange(len(order)) - starts[stratum[order]]
+    keep = np.sort(order[rank < sampled[stratum[order]]])
+
+    weights = population / sampled
+    sample = expenses_df.iloc[keep]
+    codes = stratum[keep]
+    sample = sample.assign(
+        valueCents=np.rint(value_cents(sample) * weights[codes]).astype(np.int64),
+        sampleWeight=weights[codes],
+        sampleStratum=codes,
+    )
+    print(f"  - Sampled {len(sample):,} of {len(expenses_df):,} expenses "
+          f"({len(sample) / len(expenses_df):.1%}) from {len(population):,} deputy-month strata (seed {seed})")
+    return sample, pd.DataFrame({"population": population, "sampled": sampled})
+
+
+def stratified_total_se(sample, strata, domains, values):
+    """
+    Standard error of the estimated total of values within each domain (cents in, cents out).
+
+    Stratified expansion estimator variance, summed over the strata a domain touches:
+    Var = sum_h N_h^2 (1 - n_h/N_h) s_h^2 / n_h, with s_h^2 the sample variance in stratum h
+    of the value zeroed outside the domain. Strata sampled whole contribute nothing.
+
+    Returns:
+        Series of standard errors indexed by domain
+    """
+    values = np.asarray(values, dtype=float)
+    sums = pd.DataFrame({
+        "domain": np.asarray(domains), "stratum": sample["sampleStratum"].to_numpy(),
+        "y": values, "y2": values ** 2,
+    }).groupby(["domain", "stratum"], sort=False)[["y", "y2"]].sum()
+    stratum = sums.index.get_level_values("stratum")
+    n = strata["sampled"].to_numpy(dtype=float)[stratum]
+    N = strata["population"].to_numpy(dtype=float)[stratum]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s2 = np.where(n > 1, (sums["y2"].to_numpy() - sums["y"].to_numpy() ** 2 / n) / (n - 1), 0.0)
+    variance = pd.Series(N ** 2 * (1 - n / N) * np.maximum(s2, 0.0) / n, index=sums.index)
+    return np.sqrt(variance.groupby(level="domain", sort=False).sum())
+
+
+def _preview_interval(total, se, z):
+    """Normal-approximation interval [total - z*se, total + z*se] in reais, floored at 0."""
+    return [round(max(total - z * se, 0.0), 2), round(total + z * se, 2)]
+
+
+def preview_aggregations(aggregations, sample, strata, fraction):
+    """
+    Attach sampling errors to aggregations.json in place (--preview).
+
+    Counts by deputy and by month are exact (they are sums of N_h); category counts and all
+    values are estimates and get a standard error (valueSE, transactionCountSE, in reais and
+    transactions) plus meta.preview with the sample design and the total's interval.
+    """
+    if sample.empty:
+        return aggregations
+    value_col = "vlrLiquido" if "vlrLiquido" in sample.columns else "vlrDocumento"
+    cents = to_centavos(sample[value_col]).astype(float)
+    ones = np.ones(len(sample))
+    z = NormalDist().inv_cdf(0.5 + PREVIEW["level"] / 2)
+
+    total_se = float(stratified_total_se(sample, strata, np.zeros(len(sample)), cents).iloc[0]) / 100
+    meta = aggregations["meta"]
+    meta["preview"] = {
+        "fraction": fraction,
+        "sampledTransactions": len(sample),
+        "strata": len(strata),
+        "level": PREVIEW["level"],
+        "totalSpendingSE": round(total_se, 2),
+        "totalSpendingCI": _preview_interval(meta["totalSpending"], total_se, z),
+    }
+
+    breakdowns = (
+        ("byMonth", "month", sample["numAno"].astype(str) + "-" + sample["numMes"].astype(str).str.zfill(2)
+         if "numAno" in sample.columns and "numMes" in sample.columns else None),
+        ("byCategory", "category", sample.get("txtDescricao")),
+        ("byParty", "party", sample.get("sgPartido")),
+        ("byState", "uf", sample.get("sgUF")),
+    )
+    for section, key, domains in breakdowns:
+        if domains is None:
+            continue
+        value_se = stratified_total_se(sample, strata, domains.to_numpy(), cents) / 100
+        count_se = stratified_total_se(sample, strata, domains.to_numpy(), ones) if section == "byCategory" else None
+        for row in aggregations[section]:
+            row["valueSE"] = round(float(value_se.get(row[key], 0.0)), 2)
+            if count_se is not None:
+                row["transactionCountSE"] = round(float(count_se.get(row[key], 0.0)), 1)
+    return aggregations
+
+
+def preview_deputies(deputies, sample, strata, rules=None):
+    """
+    Scale the sample-bound deputy signals and attach error estimates in place (--preview).
+
+    Totals are already expansion estimates and transaction counts are exact. What grows with
+    the number of transactions is rescaled by N/n per deputy: the outlier count
+    (the outlier share is the sample share) and the Benford chi², which under a fixed
+    deviation from Benford grows linearly with n around its df=8 null mean, so the full-data
+    value is estimated as df + (chi² - df) * N/n, the bootstrap bounds alike. Deputies are
+    then rescored, and deputy["preview"] holds the spending standard error and interval and
+    the riskScore/riskLevel range (risk_score_ranges).
+    """
+    rules = rules or RISK_RULES
+    if not deputies or sample.empty:
+        return deputies
+
+    deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in sample.columns else "nomeParlamentar"
+    value_col = "vlrLiquido" if "vlrLiquido" in sample.columns else "vlrDocumento"
+    names = sample[deputy_col].to_numpy()
+    sampled = pd.Series(names).value_counts()
+    spending_se = stratified_total_se(sample, strata, names, to_centavos(sample[value_col]).astype(float)) / 100
+    z = NormalDist().inv_cdf(0.5 + PREVIEW["level"] / 2)
+    df = rules["benford_threshold"]["degrees_of_freedom"]
+
+    def scaled_chi2(chi2, scale):
+        return round(max(df + (chi2 - df) * scale, 0.0), 2) if chi2 > 0 else chi2
+
+    for d in deputies:
+        n = int(sampled.get(d["name"], 0))
+        scale = d["transactionCount"] / n if n else 1.0
+        outliers = d.get("outliers")
+        if outliers:
+            outliers["pct"] = round(outliers["count"] / n * 100, 2) if n else 0.0
+            outliers["count"] = int(round(outliers["count"] * scale))
+        d["benford"]["chi2"] = scaled_chi2(d["benford"]["chi2"], scale)
+        d["benford"]["pValue"], d["benford"]["significant"] = benford_significance(d["benford"]["chi2"], rules)
+        if "confidence" in d:
+            d["confidence"]["benfordChi2"] = [scaled_chi2(b, scale) for b in d["confidence"]["benfordChi2"]]
+        se = float(spending_se.get(d["name"], 0.0))
+        d["preview"] = {
+            "sampledTransactions": n,
+            "totalSpendingSE": round(se, 2),
+            "totalSpendingCI": _preview_interval(d["totalSpending"], se, z),
+        }
+
+    score_deputies(deputies, rules)
+    risk_score_ranges(deputies, rules)
+
+    uncertain = sum(1 for d in deputies if len(set(d["preview"].get("riskLevelRange", ()))) > 1)
+    print(f"  - Preview estimates for {len(deputies):,} deputies ({uncertain:,} with an uncertain risk level)")
+    return deputies
+
+
+def normalize_document(series):
+    """Strip punctuation from CNPJ/CPF values so '083.808...' and '083808...' share one key."""
+    return series.astype("string").str.strip().str.replace(r"\D", "", regex=True).fillna("")
+
+
+# Supplier identity: each CNPJ/CPF is canonicalized once into an int64 key, int("1" + digits).
+# The leading 1 keeps leading zeros (and so CPF vs CNPJ length); str(key)[1:] gives the digits back.
+SUPPLIER_KEY_MISSING = -1
+SUPPLIER_KEY_MAX_DIGITS = 18  # "1" + 18 digits still fits in int64
+CNPJ_KEY_RANGE = (10 ** 14, 2 * 10 ** 14)  # keys of 14-digit documents
+
+
+def canonical_documents(raw):
+    """
+    Canonical digit strings for raw CNPJ/CPF values.
+
+    Punctuation and the '.0' suffix of numbers read from float columns are removed.
+    Documents that lost leading zeros (12-13 or 9-10 digits) are padded back to 14/11
+    digits when the padded number has valid check digits. The string work runs on the
+    distinct values only.
+    """
+    raw = pd.Series(raw, dtype=object)
+    codes, uniques = pd.factorize(raw)
+    documents = normalize_document(pd.Series(uniques, dtype=object).astype("string").str.replace(r"\.0$", "", regex=True))
+    lengths = documents.str.len()
+    for shortest, full, kind in ((12, 14, "cnpj"), (9, 11, "cpf")):
+        short = lengths.between(shortest, full - 1)
+        if short.any():
+            padded = documents[short].str.zfill(full)
+            documents[short] = padded.where(document_validity(padded) == kind, documents[short])
+    return pd.Series(np.append(documents.to_numpy(dtype=object), "")[codes], index=raw.index, dtype=object)
+
+
+def document_keys(documents):
+    """int64 keys for canonical digit strings; empty or over-long documents get SUPPLIER_KEY_MISSING."""
+    documents = pd.Series(documents, dtype=object).fillna("").astype(str)
+    lengths = documents.str.len().to_numpy()
+    keyed = (lengths > 0) & (lengths <= SUPPLIER_KEY_MAX_DIGITS)
+    keys = np.full(len(documents), SUPPLIER_KEY_MISSING, dtype=np.int64)
+    if keyed.any():
+        keys[keyed] = ("1" + documents[keyed]).astype(np.int64).to_numpy()
+    return keys
+
+
+def decode_document_keys(keys):
+    """Digit strings back from document keys ('' for missing keys)."""
+    keys = np.asarray(keys, dtype=np.int64)
+    return np.where(keys >= 0, pd.Series(keys).astype(str).str[1:].to_numpy(dtype=object), "")
+
+
+def resolve_suppliers(expenses_df):
+    """
+    Canonical supplier identity for every expense row, computed once for all stages.
+
+    Raw CNPJ/CPF values are factorized, and canonicalization and check digits run on
+    the distinct values only; each row gets the int64 supplierKey of its document.
+    Rows are then grouped into supplier entities (supplierEntity): a row with a document
+    belongs to that document's entity, so every name variant of one CNPJ collapses into
+    it. A row without a usable document is resolved through its folded name to the one
+    document that name is used with elsewhere, or else to a name-only entity with a
+    negative id. Grouping and counting downstream run on these integer columns.
+
+    Returns:
+        (expenses frame with supplierKey/supplierEntity columns,
+         DataFrame indexed by entity id: document, kind, name, nameVariants, transactionCount,
+         summary dict for data-quality.json)
+    """
+    supplier_col = "txtFornecedor" if "txtFornecedor" in expenses_df.columns else "fornecedor"
+    cnpj_col = "txtCNPJCPF" if "txtCNPJCPF" in expenses_df.columns else None
+    n_rows = len(expenses_df)
+
+    if cnpj_col:
+        codes, uniques = pd.factorize(expenses_df[cnpj_col])
+    else:
+        codes, uniques = np.full(n_rows, -1), np.array([], dtype=object)
+    documents = canonical_documents(pd.Series(uniques, dtype=object))
+    keys = np.append(document_keys(documents), SUPPLIER_KEY_MISSING)[codes]  # code -1 -> missing
+
+    # Names folded to lowercase alphanumerics, on the distinct names only
+    if supplier_col in expenses_df.columns:
+        name_codes, names = pd.factorize(expenses_df[supplier_col])
+    else:
+        name_codes, names = np.full(n_rows, -1), np.array([], dtype=object)
+    folded = [re.sub(r"[^a-z0-9]+", " ", fold_text(name)).strip() for name in names]
+    folded = pd.Series(folded, dtype=object)
+    folded_codes, folded_names = pd.factorize(folded.mask(folded == ""))
+    row_folded = np.append(folded_codes, -1)[name_codes]
+
+    # Folded names used with exactly one document resolve the rows that have no document
+    documented = (keys >= 0) & (row_folded >= 0)
+    pairs = pd.DataFrame({"name": row_folded[documented], "key": keys[documented]}).drop_duplicates()
+    single = pairs.drop_duplicates("name", keep=False)
+    by_name = np.full(len(folded_names) + 1, SUPPLIER_KEY_MISSING, dtype=np.int64)
+    by_name[single["name"].to_numpy()] = single["key"].to_numpy()
+
+    entities = keys.copy()
+    missing = keys < 0
+    entities[missing] = by_name[row_folded[missing]]
+    name_only = missing & (entities < 0) & (row_folded >= 0)
+    entities[name_only] = -2 - row_folded[name_only]
+
+    # Entity table: canonical name = most frequent raw name (ties -> alphabetically first)
+    identified = entities != SUPPLIER_KEY_MISSING
+    ids, counts = np.unique(entities[identified], return_counts=True)
+    table = pd.DataFrame({"document": decode_document_keys(ids)}, index=pd.Index(ids, name="entity"))
+    table["kind"] = document_validity(table["document"]).to_numpy()
+    named = identified & (name_codes >= 0)
+    variants = pd.DataFrame({"entity": entities[named], "code": name_codes[named]}).value_counts().rename("n").reset_index()
+    variants["name"] = np.asarray(names, dtype=object)[variants["code"].to_numpy()]
+    variants = variants.sort_values(["entity", "n", "name"], ascending=[True, False, True])
+    table["name"] = variants.drop_duplicates("entity").set_index("entity")["name"].reindex(ids).fillna("").to_numpy()
+    table["nameVariants"] = variants.groupby("entity").size().reindex(ids, fill_value=0).to_numpy()
+    table["transactionCount"] = counts
+
+    raw_forms = np.bincount(codes[codes >= 0], minlength=len(uniques)) > 0
+    summary = {
+        "rawDocuments": int(raw_forms.sum()),
+        "documents": int((ids >= 0).sum()),
+        "invalidDocuments": int(table["kind"].isin(["invalidCnpj", "invalidCpf", "invalidLength"]).sum()),
+        "entities": len(table),
+        "nameOnlyEntities": int((ids < SUPPLIER_KEY_MISSING).sum()),
+        "multiNameEntities": int((table["nameVariants"] > 1).sum()),
+        "rowsResolvedByName": int((missing & (entities >= 0)).sum()),
+        "rowsWithoutSupplier": int((~identified).sum()),
+    }
+    print(f"  - {summary['rawDocuments']:,} raw CNPJ/CPF forms -> {summary['documents']:,} documents "
+          f"({summary['invalidDocuments']:,} failing check digits), {summary['entities']:,} supplier entities")
+    print(f"  - {summary['rowsResolvedByName']:,} rows without a document resolved by supplier name")
+    return expenses_df.assign(supplierKey=keys, supplierEntity=entities), table, summary
+
+
+def supplier_identity(expenses_df):
+    """(supplierKey, supplierEntity) arrays of a frame, resolving them if resolve_suppliers has not run."""
+    if "supplierEntity" not in expenses_df.columns:
+        expenses_df = resolve_suppliers(expenses_df)[0]
+    return expenses_df["supplierKey"].to_numpy(), expenses_df["supplierEntity"].to_numpy()
+
+
+def build_supplier_index(expenses_df, entities=None):
+    """
+    Group expenses once by canonical CNPJ/CPF key (the supplierKey of resolve_suppliers).
+
+    Returns:
+        dict with:
+            - profiles: DataFrame with one row per document key (totals in centavos, counts, month range)
+            - names / deputies / categories: per-document breakdowns, sorted by key
+            - entities: the resolve_suppliers entity table (canonical name and document
+              per supplier entity), used to label supplier totals grouped by entity
+    """
+    deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in expenses_df.columns else "nomeParlamentar"
+    supplier_col = "txtFornecedor" if "txtFornecedor" in expenses_df.columns else "fornecedor"
+    category_col = "txtDescricao" if "txtDescricao" in expenses_df.columns else None
+    cnpj_col = "txtCNPJCPF" if "txtCNPJCPF" in expenses_df.columns else None
+
+    index = {"profiles": pd.DataFrame(), "names": None, "deputies": None, "categories": None, "entities": entities}
+    if expenses_df.empty:
+        return index
+    if entities is None or "supplierEntity" not in expenses_df.columns:
+        expenses_df, index["entities"], _ = resolve_suppliers(expenses_df)
+    if cnpj_col is None or supplier_col not in expenses_df.columns:
+        return index
+
+    df = pd.DataFrame({
+        "key": expenses_df["supplierKey"].to_numpy(),
+        "deputy": expenses_df[deputy_col].to_numpy(),
+        "supplier": expenses_df[supplier_col].to_numpy(),
+        "value": value_cents(expenses_df),
+        "rows": transaction_weights(expenses_df),
+    })
+    if category_col:
+        df["category"] = expenses_df[category_col].to_numpy()
+    if "numAno" in expenses_df.columns and "numMes" in expenses_df.columns:
+        df["month"] = year_month(expenses_df)  # NaN months are skipped by min/max
+    df = df[df["key"] >= 0]
+
+    grouped = df.groupby("key", sort=True)
+    profiles = grouped.agg(
+        totalValue=("value", "sum"),
+        transactionCount=("rows", "sum"),
+        deputyCount=("deputy", "nunique"),
+    )
+    profiles["transactionCount"] = np.rint(profiles["transactionCount"]).astype(np.int64)
+    if "month" in df.columns:
+        profiles["firstMonth"] = grouped["month"].min()
+        profiles["lastMonth"] = grouped["month"].max()
+    index["profiles"] = profiles
+
+    index["names"] = (
+        df.groupby(["key", "supplier"]).size().rename("transactionCount").reset_index()
+        .sort_values(["key", "transactionCount", "supplier"], ascending=[True, False, True])
+    )
+    def breakdown(column):
+        table = df.groupby(["key", column]).agg(value=("value", "sum"), transactionCount=("rows", "sum")).reset_index()
+        table["transactionCount"] = np.rint(table["transactionCount"]).astype(np.int64)
+        return table.sort_values(["key", "value"], ascending=[True, False])
+
+    index["deputies"] = breakdown("deputy")
+    if category_col:
+        index["categories"] = breakdown("category")
+
+    print(f"  - Indexed {len(profiles):,} suppliers by CNPJ/CPF")
+    return index
+
+
+def group_zscores(values, groups):
+    """
+    Z-score of each value within its group (population std, as np.std).
+
+    Groups with a single member or zero spread use std=1, so a lone deputy scores 0.
+    """
+    frame = pd.DataFrame({"value": values, "group": groups})
+    grouped = frame.groupby("group")["value"]
+    mean = grouped.transform("mean")
+    std = grouped.transform("std", ddof=0)
+    size = grouped.transform("size")
+    std = std.where((size >= 2) & (std > 0), 1.0)
+    return ((frame["value"] - mean) / std).to_numpy()
+
+
+def deputy_risk_signals(deputies):
+    """Build the signal frame the risk rules read from generated deputy records."""
+    return pd.DataFrame({
+        "hhi": [d["hhi"]["value"] for d in deputies],
+        "topSupplierPct": [d["topSuppliers"][0]["pct"] if d["topSuppliers"] else 0.0 for d in deputies],
+        "roundValuePct": [d["roundValuePct"] for d in deputies],
+        "benfordSignificant": [d["benford"]["significant"] for d in deputies],
+        "benfordChi2": [d["benford"]["chi2"] for d in deputies],
+        "outlierCount": [d.get("outliers", {}).get("count", 0) for d in deputies],
+        "outlierPct": [d.get("outliers", {}).get("pct", 0.0) for d in deputies],
+        "totalSpending": [d["totalSpending"] for d in deputies],
+        "party": [d["party"] for d in deputies],
+        "uf": [d["uf"] for d in deputies],
+    })
+
+
+def signal_threshold(signal, rules):
+    """Numeric threshold of a signal, resolving references like "hhi_thresholds.moderate"."""
+    above = signal["above"]
+    if isinstance(above, str):
+        section, key = above.split(".", 1)
+        return rules[section][key]
+    return above
+
+
+def apply_risk_rules(signals, rules=None):
+    """
+    Score every deputy at once from a signal frame.
+
+    Returns:
+        tuple: (scores, levels, triggered) where triggered maps signal id -> boolean array
+    """
+    rules = rules or RISK_RULES
+    hhi = signals["hhi"].to_numpy(dtype=float)
+    t = rules["hhi_thresholds"]
+    w = rules["base_weights"]
+    score = np.select(
+        [hhi > t["high"], hhi > t["moderate"], hhi > t["low"]],
+        [w["hhi_critical"], w["hhi_high"], w["hhi_moderate"]],
+        w["hhi_low"],
+    )
+
+    triggered = {}
+    for signal in rules["signals"]:
+        hit = signals[signal["field"]].to_numpy(dtype=float) > signal_threshold(signal, rules)
+        triggered[signal["id"]] = hit
+        score = score + np.where(hit, signal["penalty"], 0.0)
+
+    score = np.minimum(np.round(score, 2), rules["max_score"])
+    levels = rules["risk_level_thresholds"]
+    level = np.select(
+        [score >= levels["critico"], score >= levels["alto"], score >= levels["medio"]],
+        ["CRITICO", "ALTO", "MEDIO"],
+        "BAIXO",
+    )
+    return score, level, triggered
+
+
+def score_deputies(deputies, rules=None):
+    """Compute z-scores, risk score, risk level and red flags for all deputies in place."""
+    rules = rules or RISK_RULES
+    if not deputies:
+        return deputies
+
+    signals = deputy_risk_signals(deputies)
+    signals["zScoreParty"] = group_zscores(signals["totalSpending"], signals["party"])
+    signals["zScoreState"] = group_zscores(signals["totalSpending"], signals["uf"])
+
+    scores, levels, triggered = apply_risk_rules(signals, rules)
+
+    rows = signals.to_dict("records")
+    for i, d in enumerate(deputies):
+        d["riskScore"] = float(scores[i])
+        d["riskLevel"] = str(levels[i])
+        d["redFlags"] = [
+            signal["flag"].format(**rows[i])
+            for signal in rules["signals"]
+            if triggered[signal["id"]][i]
+        ]
+        d["zScoreParty"] = round(float(rows[i]["zScoreParty"]), 2)
+        d["zScoreState"] = round(float(rows[i]["zScoreState"]), 2)
+    return deputies
+
+
+def risk_methodology(rules=None):
+    """Methodology block for manifest.json and the frontend thresholds JSON, derived from the rules."""
+    rules = rules or RISK_RULES
+    benford = rules["benford_threshold"]
+    return {
+        "benford_threshold": {
+            "chi2_critical_001": benford["chi2_critical_001"],
+            "chi2_critical_005": benford["chi2_critical_005"],
+            "degrees_of_freedom": benford["degrees_of_freedom"],
+            "min_transactions": benford["min_transactions"],
+            "description": "Chi-squared test for first digit distribution"
+        },
+        "hhi_thresholds": {
+            **rules["hhi_thresholds"],
+            "description": "Herfindahl-Hirschman Index for supplier concentration"
+        },
+        "risk_score": {
+            "base_weights": dict(rules["base_weights"]),
+            "additive_penalties": {
+                signal["id"]: signal["penalty"] for signal in rules["signals"] if signal["penalty"] > 0
+            },
+            "signals": [
+                {
+                    "id": signal["id"], "field": signal["field"],
+                    "above": signal_threshold(signal, rules), "penalty": signal["penalty"],
+                }
+                for signal in rules["signals"]
+            ],
+            "max_score": rules["max_score"],
+            "risk_level_thresholds": dict(rules["risk_level_thresholds"])
+        }
+    }
+
+
+def merge_rules(base, overrides):
+    """Overrides merged into base; nested dicts key by key, anything else (signals) replaced."""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            value = merge_rules(base[key], value)
+        merged[key] = value
+    return merged
+
+
+def validate_risk_rules(rules):
+    """Raise ValueError when a rule set lacks a key the scoring engine reads."""
+    problems = []
+    for section, defaults in RISK_RULES.items():
+        if section not in rules:
+            problems.append(section)
+        elif isinstance(defaults, dict):
+            if not isinstance(rules[section], dict):
+                problems.append(f"{section} (not an object)")
+            else:
+                problems.extend(f"{section}.{key}" for key in defaults if key not in rules[section])
+    for i, signal in enumerate(rules.get("signals") or []):
+        missing = [key for key in ("id", "field", "above", "penalty", "flag") if key not in signal]
+        problems.extend(f"signals[{i}].{key}" for key in missing)
+        if "above" in missing or not isinstance(signal["above"], str):
+            continue
+        section, _, key = signal["above"].partition(".")
+        if not isinstance(rules.get(section), dict) or key not in rules[section]:
+            problems.append(f"signals[{i}].above ({signal['above']} does not exist)")
+    if problems:
+        raise ValueError(f"Invalid risk rules, missing or malformed: {', '.join(problems)}")
+    return rules
+
+
+def load_risk_rules(path):
+    """
+    Load an alternative rule set from a JSON file.
+
+    The file only needs the values it changes: nested objects are merged into RISK_RULES key by
+    key, while a signals list replaces the default one as a whole.
+    """
+    with open(path, encoding="utf-8") as f:
+        overrides = json.load(f)
+    return validate_risk_rules(merge_rules(RISK_RULES, overrides))
+
+
+def save_frontend_thresholds(rules=None):
+    """Write the thresholds JSON imported by the frontend."""
+    with open(FRONTEND_THRESHOLDS_PATH, "w", encoding="utf-8") as f:
+        json.dump(risk_methodology(rules), f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"  -> Saved {FRONTEND_THRESHOLDS_PATH}")
+
+
+def generate_deputies(expenses_df, hhi_df, fraud_df, enrichment_df=None, supplier_index=None, rules=None, signals=None):
     """Generate deputies.json with per-deputy data including enrichment (attendance, education)."""
     print("\nGenerating deputies.json...")
 
@@ -491,8 +1870,6 @@ def generate_deputies(expenses_df, hhi_df, fraud_df, enrichment_df=None):
 
     # Get columns
     deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in expenses_df.columns else "nomeParlamentar"
-    value_col = "vlrLiquido" if "vlrLiquido" in expenses_df.columns else "vlrDocumento"
-    supplier_col = "txtFornecedor" if "txtFornecedor" in expenses_df.columns else "fornecedor"
     party_col = "sgPartido" if "sgPartido" in expenses_df.columns else None
     state_col = "sgUF" if "sgUF" in expenses_df.columns else None
     category_col = "txtDescricao" if "txtDescricao" in expenses_df.columns else None
@@ -502,121 +1879,95 @@ def generate_deputies(expenses_df, hhi_df, fraud_df, enrichment_df=None):
         expenses_df = expenses_df.copy()
         expenses_df["month"] = expenses_df["numAno"].astype(str) + "-" + expenses_df["numMes"].astype(str).str.zfill(2)
 
-    # CNPJ column for unique supplier tracking
-    cnpj_col = "txtCNPJCPF" if "txtCNPJCPF" in expenses_df.columns else None
+    # Values in integer centavos: totals and shares are exact, converted to reais on output
+    if "valueCents" not in expenses_df.columns:
+        expenses_df = expenses_df.assign(valueCents=value_cents(expenses_df))
+    expenses_df = expenses_df.assign(rows=transaction_weights(expenses_df))
+
+    # Supplier entities (canonical name and document) from the supplier index
+    if supplier_index is None or supplier_index.get("entities") is None or "supplierEntity" not in expenses_df.columns:
+        expenses_df, entities, _ = resolve_suppliers(expenses_df)
+    else:
+        entities = supplier_index["entities"]
+    entity_names = entities["name"]
+    entity_documents = entities["document"]
+
+    # Round values, Benford digit counts and HHI per deputy, computed in grouped passes
+    if signals is None:
+        signals = compute_deputy_signals(expenses_df, rules=rules)
+    signal_rows = signals.to_dict("index")
+    if hhi_df is not None and not hhi_df.empty:
+        cross_check_hhi(signals, hhi_df)
 
     # Group by deputy
     for idx, (name, group) in enumerate(expenses_df.groupby(deputy_col)):
-        total_spending = group[value_col].sum()
-        transaction_count = len(group)
-        avg_ticket = total_spending / transaction_count if transaction_count > 0 else 0
-        supplier_count = group[supplier_col].nunique() if supplier_col in group.columns else 0
-
-        # Get unique supplier CNPJs for this deputy (for filtering calculations)
-        supplier_cnpjs = []
-        if cnpj_col and cnpj_col in group.columns:
-            valid_cnpjs = group[cnpj_col].dropna()
-            valid_cnpjs = valid_cnpjs[valid_cnpjs.astype(str).str.strip() != ""]
-            supplier_cnpjs = valid_cnpjs.unique().tolist()
-
-        # Calculate round value percentage
-        round_values = group[value_col].apply(is_round_value)
-        round_value_pct = (round_values.sum() / transaction_count * 100) if transaction_count > 0 else 0
+        cents = group["valueCents"].to_numpy()
+        total_cents = int(cents.sum())
+        total_spending = to_reais(total_cents)
+        transaction_count = weighted_count(group["rows"].sum())
+        avg_ticket = total_cents / transaction_count / 100 if transaction_count > 0 else 0
+        group_entities = group["supplierEntity"].to_numpy()
+        supplier_count = len(pd.unique(group_entities[group_entities != SUPPLIER_KEY_MISSING]))
+
+        # Canonical CNPJ/CPF of every supplier of this deputy (for filtering calculations)
+        group_keys = pd.unique(group["supplierKey"].to_numpy())
+        supplier_cnpjs = entity_documents.reindex(group_keys[group_keys >= 0]).tolist()
+
+        deputy_signals = signal_rows[name]
+        round_value_pct = deputy_signals["roundPct"]
 
         # Get party and state (take mode)
         party = group[party_col].mode().iloc[0] if party_col and party_col in group.columns and len(group[party_col].mode()) > 0 else "N/A"
         uf = group[state_col].mode().iloc[0] if state_col and state_col in group.columns and len(group[state_col].mode()) > 0 else "N/A"
 
-        # Get HHI data if available
-        hhi_value = 1500
-        hhi_level = "MEDIO"
-        if not hhi_df.empty and "Deputado" in hhi_df.columns:
-            hhi_row = hhi_df[hhi_df["Deputado"] == name]
-            if len(hhi_row) > 0:
-                hhi_value = float(hhi_row.iloc[0].get("HHI", 1500))
-                hhi_level = str(hhi_row.iloc[0].get("Nivel_Concentracao", "MEDIO")).upper()
-
-        # Determine risk level
-        if hhi_value > 3000:
-            risk_level = "CRITICO"
-            risk_score = 0.9
-        elif hhi_value > 2500:
-            risk_level = "ALTO"
-            risk_score = 0.7
-        elif hhi_value > 1500:
-            risk_level = "MEDIO"
-            risk_score = 0.4
-        else:
-            risk_level = "BAIXO"
-            risk_score = 0.2
+        # HHI of this run's supplier shares, the same value fraud flags and the bootstrap use
+        hhi_value = deputy_signals["hhi"]
+        hhi_band = hhi_level(hhi_value, rules)
 
-        # Get top suppliers with their CNPJs
+        # Top supplier entities, labelled with their canonical name and document
         top_suppliers = []
-        if supplier_col in group.columns:
-            supplier_totals = group.groupby(supplier_col)[value_col].sum().sort_values(ascending=False).head(5)
-            for supp_name, supp_value in supplier_totals.items():
-                # Look up the CNPJ for this supplier (take the most common one if multiple exist)
-                supplier_cnpj = ""
-                if cnpj_col and cnpj_col in group.columns:
-                    supplier_rows = group[group[supplier_col] == supp_name]
-                    cnpj_values = supplier_rows[cnpj_col].dropna()
-                    cnpj_values = cnpj_values[cnpj_values.astype(str).str.strip() != ""]
-                    if len(cnpj_values) > 0:
-                        # Take the most common CNPJ for this supplier
-                        supplier_cnpj = str(cnpj_values.mode().iloc[0]) if len(cnpj_values.mode()) > 0 else ""
-
-                top_suppliers.append({
-                    "name": str(supp_name),
-                    "cnpj": supplier_cnpj,
-                    "value": float(supp_value),
-                    "pct": float(supp_value / total_spending * 100) if total_spending > 0 else 0
-                })
+        identified = group_entities != SUPPLIER_KEY_MISSING
+        supplier_totals = (
+            pd.Series(cents[identified]).groupby(group_entities[identified]).sum()
+            .sort_values(ascending=False).head(5)
+        )
+        for entity, supp_cents in supplier_totals.items():
+            top_suppliers.append({
+                "name": str(entity_names.at[entity]),
+                "cnpj": str(entity_documents.at[entity]),
+                "value": to_reais(supp_cents),
+                "pct": float(supp_cents / total_cents * 100) if total_cents > 0 else 0
+            })
 
-        # Calculate Benford analysis from actual transaction values
-        benford_result = calculate_benford_analysis(group[value_col])
+        # Benford analysis from the precomputed first-digit counts
+        benford_result = benford_from_counts(
+            [int(deputy_signals[f"digit{d}"]) for d in range(1, 10)], deputy_signals["digitSample"], rules
+        )
 
         # Calculate category breakdown for this deputy
         category_breakdown = []
         category_col = "txtDescricao" if "txtDescricao" in group.columns else None
         if category_col and category_col in group.columns:
-            cat_agg = group.groupby(category_col)[value_col].sum().sort_values(ascending=False)
-            for cat_name, cat_value in cat_agg.items():
+            cat_agg = group.groupby(category_col).agg(sum=("valueCents", "sum"), size=("rows", "sum"))
+            for cat_name, cat_cents, cat_count in cat_agg.sort_values("sum", ascending=False).itertuples():
                 category_breakdown.append({
                     "category": str(cat_name),
-                    "value": float(cat_value),
-                    "pct": float(cat_value / total_spending * 100) if total_spending > 0 else 0,
-                    "transactionCount": int(len(group[group[category_col] == cat_name]))
+                    "value": to_reais(cat_cents),
+                    "pct": float(cat_cents / total_cents * 100) if total_cents > 0 else 0,
+                    "transactionCount": weighted_count(cat_count)
                 })
 
         # Calculate monthly breakdown for this deputy
         monthly_breakdown = []
         if "month" in group.columns:
-            month_agg = group.groupby("month").agg({
-                value_col: "sum",
-                group.columns[0]: "count"
-            }).reset_index()
-            month_agg.columns = ["month", "value", "transactionCount"]
-            month_agg = month_agg.sort_values("month")
-            for _, row in month_agg.iterrows():
+            month_agg = group.groupby("month").agg(sum=("valueCents", "sum"), size=("rows", "sum")).sort_index()
+            for month, month_cents, month_count in month_agg.itertuples():
                 monthly_breakdown.append({
-                    "month": str(row["month"]),
-                    "value": float(row["value"]),
-                    "transactionCount": int(row["transactionCount"])
+                    "month": str(month),
+                    "value": to_reais(month_cents),
+                    "transactionCount": weighted_count(month_count)
                 })
 
-        # Get red flags
-        red_flags = []
-        if hhi_value > 2500:
-            red_flags.append(f"Concentracao alta de fornecedores (HHI={hhi_value:.0f})")
-        if len(top_suppliers) > 0 and top_suppliers[0]["pct"] > 50:
-            red_flags.append(f"Top fornecedor representa {top_suppliers[0]['pct']:.1f}% dos gastos")
-        if round_value_pct > 20:
-            red_flags.append(f"{round_value_pct:.1f}% valores redondos (suspeito)")
-            risk_score = min(risk_score + 0.1, 1.0)
-        if benford_result["significant"]:
-            red_flags.append(f"Desvio significativo da Lei de Benford (chi2={benford_result['chi2']:.1f})")
-            risk_score = min(risk_score + 0.15, 1.0)
-
         # Get enrichment data (attendance, education, profession)
         enrichment = {}
         if enrichment_df is not None and not enrichment_df.empty:
@@ -652,14 +2003,21 @@ def generate_deputies(expenses_df, hhi_df, fraud_df, enrichment_df=None):
             "supplierCnpjs": supplier_cnpjs,  # List of unique supplier CNPJs for this deputy
             "hhi": {
                 "value": float(hhi_value),
-                "level": hhi_level
+                "level": hhi_band
             },
             "benford": benford_result,
             "roundValuePct": float(round_value_pct),
-            "riskScore": float(risk_score),
-            "riskLevel": risk_level,
+            "outliers": {
+                "count": int(deputy_signals.get("outlierCount", 0)),
+                "pct": round(float(deputy_signals.get("outlierCount", 0) / transaction_count * 100), 2),
+                "value": round(float(deputy_signals.get("outlierValue", 0.0)), 2),
+                "maxRobustZ": round(float(deputy_signals.get("maxRobustZ", 0.0)), 2),
+            },
+            # Risk score, level and red flags are filled in by score_deputies()
+            "riskScore": 0.0,
+            "riskLevel": "BAIXO",
             "topSuppliers": top_suppliers,
-            "redFlags": red_flags,
+            "redFlags": [],
             "byCategory": category_breakdown,
             "byMonth": monthly_breakdown,
             # Enrichment data (attendance, education, etc)
@@ -683,94 +2041,9 @@ def generate_deputies(expenses_df, hhi_df, fraud_df, enrichment_df=None):
     print(f"  - Filtered out {filtered_count:,} inactive deputies (spending < R$ {MIN_SPENDING:,} or txns < {MIN_TRANSACTIONS})")
     print(f"  - Remaining active deputies: {len(deputies):,}")
 
-    # Calculate party and state statistics for z-scores
-    print("  - Calculating z-scores...")
-
-    # Group spending by party
-    party_spending = {}
-    for d in deputies:
-        party = d["party"]
-        if party not in party_spending:
-            party_spending[party] = []
-        party_spending[party].append(d["totalSpending"])
-
-    # Calculate party stats (mean, std)
-    party_stats = {}
-    for party, values in party_spending.items():
-        if len(values) >= 2:
-            mean = np.mean(values)
-            std = np.std(values)
-            party_stats[party] = {"mean": mean, "std": std if std > 0 else 1}
-        else:
-            party_stats[party] = {"mean": values[0] if values else 0, "std": 1}
-
-    # Group spending by state
-    state_spending = {}
-    for d in deputies:
-        uf = d["uf"]
-        if uf not in state_spending:
-            state_spending[uf] = []
-        state_spending[uf].append(d["totalSpending"])
-
-    # Calculate state stats (mean, std)
-    state_stats = {}
-    for uf, values in state_spending.items():
-        if len(values) >= 2:
-            mean = np.mean(values)
-            std = np.std(values)
-            state_stats[uf] = {"mean": mean, "std": std if std > 0 else 1}
-        else:
-            state_stats[uf] = {"mean": values[0] if values else 0, "std": 1}
-
-    # Second pass: calculate z-scores and update risk scores
-    for d in deputies:
-        party = d["party"]
-        uf = d["uf"]
-        spending = d["totalSpending"]
-
-        # Calculate z-scores
-        if party in party_stats:
-            z_party = (spending - party_stats[party]["mean"]) / party_stats[party]["std"]
-        else:
-            z_party = 0.0
-
-        if uf in state_stats:
-            z_state = (spending - state_stats[uf]["mean"]) / state_stats[uf]["std"]
-        else:
-            z_state = 0.0
-
-        d["zScoreParty"] = round(z_party, 2)
-        d["zScoreState"] = round(z_state, 2)
-
-        # Recalculate risk score with new signals
-        risk_score = d["riskScore"]  # Start with current score (HHI + benford + round)
-
-        # Add top supplier >50% penalty (+0.10)
-        if d["topSuppliers"] and d["topSuppliers"][0]["pct"] > 50:
-            risk_score += 0.10
-
-        # Add z-score penalties (+0.08 each if >2σ above average)
-        # Only penalize for spending MORE than average (positive z-score)
-        if z_party > 2.0:
-            risk_score += 0.08
-            d["redFlags"].append(f"Gasto {z_party:.1f}σ acima da media do partido")
-
-        if z_state > 2.0:
-            risk_score += 0.08
-            d["redFlags"].append(f"Gasto {z_state:.1f}σ acima da media do estado")
-
-        # Cap at 1.0
-        d["riskScore"] = min(round(risk_score, 2), 1.0)
-
-        # Update risk level based on new score
-        if d["riskScore"] >= 0.75:
-            d["riskLevel"] = "CRITICO"
-        elif d["riskScore"] >= 0.55:
-            d["riskLevel"] = "ALTO"
-        elif d["riskScore"] >= 0.35:
-            d["riskLevel"] = "MEDIO"
-        else:
-            d["riskLevel"] = "BAIXO"
+    # Z-scores vs party/state, risk score, level and red flags in one vectorized pass
+    print("  - Calculating z-scores and risk scores...")
+    score_deputies(deputies, rules)
 
     # Sort by total spending descending
     deputies.sort(key=lambda x: x["totalSpending"], reverse=True)
@@ -784,55 +2057,325 @@ def generate_deputies(expenses_df, hhi_df, fraud_df, enrichment_df=None):
     return deputies
 
 
-def generate_fraud_flags(fraud_df):
-    """Generate fraud-flags.json with red flag details."""
+def fraud_flag_labels(details):
+    """Readable flag list of a fraud-flags.json record, built from its details."""
+    labels = []
+    if details["benfordDeviation"]:
+        labels.append("Desvio da Lei de Benford")
+    if details["supplierConcentration"]:
+        labels.append("Alta concentracao de fornecedores")
+    if details["roundValuePct"] > 30:
+        labels.append(f"{details['roundValuePct']:.0f}% valores redondos")
+    if details["cnpjMismatches"] > 0:
+        labels.append(f"{details['cnpjMismatches']} CNPJs com atividade incompativel")
+    return labels
+
+
+def generate_fraud_flags(deputies, signals, fraud_df=None, rules=None):
+    """
+    Generate fraud-flags.json from the signals computed in this run.
+
+    fraud_analysis_full_matrix.csv, when present, is only used as a cross-check.
+    """
     print("\nGenerating fraud-flags.json...")
 
-    if fraud_df.empty:
+    if not deputies or signals is None or signals.empty:
         return []
 
     flags = []
-    for _, row in fraud_df.iterrows():
+    for deputy in deputies:
+        if deputy["name"] not in signals.index:
+            continue
+        row = signals.loc[deputy["name"]]
         flag = {
-            "deputyId": int(row.get("id", 0)),
-            "deputyName": str(row.get("Deputado", "")),
-            "party": str(row.get("Partido", "")),
-            "uf": str(row.get("UF", "")),
+            "deputyId": int(deputy["id"]),
+            "deputyName": deputy["name"],
+            "party": deputy["party"],
+            "uf": deputy["uf"],
             "flags": [],
             "details": {
-                "benfordDeviation": bool(row.get("Score_Benford", 0) > 0.5),
-                "benfordChi2": float(row.get("Chi2", 0)),
-                "roundValuePct": float(row.get("Round_Pct", 0)),
-                "supplierConcentration": bool(row.get("HHI", 0) > 2500),
-                "hhiValue": float(row.get("HHI", 0)),
-                "cnpjMismatches": int(row.get("CNPJ_Mismatches", 0)),
-                "weekendPct": float(row.get("Weekend_Pct", 0))
+                "benfordDeviation": bool(deputy["benford"]["significant"]),
+                "benfordChi2": round(float(row["chi2"]), 2),
+                "roundValuePct": round(float(row["roundPct"]), 2),
+                "supplierConcentration": bool(row["hhi"] > (rules or RISK_RULES)["hhi_thresholds"]["moderate"]),
+                "hhiValue": round(float(row["hhi"]), 2),
+                "cnpjMismatches": int(row["cnpjMismatches"]),
+                "weekendPct": round(float(row["weekendPct"]), 2)
             },
-            "riskScore": float(row.get("Risk_Score_Final", 0)),
-            "riskLevel": str(row.get("Risk_Category", "MEDIO")).upper()
+            "riskScore": deputy["riskScore"],
+            "riskLevel": deputy["riskLevel"]
         }
-
-        # Build flags list
-        if flag["details"]["benfordDeviation"]:
-            flag["flags"].append("Desvio da Lei de Benford")
-        if flag["details"]["supplierConcentration"]:
-            flag["flags"].append("Alta concentracao de fornecedores")
-        if flag["details"]["roundValuePct"] > 30:
-            flag["flags"].append(f"{flag['details']['roundValuePct']:.0f}% valores redondos")
-        if flag["details"]["cnpjMismatches"] > 0:
-            flag["flags"].append(f"{flag['details']['cnpjMismatches']} CNPJs com atividade incompativel")
-
+        flag["flags"] = fraud_flag_labels(flag["details"])
         flags.append(flag)
 
     print(f"  - Generated {len(flags)} fraud flag records")
 
+    if fraud_df is not None and not fraud_df.empty:
+        cross_check_fraud_matrix(signals, fraud_df)
+
     return flags
 
 
-def generate_mismatches(mismatch_df):
-    """Generate mismatches.json with CNPJ activity mismatches."""
+def generate_outliers(expenses_df, outlier_scores, deputies, rules=None):
+    """Generate outliers.json: atypical transactions by category and deputy, plus the most extreme ones."""
+    rules = rules or OUTLIER_RULES
+    print("\nGenerating outliers.json...")
+
+    meta = {
+        "method": "Modified z-score 0.6745*(x - median)/MAD within category x month",
+        "zThreshold": rules["z_threshold"],
+        "minGroupSize": rules["min_group_size"],
+        "scoredTransactions": int(outlier_scores["robustZ"].notna().sum()),
+        "outlierCount": int(outlier_scores["isOutlier"].sum()),
+        "outlierValue": 0.0,
+    }
+    if expenses_df.empty or meta["outlierCount"] == 0:
+        print("  - No atypical transactions")
+        return {"meta": meta, "byCategory": [], "deputies": [], "transactions": []}
+
+    deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in expenses_df.columns else "nomeParlamentar"
+    value_col = "vlrLiquido" if "vlrLiquido" in expenses_df.columns else "vlrDocumento"
+    supplier_col = "txtFornecedor" if "txtFornecedor" in expenses_df.columns else "fornecedor"
+
+    flagged = outlier_scores["isOutlier"].to_numpy()
+    frame = pd.DataFrame({
+        "category": expenses_df["txtDescricao"].to_numpy(),
+        "outlier": flagged,
+        "outlierValue": np.where(flagged, value_cents(expenses_df), 0),
+    })
+    meta["outlierValue"] = to_reais(frame["outlierValue"].sum())
+
+    by_category = frame.groupby("category").agg(
+        transactionCount=("outlier", "size"), outlierCount=("outlier", "sum"), outlierValue=("outlierValue", "sum")
+    ).sort_values("outlierCount", ascending=False)
+    categories = [
+        {
+            "category": str(category),
+            "transactionCount": int(row.transactionCount),
+            "outlierCount": int(row.outlierCount),
+            "outlierPct": round(float(row.outlierCount / row.transactionCount * 100), 2),
+            "outlierValue": to_reais(row.outlierValue),
+        }
+        for category, row in by_category.iterrows()
+    ]
+
+    deputy_rows = sorted(
+        (d for d in deputies if d.get("outliers", {}).get("count", 0) > 0),
+        key=lambda d: (d["outliers"]["count"], d["outliers"]["value"]),
+        reverse=True,
+    )
+    deputy_summaries = [
+        {"id": d["id"], "name": d["name"], "party": d["party"], "uf": d["uf"],
+         "transactionCount": d["transactionCount"], **d["outliers"]}
+        for d in deputy_rows
+    ]
+
+    # Most extreme transactions; only the flagged rows are sorted
+    ids_by_name = {d["name"]: d["id"] for d in deputies}
+    top = outlier_scores[flagged].nlargest(rules["top_transactions"], "robustZ")
+    rows = expenses_df.loc[top.index]
+    month = rows["numAno"].astype(str) + "-" + rows["numMes"].astype(str).str.zfill(2) if "numAno" in rows.columns else ""
+    transactions = [
+        {
+            "deputyId": ids_by_name.get(name),
+            "deputyName": str(name),
+            "date": str(date)[:10] if pd.notna(date) else None,
+            "month": str(m),
+            "category": str(category),
+            "supplierName": str(supplier),
+            "cnpj": str(cnpj) if pd.notna(cnpj) else "",
+            "value": float(value),
+            "groupMedian": round(float(median), 2),
+            "robustZ": round(float(z), 2),
+        }
+        for name, date, m, category, supplier, cnpj, value, median, z in zip(
+            rows[deputy_col],
+            rows["datEmissao"] if "datEmissao" in rows.columns else [None] * len(rows),
+            month if len(month) else [""] * len(rows),
+            rows["txtDescricao"],
+            rows[supplier_col] if supplier_col in rows.columns else [""] * len(rows),
+            rows["txtCNPJCPF"] if "txtCNPJCPF" in rows.columns else [""] * len(rows),
+            rows[value_col],
+            top["groupMedian"],
+            top["robustZ"],
+        )
+    ]
+
+    print(f"  - {meta['outlierCount']:,} atypical transactions of {meta['scoredTransactions']:,} scored "
+          f"(R$ {meta['outlierValue']:,.2f})")
+    print(f"  - {len(deputy_summaries):,} deputies with at least one")
+    return {"meta": meta, "byCategory": categories, "deputies": deputy_summaries, "transactions": transactions}
+
+
+def cross_check_hhi(signals, hhi_df):
+    """Compare the computed supplier-share HHI with the notebook's hhi_analysis.csv (report only)."""
+    if "Deputado" not in hhi_df.columns or "HHI" not in hhi_df.columns:
+        print("  ! hhi_analysis.csv has no 'Deputado'/'HHI' columns, skipping cross-check")
+        return
+
+    external = hhi_df.drop_duplicates("Deputado").set_index("Deputado")
+    common = signals.index.intersection(external.index)
+    print(f"  - Cross-check vs hhi_analysis.csv: {len(common):,} of {len(signals):,} deputies matched")
+    if len(common) == 0:
+        return
+    diff = (signals.loc[common, "hhi"] - pd.to_numeric(external.loc[common, "HHI"], errors="coerce")).abs()
+    print(f"    {'HHI':<16} max |diff| {diff.max():>10.2f}  median {diff.median():>8.2f}")
+
+
+def cross_check_fraud_matrix(signals, fraud_df):
+    """Compare computed signals with the notebook's fraud_analysis_full_matrix.csv (report only)."""
+    if "Deputado" not in fraud_df.columns:
+        print("  ! Fraud matrix has no 'Deputado' column, skipping cross-check")
+        return
+
+    external = fraud_df.drop_duplicates("Deputado").set_index("Deputado")
+    common = signals.index.intersection(external.index)
+    print(f"  - Cross-check vs fraud matrix: {len(common):,} of {len(signals):,} deputies matched")
+    if len(common) == 0:
+        return
+
+    columns = {"Chi2": "chi2", "Round_Pct": "roundPct", "HHI": "hhi",
+               "Weekend_Pct": "weekendPct", "CNPJ_Mismatches": "cnpjMismatches"}
+    for external_col, signal_col in columns.items():
+        if external_col not in external.columns:
+            continue
+        theirs = pd.to_numeric(external.loc[common, external_col], errors="coerce")
+        diff = (signals.loc[common, signal_col] - theirs).abs()
+        print(f"    {external_col:<16} max |diff| {diff.max():>10.2f}  median {diff.median():>8.2f}")
+
+
+def category_key(text):
+    """Fold an expense category so accent, case and punctuation variants share one key."""
+    return re.sub(r"[^a-z0-9]+", " ", fold_text(text)).strip()
+
+
+def build_cnae_rule_index(rules=None):
+    """
+    Precompute the category -> allowed-CNAE-prefix index for vectorized matching.
+
+    Returns:
+        {prefix_length: set of "<category key>|<prefix>"} plus the set of checked category keys
+    """
+    rules = rules if rules is not None else CATEGORY_CNAE_PREFIXES
+    by_length = {}
+    for category, prefixes in rules.items():
+        key = category_key(category)
+        for prefix in prefixes:
+            by_length.setdefault(len(prefix), set()).add(f"{key}|{prefix}")
+    return by_length, {category_key(category) for category in rules}
+
+
+def format_cnae(code, description=""):
+    """'8630501' -> '8630-5/01 - description' (the format shown in the mismatch table)."""
+    code = str(code)
+    formatted = f"{code[:4]}-{code[4]}/{code[5:7]}" if len(code) == 7 else code
+    return f"{formatted} - {description}" if description else formatted
+
+
+def compute_mismatches(expenses_df, reference_df, rules=None):
+    """
+    Flag CNPJs paid under expense categories their registered CNAE is not compatible with.
+
+    Matching runs over the distinct (CNPJ, category) pairs rather than every transaction:
+    for each prefix length in the rule index, "<category>|<cnae prefix>" keys are tested
+    with one isin() call.
+
+    Returns:
+        List of mismatch records in the mismatches.json schema
+    """
+    deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in expenses_df.columns else "nomeParlamentar"
+    supplier_col = "txtFornecedor" if "txtFornecedor" in expenses_df.columns else "fornecedor"
+    if expenses_df.empty or "txtCNPJCPF" not in expenses_df.columns or "txtDescricao" not in expenses_df.columns:
+        return []
+
+    by_length, checked_categories = build_cnae_rule_index(rules)
+
+    keys, _ = supplier_identity(expenses_df)
+    frame = pd.DataFrame({
+        "key": keys,
+        "category": expenses_df["txtDescricao"].to_numpy(),
+        "supplier": expenses_df[supplier_col].to_numpy(),
+        "deputy": expenses_df[deputy_col].to_numpy(),
+        "value": value_cents(expenses_df),
+        "rows": transaction_weights(expenses_df),
+    })
+    # Only companies (14-digit CNPJs) have a CNAE; CPFs are individuals
+    frame = frame[(keys >= CNPJ_KEY_RANGE[0]) & (keys < CNPJ_KEY_RANGE[1])]
+
+    pairs = frame.groupby(["key", "category"], sort=False).agg(
+        totalValue=("value", "sum"),
+        transactionCount=("rows", "sum"),
+        deputyCount=("deputy", "nunique"),
+    ).reset_index()
+    # Most frequent supplier name per pair (ties -> alphabetically first, like Series.mode)
+    names = (
+        frame.groupby(["key", "category", "supplier"]).size().rename("n").reset_index()
+        .sort_values(["n", "supplier"], ascending=[False, True])
+        .drop_duplicates(["key", "category"])
+        .rename(columns={"supplier": "supplierName"})
+    )
+    pairs = pairs.merge(names[["key", "category", "supplierName"]], on=["key", "category"], how="left")
+    pairs["categoryKey"] = pairs["category"].map(category_key)
+    pairs = pairs[pairs["categoryKey"].isin(checked_categories)]
+
+    reference = reference_df.copy()
+    reference["key"] = document_keys(normalize_document(reference["cnpj"]).str.zfill(14))
+    reference["cnae_principal"] = normalize_document(reference["cnae_principal"]).str.zfill(7)
+    reference = reference.drop_duplicates("key").set_index("key")
+    pairs = pairs[pairs["key"].isin(reference.index)]
+    pairs["cnae"] = reference["cnae_principal"].reindex(pairs["key"]).to_numpy()
+    pairs["cnpj"] = decode_document_keys(pairs["key"].to_numpy())
+
+    allowed = np.zeros(len(pairs), dtype=bool)
+    for length, keys in by_length.items():
+        allowed |= (pairs["categoryKey"] + "|" + pairs["cnae"].str[:length]).isin(keys).to_numpy()
+    flagged = pairs[~allowed & (pairs["cnae"] != "0000000")]
+
+    def reference_column(column):
+        if column not in reference.columns:
+            return [""] * len(flagged)
+        return reference[column].reindex(flagged["key"]).fillna("").astype(str).tolist()
+
+    mismatches = []
+    for row, razao, description, uf in zip(
+        flagged.itertuples(index=False),
+        reference_column("razao_social"),
+        reference_column("cnae_descricao"),
+        reference_column("uf"),
+    ):
+        mismatches.append({
+            "cnpj": row.cnpj,
+            "supplierName": str(row.supplierName),
+            "razaoSocial": razao,
+            "expenseCategory": str(row.category),
+            "cnaePrincipal": format_cnae(row.cnae, description),
+            "totalValue": to_reais(row.totalValue),
+            "transactionCount": weighted_count(row.transactionCount),
+            "deputyCount": int(row.deputyCount),
+            "reason": f"Atividade principal (CNAE {format_cnae(row.cnae)}) incompativel com a categoria de despesa",
+            "uf": uf,
+        })
+
+    print(f"  - Checked {len(pairs):,} (CNPJ, category) pairs against {len(reference):,} CNAE records")
+    return mismatches
+
+
+def generate_mismatches(mismatch_df, expenses_df=None, reference_df=None):
+    """
+    Generate mismatches.json with CNPJ activity mismatches.
+
+    Computed from the CNAE reference table when it is available; otherwise the
+    externally built mismatch_analysis.csv is passed through.
+    """
     print("\nGenerating mismatches.json...")
 
+    if reference_df is not None and not reference_df.empty and expenses_df is not None:
+        mismatches = compute_mismatches(expenses_df, reference_df)
+        mismatches.sort(key=lambda x: x["totalValue"], reverse=True)
+        print(f"  - Generated {len(mismatches)} mismatch records")
+        print(f"  - Total value: R$ {sum(m['totalValue'] for m in mismatches):,.2f}")
+        return mismatches
+
     if mismatch_df.empty:
         return []
 
@@ -861,6 +2404,1115 @@ def generate_mismatches(mismatch_df):
     return mismatches
 
 
+def _split_by_key(breakdown, keys, columns):
+    """
+    Slice a breakdown frame sorted by document key without per-supplier filtering.
+
+    Returns records(i), the list of records of keys[i]; the dicts are only built when
+    asked for, so a streamed shard holds one supplier's records at a time.
+    """
+    if breakdown is None or breakdown.empty:
+        return lambda i: []
+    sorted_keys = breakdown["key"].to_numpy()
+    starts = np.searchsorted(sorted_keys, keys, side="left")
+    ends = np.searchsorted(sorted_keys, keys, side="right")
+    values = [breakdown[column].tolist() for column in columns]
+
+    def records(i):
+        start, end = starts[i], ends[i]
+        return [dict(zip(columns, row)) for row in zip(*(v[start:end] for v in values))]
+
+    return records
+
+
+def generate_suppliers(supplier_index, top_n=500):
+    """
+    Generate the suppliers/ artifact from the CNPJ-grouped supplier index.
+
+    Profiles are sharded by the first two digits of the document so the frontend can
+    fetch a single supplier without downloading the whole set; index.json lists the
+    top_n suppliers by total value. Shards are generators that build their profiles
+    while save_json streams them, so they can be written only once.
+
+    Returns:
+        dict: {"index": {...}, "shards": {"00": <generator>, ...}, "summaries": [...],
+               "nameVariants": {cnpj: [name, ...]}}
+    """
+    print("\nGenerating suppliers/...")
+
+    profiles = supplier_index["profiles"]
+    if profiles.empty:
+        return {
+            "index": {"meta": {"totalSuppliers": 0, "shardCount": 0, "topN": top_n}, "top": []},
+            "shards": {}, "summaries": [], "nameVariants": {},
+        }
+
+    keys = profiles.index.to_numpy()
+    cnpjs = decode_document_keys(keys)
+    rows = profiles.to_dict("records")
+    names = _split_by_key(supplier_index["names"], keys, ["supplier", "transactionCount"])
+    deputies = _split_by_key(supplier_index["deputies"], keys, ["deputy", "value", "transactionCount"])
+    categories = _split_by_key(supplier_index["categories"], keys, ["category", "value", "transactionCount"])
+
+    def format_month(month):
+        return f"{int(month) // 100}-{int(month) % 100:02d}" if pd.notna(month) else None
+
+    def shard_profiles(positions):
+        for i in positions:
+            row = rows[i]
+            yield {
+                "cnpj": cnpjs[i],
+                "name": summaries_by_position[i]["name"],
+                "nameVariants": [
+                    {"name": str(v["supplier"]), "transactionCount": int(v["transactionCount"])}
+                    for v in names(i)
+                ],
+                "totalValue": to_reais(row["totalValue"]),
+                "transactionCount": int(row["transactionCount"]),
+                "deputyCount": int(row["deputyCount"]),
+                "deputies": [
+                    {"name": str(d["deputy"]), "value": to_reais(d["value"]), "transactionCount": int(d["transactionCount"])}
+                    for d in deputies(i)
+                ],
+                "categories": [
+                    {"category": str(c["category"]), "value": to_reais(c["value"]), "transactionCount": int(c["transactionCount"])}
+                    for c in categories(i)
+                ],
+                "firstMonth": format_month(row.get("firstMonth")),
+                "lastMonth": format_month(row.get("lastMonth")),
+            }
+
+    shard_positions = {}
+    summaries_by_position = []
+    name_variants = {}
+    for i, (cnpj, row) in enumerate(zip(cnpjs, rows)):
+        variants = [str(v["supplier"]) for v in names(i)]
+        shard = cnpj[:2]
+        shard_positions.setdefault(shard, []).append(i)
+        name_variants[cnpj] = variants
+        summaries_by_position.append({
+            "cnpj": cnpj,
+            "name": variants[0] if variants else "",
+            "totalValue": to_reais(row["totalValue"]),
+            "transactionCount": int(row["transactionCount"]),
+            "deputyCount": int(row["deputyCount"]),
+            "shard": shard,
+        })
+
+    summaries = sorted(summaries_by_position, key=lambda x: x["totalValue"], reverse=True)
+    index = {
+        "meta": {
+            "totalSuppliers": len(summaries),
+            "shardCount": len(shard_positions),
+            "topN": top_n,
+        },
+        "top": summaries[:top_n],
+    }
+
+    print(f"  - Indexed {len(summaries):,} supplier profiles in {len(shard_positions)} shards")
+    return {
+        "index": index,
+        "shards": {shard: shard_profiles(positions) for shard, positions in shard_positions.items()},
+        "summaries": summaries,
+        "nameVariants": name_variants,
+    }
+
+
+# Search index parameters: word tokens are indexed by prefixes of SEARCH_MIN_PREFIX..SEARCH_MAX_PREFIX
+# characters; CNPJ/CPF numbers by the prefix lengths below (8 = CNPJ root). Longer queries are
+# resolved with the longest indexed prefix and verified against the entity label client-side.
+SEARCH_MIN_PREFIX = 2
+SEARCH_MAX_PREFIX = 5
+SEARCH_DOC_PREFIXES = (4, 6, 8)
+SEARCH_STOPWORDS = {"de", "da", "do", "das", "dos", "e", "ltda", "me", "epp", "sa", "s", "a", "eireli", "cia"}
+
+
+def fold_text(text):
+    """Lowercase and strip accents so 'União' and 'uniao' produce the same tokens."""
+    normalized = unicodedata.normalize("NFKD", str(text))
+    return normalized.encode("ascii", "ignore").decode("ascii").lower()
+
+
+def _search_keys(label, extra_terms=(), document=""):
+    """Prefix keys for one entity: word prefixes of its label/terms plus document-number prefixes."""
+    keys = set()
+    for text in (label, *extra_terms):
+        for token in re.findall(r"[a-z0-9]+", fold_text(text)):
+            if token in SEARCH_STOPWORDS or len(token) < SEARCH_MIN_PREFIX:
+                continue
+            for length in range(SEARCH_MIN_PREFIX, min(len(token), SEARCH_MAX_PREFIX) + 1):
+                keys.add(token[:length])
+    for length in SEARCH_DOC_PREFIXES:
+        if len(document) >= length:
+            keys.add("#" + document[:length])
+    return keys
+
+
+def generate_search_index(deputies, suppliers):
+    """
+    Generate search-index.json: an accent-folded prefix index over deputies and suppliers.
+
+    Entities are ordered deputies first, then suppliers by total value, so posting lists
+    (delta-encoded entity positions) are already in ranking order. Document-number keys
+    are stored with a '#' prefix to keep them apart from word prefixes. Stopwords are not
+    indexed; meta.stopwords lists them so the client skips them in queries too.
+    """
+    print("\nGenerating search-index.json...")
+
+    entities = []
+    postings = {}
+
+    def add(entity, keys):
+        position = len(entities)
+        entities.append(entity)
+        for key in keys:
+            postings.setdefault(key, []).append(position)
+
+    for d in deputies:
+        add(["d", d["id"], d["name"], f"{d['party']}-{d['uf']}"], _search_keys(d["name"], (d["party"], d["uf"])))
+
+    for p in suppliers["summaries"]:
+        variants = suppliers["nameVariants"][p["cnpj"]][1:]
+        add(["s", p["cnpj"], p["name"], p["deputyCount"]], _search_keys(p["name"], variants, p["cnpj"]))
+
+    index = {
+        "version": 1,
+        "meta": {
+            "entityCount": len(entities),
+            "keyCount": len(postings),
+            "minPrefix": SEARCH_MIN_PREFIX,
+            "maxPrefix": SEARCH_MAX_PREFIX,
+            "docPrefixes": list(SEARCH_DOC_PREFIXES),
+            "stopwords": sorted(SEARCH_STOPWORDS),
+        },
+        "entities": entities,
+        "postings": {
+            key: np.diff(positions, prepend=0).tolist()
+            for key, positions in sorted(postings.items())
+        },
+    }
+
+    print(f"  - Indexed {len(entities):,} entities under {len(postings):,} prefix keys")
+    return index
+
+
+# Deputy metrics summarized in distributions.json: output key -> path into the deputy record
+DISTRIBUTION_METRICS = {
+    "totalSpending": ("totalSpending",),
+    "avgTicket": ("avgTicket",),
+    "hhi": ("hhi", "value"),
+    "benfordChi2": ("benford", "chi2"),
+    "roundValuePct": ("roundValuePct",),
+    "riskScore": ("riskScore",),
+}
+DISTRIBUTION_BINS = 20
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+
+def quantile_sketch(values, relative_accuracy=SKETCH_RELATIVE_ACCURACY):
+    """
+    Log-bucketed quantile sketch (DDSketch-style) of a value array.
+
+    Bucket i holds values in (gamma^(i-1), gamma^i], so any quantile read back is within
+    relative_accuracy of the true value. Sketches with the same accuracy merge by adding
+    bucket counts (merge_sketches). Negative values go to a mirrored store, zeros to a counter.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+
+    def store(magnitudes):
+        if len(magnitudes) == 0:
+            return {"offset": 0, "counts": []}
+        index = np.ceil(np.log(magnitudes) / np.log(gamma)).astype(np.int64)
+        offset = int(index.min())
+        return {"offset": offset, "counts": np.bincount(index - offset).tolist()}
+
+    return {
+        "relativeAccuracy": relative_accuracy,
+        "count": int(len(values)),
+        "zeroCount": int((values == 0).sum()),
+        "positive": store(values[values > 0]),
+        "negative": store(-values[values < 0]),
+    }
+
+
+def merge_sketches(sketches):
+    """Merge quantile sketches built with the same relative accuracy."""
+    sketches = list(sketches)
+
+    def merge_store(stores):
+        stores = [st for st in stores if st["counts"]]
+        if not stores:
+            return {"offset": 0, "counts": []}
+        offset = min(st["offset"] for st in stores)
+        counts = np.zeros(max(st["offset"] + len(st["counts"]) for st in stores) - offset, dtype=np.int64)
+        for st in stores:
+            counts[st["offset"] - offset:st["offset"] - offset + len(st["counts"])] += st["counts"]
+        return {"offset": offset, "counts": counts.tolist()}
+
+    return {
+        "relativeAccuracy": sketches[0]["relativeAccuracy"],
+        "count": sum(sk["count"] for sk in sketches),
+        "zeroCount": sum(sk["zeroCount"] for sk in sketches),
+        "positive": merge_store([sk["positive"] for sk in sketches]),
+        "negative": merge_store([sk["negative"] for sk in sketches]),
+    }
+
+
+def sketch_quantile(sketch, q):
+    """Approximate q-quantile (0-1) read from a sketch."""
+    if sketch["count"] == 0:
+        return 0.0
+    gamma = (1 + sketch["relativeAccuracy"]) / (1 - sketch["relativeAccuracy"])
+    rank = q * (sketch["count"] - 1)
+
+    # Ascending order: most negative first, then zeros, then positives
+    negative = np.asarray(sketch["negative"]["counts"], dtype=np.int64)
+    negative_total = int(negative.sum())
+    if rank < negative_total:
+        cumulative = np.cumsum(negative[::-1])
+        i = len(negative) - 1 - int(np.searchsorted(cumulative, rank, side="right"))
+        return float(-2 * gamma ** (i + sketch["negative"]["offset"]) / (gamma + 1))
+    rank -= negative_total
+    if rank < sketch["zeroCount"]:
+        return 0.0
+    rank -= sketch["zeroCount"]
+    cumulative = np.cumsum(sketch["positive"]["counts"])
+    i = min(int(np.searchsorted(cumulative, rank, side="right")), len(cumulative) - 1)
+    return float(2 * gamma ** (i + sketch["positive"]["offset"]) / (gamma + 1))
+
+
+def _summary_stats(values):
+    """min/max/mean, population standard deviation and quartiles of a numeric Series."""
+    quantiles = values.quantile([0.25, 0.5, 0.75, 0.9]).to_numpy()
+    return {
+        "count": int(values.count()),
+        "min": round(float(values.min()), 4),
+        "max": round(float(values.max()), 4),
+        "mean": round(float(values.mean()), 4),
+        "std": round(float(values.std(ddof=0)), 4),
+        "p25": round(float(quantiles[0]), 4),
+        "median": round(float(quantiles[1]), 4),
+        "p75": round(float(quantiles[2]), 4),
+        "p90": round(float(quantiles[3]), 4),
+    }
+
+
+def deputy_metric_distributions(deputies, bins=DISTRIBUTION_BINS):
+    """
+    Histograms, group summaries and percentile ranks of the DISTRIBUTION_METRICS.
+
+    Percentile ranks are the share of deputies (overall, same party, same UF) whose value
+    is less than or equal to the deputy's, stored column-wise in the order of ranks.ids.
+
+    Returns:
+        tuple: (metrics, ranks) as stored in distributions.json
+    """
+    frame = pd.DataFrame({
+        "id": [d["id"] for d in deputies],
+        "party": [d["party"] for d in deputies],
+        "uf": [d["uf"] for d in deputies],
+    })
+    for metric, path in DISTRIBUTION_METRICS.items():
+        values = []
+        for d in deputies:
+            value = d
+            for key in path:
+                value = value[key]
+            values.append(value)
+        frame[metric] = pd.Series(values, dtype=float)
+
+    metrics = {}
+    ranks = {"ids": frame["id"].tolist()}
+    for metric in DISTRIBUTION_METRICS:
+        values = frame[metric]
+        if values.count() == 0:
+            continue
+        # Fixed-width bins from 0 (or a negative minimum) to the maximum
+        low = min(0.0, float(values.min()))
+        high = float(values.max()) if values.max() > low else low + 1
+        counts, edges = np.histogram(values.dropna(), bins=bins, range=(low, high))
+
+        groups = {}
+        for group_col, key in (("party", "byParty"), ("uf", "byUf")):
+            grouped = frame.groupby(group_col)[metric]
+            stats = grouped.agg(["count", "mean", "min", "max"])
+            quantiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+            groups[key] = {
+                str(group): {
+                    "count": int(stats.at[group, "count"]),
+                    "mean": round(float(stats.at[group, "mean"]), 4),
+                    "p25": round(float(quantiles.at[group, 0.25]), 4),
+                    "median": round(float(quantiles.at[group, 0.5]), 4),
+                    "p75": round(float(quantiles.at[group, 0.75]), 4),
+                }
+                for group in stats.index
+            }
+
+        metrics[metric] = {
+            **_summary_stats(values),
+            "histogram": {
+                "edges": [round(float(e), 4) for e in edges],
+                "counts": counts.tolist(),
+            },
+            **groups,
+        }
+        ranks[metric] = {
+            "overall": (values.rank(method="max", pct=True) * 100).round(1).tolist(),
+            "party": (frame.groupby("party")[metric].rank(method="max", pct=True) * 100).round(1).tolist(),
+            "uf": (frame.groupby("uf")[metric].rank(method="max", pct=True) * 100).round(1).tolist(),
+        }
+    return metrics, ranks
+
+
+def generate_distributions(deputies, expenses_df, bins=DISTRIBUTION_BINS):
+    """
+    Generate distributions.json: deputy-metric histograms, group summaries, percentile ranks
+    (deputy_metric_distributions) and transaction value sketches, so charts do not have to
+    walk every deputy.
+    """
+    print("\nGenerating distributions.json...")
+    metrics, ranks = deputy_metric_distributions(deputies, bins)
+
+    # Transaction values: one sketch per year and per category; the overall sketch is their merge
+    sketches = {"byYear": {}, "byCategory": {}}
+    value_col = "vlrLiquido" if "vlrLiquido" in expenses_df.columns else "vlrDocumento"
+    if not expenses_df.empty and value_col in expenses_df.columns:
+        for group_col, key in (("numAno", "byYear"), ("txtDescricao", "byCategory")):
+            if group_col in expenses_df.columns:
+                for group, values in expenses_df.groupby(group_col)[value_col]:
+                    sketches[key][str(group)] = quantile_sketch(values.to_numpy())
+        parts = list(sketches["byYear"].values()) or [quantile_sketch(expenses_df[value_col].to_numpy())]
+        overall = merge_sketches(parts)
+    else:
+        overall = quantile_sketch([])
+    sketches["overall"] = overall
+
+    distributions = {
+        "meta": {
+            "deputyCount": len(deputies),
+            "bins": bins,
+            "metrics": list(metrics),
+            "sketchRelativeAccuracy": SKETCH_RELATIVE_ACCURACY,
+        },
+        "metrics": metrics,
+        "ranks": ranks,
+        "transactionValues": {
+            "quantiles": {
+                f"p{int(q * 100)}": round(sketch_quantile(overall, q), 2) for q in (0.25, 0.5, 0.75, 0.9, 0.99)
+            },
+            "sketches": sketches,
+        },
+    }
+
+    print(f"  - {len(metrics)} metrics x {bins} bins, ranks for {len(deputies):,} deputies")
+    print(f"  - Transaction value sketches: {len(sketches['byYear'])} years, {len(sketches['byCategory'])} categories")
+    return distributions
+
+
+# Party/UF supplier-overlap networks (party-network.json, region-network.json)
+UF_REGIONS = {
+    "Norte": ("AC", "AP", "AM", "PA", "RO", "RR", "TO"),
+    "Nordeste": ("AL", "BA", "CE", "MA", "PB", "PE", "PI", "RN", "SE"),
+    "Centro-Oeste": ("DF", "GO", "MS", "MT"),
+    "Sudeste": ("ES", "MG", "RJ", "SP"),
+    "Sul": ("PR", "RS", "SC"),
+}
+UF_TO_REGION = {uf: region for region, ufs in UF_REGIONS.items() for uf in ufs}
+NETWORK_MIN_SHARED = {"party": 3, "uf": 5}  # Pairs below this many shared suppliers are dropped
+
+
+def group_supplier_incidence(expenses_df, deputies, field):
+    """
+    Group x supplier spending matrix (centavos) for the published deputies, built with one bincount.
+
+    Suppliers are the resolved supplier entities (rows with no supplier identity are
+    skipped); each deputy belongs to the group given by its record's field ("party" or "uf").
+
+    Returns:
+        (group labels, matrix of shape (groups, suppliers) with the summed centavos)
+    """
+    deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in expenses_df.columns else "nomeParlamentar"
+
+    labels = sorted({d[field] for d in deputies})
+    if expenses_df.empty or not labels:
+        return labels, np.zeros((len(labels), 0))
+
+    group_of = {d["name"]: labels.index(d[field]) for d in deputies}
+    groups = expenses_df[deputy_col].map(group_of)
+    _, entities = supplier_identity(expenses_df)
+    keep = groups.notna().to_numpy() & (entities != SUPPLIER_KEY_MISSING)
+    supplier_codes, suppliers = pd.factorize(entities[keep])
+    group_codes = groups[keep].to_numpy(dtype=np.int64)
+    n_suppliers = len(suppliers)
+    values = np.bincount(
+        group_codes * n_suppliers + supplier_codes,
+        weights=value_cents(expenses_df)[keep].astype(float),
+        minlength=len(labels) * n_suppliers,
+    )
+    return labels, values.reshape(len(labels), n_suppliers)
+
+
+def shared_supplier_matrices(values):
+    """
+    Shared-supplier counts and values between every pair of groups in one matrix product.
+
+    With B the 0/1 incidence (group spent > 0 at supplier) and V the values, stacking
+    [B; V] @ B.T gives B @ B.T (suppliers shared by i and j) and V @ B.T (what i spent
+    at suppliers j also uses); the shared value of a pair is V @ B.T plus its transpose.
+    Values are whole centavos, so the float products are exact (below 2**53) in any
+    summation order.
+    """
+    incidence = (values > 0).astype(float)
+    product = np.vstack([incidence, values]) @ incidence.T
+    n = len(values)
+    counts = np.rint(product[:n]).astype(int)
+    spent_at_shared = product[n:]
+    return counts, spent_at_shared + spent_at_shared.T, incidence.sum(axis=1).astype(int)
+
+
+def _group_summaries(deputies, field, labels, supplier_counts):
+    """Deputy count, total spending, mean HHI and supplier count per group label."""
+    summaries = []
+    for i, label in enumerate(labels):
+        members = [d for d in deputies if d[field] == label]
+        summaries.append({
+            field: label,
+            "deputyCount": len(members),
+            "totalSpending": to_reais(sum(round(d["totalSpending"] * 100) for d in members)),
+            "avgHHI": round(sum(d["hhi"]["value"] for d in members) / len(members), 2) if members else 0.0,
+            "supplierCount": int(supplier_counts[i]),
+        })
+    return summaries
+
+
+def _pair_connections(labels, counts, shared_values, min_shared, names=("group1", "group2")):
+    """Upper-triangle pairs with at least min_shared suppliers, most shared first."""
+    rows, cols = np.triu_indices(len(labels), k=1)
+    keep = counts[rows, cols] >= min_shared
+    connections = [
+        {
+            names[0]: labels[i],
+            names[1]: labels[j],
+            "sharedSuppliers": int(counts[i, j]),
+            "sharedValue": to_reais(np.rint(shared_values[i, j])),
+        }
+        for i, j in zip(rows[keep], cols[keep])
+    ]
+    connections.sort(key=lambda c: (-c["sharedSuppliers"], -c["sharedValue"], c[names[0]], c[names[1]]))
+    return connections
+
+
+def generate_party_network(expenses_df, deputies):
+    """Generate party-network.json: per-party stats and party pairs sharing suppliers."""
+    print("\nGenerating party-network.json...")
+    labels, values = group_supplier_incidence(expenses_df, deputies, "party")
+    counts, shared_values, supplier_counts = shared_supplier_matrices(values)
+
+    parties = _group_summaries(deputies, "party", labels, supplier_counts)
+    parties.sort(key=lambda p: -p["totalSpending"])
+    connections = _pair_connections(labels, counts, shared_values, NETWORK_MIN_SHARED["party"], ("party1", "party2"))
+
+    print(f"  - {len(labels)} parties x {values.shape[1]:,} suppliers, {len(connections)} connections")
+    return {
+        "meta": {"suppliers": int(values.shape[1]), "minShared": NETWORK_MIN_SHARED["party"], "supplierKey": "entity"},
+        "parties": parties,
+        "connections": connections,
+    }
+
+
+def generate_region_network(expenses_df, deputies):
+    """
+    Generate region-network.json: UF and region stats, UF pairs sharing suppliers and
+    region-to-region totals (the UF matrix rolled up to regions before the product).
+    """
+    print("\nGenerating region-network.json...")
+    labels, values = group_supplier_incidence(expenses_df, deputies, "uf")
+    counts, shared_values, supplier_counts = shared_supplier_matrices(values)
+    region_of = [UF_TO_REGION.get(uf, "Desconhecido") for uf in labels]
+
+    states = _group_summaries(deputies, "uf", labels, supplier_counts)
+    for state, region in zip(states, region_of):
+        state["region"] = region
+    states.sort(key=lambda s: -s["totalSpending"])
+
+    connections = _pair_connections(labels, counts, shared_values, NETWORK_MIN_SHARED["uf"], ("state1", "state2"))
+    for c in connections:
+        c["region1"] = UF_TO_REGION.get(c["state1"], "Desconhecido")
+        c["region2"] = UF_TO_REGION.get(c["state2"], "Desconhecido")
+        c["crossRegion"] = c["region1"] != c["region2"]
+
+    # Regions: sum the UF rows of the value matrix, then the same product one level up
+    region_labels = sorted(set(region_of))
+    rollup = np.zeros((len(region_labels), len(labels)))
+    rollup[[region_labels.index(r) for r in region_of], np.arange(len(labels))] = 1.0
+    region_counts, region_shared, region_suppliers = shared_supplier_matrices(rollup @ values)
+    regions = []
+    for i, region in enumerate(region_labels):
+        members = [d for d in deputies if UF_TO_REGION.get(d["uf"], "Desconhecido") == region]
+        regions.append({
+            "region": region,
+            "deputyCount": len(members),
+            "totalSpending": to_reais(sum(round(d["totalSpending"] * 100) for d in members)),
+            "avgHHI": round(sum(d["hhi"]["value"] for d in members) / len(members), 2) if members else 0.0,
+            "supplierCount": int(region_suppliers[i]),
+            "states": sorted(uf for uf, r in zip(labels, region_of) if r == region),
+        })
+    regions.sort(key=lambda r: -r["totalSpending"])
+    cross_region = _pair_connections(region_labels, region_counts, region_shared, 1, ("region1", "region2"))
+
+    cross_count = sum(1 for c in connections if c["crossRegion"])
+    print(f"  - {len(labels)} UFs x {values.shape[1]:,} suppliers, {len(connections)} connections ({cross_count} cross-region)")
+    return {
+        "meta": {
+            "suppliers": int(values.shape[1]),
+            "minShared": NETWORK_MIN_SHARED["uf"],
+            "supplierKey": "entity",
+            "crossRegionConnections": cross_count,
+        },
+        "states": states,
+        "regions": regions,
+        "connections": connections,
+        "crossRegion": cross_region,
+    }
+
+
+# Parliamentary amendments (emendas.json) from the Portal da Transparência dump (2014 on), either
+# as downloaded (';'-separated, Latin-1, "1.234,56" values) or re-saved as a plain UTF-8 CSV.
+# The file is parsed in typed chunks and each chunk is reduced to per-author sums right away, so
+# memory follows the number of (author, year/type/function/municipality) pairs, not rows.
+EMENDAS_FILE = "emendas_parlamentares.csv"
+EMENDAS_CHUNK_ROWS = 250_000
+EMENDAS_COMPACT_ROWS = 1_000_000  # Partial group rows held before they are summed again
+EMENDAS_TOP_MUNICIPALITIES = 10
+EMENDAS_TOP_AUTHORS = 5
+# Canonical column -> accepted headers (accent-folded, lowercase)
+EMENDAS_COLUMNS = {
+    "author": ("nome do autor da emenda", "autor", "nomeautor"),
+    "year": ("ano da emenda", "ano"),
+    "type": ("tipo de emenda", "tipo"),
+    "function": ("nome funcao", "funcao"),
+    "municipalityCode": ("codigo municipio ibge", "codigo ibge", "codmunicipioibge"),
+    "municipality": ("municipio",),
+    "uf": ("uf",),
+    "empenhado": ("valor empenhado", "valorempenhado"),
+    "pago": ("valor pago", "valorpago"),
+}
+EMENDAS_REQUIRED = ("author", "year", "empenhado")
+EMENDAS_VALUE_COLUMNS = ("empenhado", "pago")
+EMENDAS_TEXT_COLUMNS = ("author", "type", "function", "municipalityCode", "municipality", "uf")
+EMENDAS_BREAKDOWNS = ("year", "type", "function", "place")  # Per-author sums kept while reading
+
+
+def _emendas_read_options(path):
+    """read_csv options and {header: canonical column} for the emendas file, from its header line."""
+    with open(path, "rb") as f:
+        header = f.readline()
+    try:
+        text, encoding = header.decode("utf-8-sig"), "utf-8-sig"
+    except UnicodeDecodeError:
+        text, encoding = header.decode("latin-1"), "latin-1"
+    options = {"encoding": encoding, "sep": ","}
+    if text.count(";") > text.count(","):
+        options.update(sep=";", decimal=",", thousands=".")
+
+    aliases = {alias: column for column, names in EMENDAS_COLUMNS.items() for alias in names}
+    columns = {}
+    for name in text.rstrip("\r\n").split(options["sep"]):
+        name = name.strip().strip('"')
+        column = aliases.get(re.sub(r"\s+", " ", fold_text(name)).strip())
+        if column and column not in columns.values():
+            columns[name] = column
+    return options, columns
+
+
+def _strip_categories(series):
+    """A categorical column with stripped category text (merging categories that become equal)."""
+    codes, categories = pd.factorize(series.cat.categories.astype(str).str.strip())
+    return pd.Categorical.from_codes(np.append(codes, -1)[series.cat.codes.to_numpy()], categories)
+
+
+def _sum_breakdown(frame, by):
+    """Value sums per (author, by) of (partial) emendas rows."""
+    return (
+        frame.groupby(["author", by], sort=False, observed=True)[["empenhado", "pago", "count"]].sum()
+        .reset_index().astype({"author": object, by: object if by != "year" else np.int64})
+    )
+
+
+def read_emendas(path, chunk_rows=None):
+    """
+    Per-author breakdowns (centavos) of the emendas file, read in typed chunks of chunk_rows.
+
+    Text columns are parsed as categoricals and the value columns as float64; each chunk
+    is converted to centavos and summed per (author, year), (author, type), (author,
+    function) and (author, municipality), so each breakdown is bounded by the authors
+    times its values whatever the row count. Partial sums are summed again once they
+    pass EMENDAS_COMPACT_ROWS rows.
+
+    Returns:
+        ({breakdown: frame}, {municipality key: label}, rows read), or None when a
+        required column is missing
+    """
+    options, columns = _emendas_read_options(path)
+    missing = [c for c in EMENDAS_REQUIRED if c not in columns.values()]
+    if missing:
+        print(f"  ! Warning: {path.name} has no {', '.join(missing)} column; emendas skipped")
+        return None
+
+    numeric_headers = [h for h, c in columns.items() if c in (*EMENDAS_VALUE_COLUMNS, "year")]
+    reader = pd.read_csv(
+        path,
+        usecols=list(columns),
+        dtype={h: (np.float64 if h in numeric_headers else "category") for h in columns},
+        keep_default_na=False,
+        na_values={h: [""] for h in numeric_headers},
+        chunksize=chunk_rows or EMENDAS_CHUNK_ROWS,
+        **options,
+    )
+
+    partials = {by: [] for by in EMENDAS_BREAKDOWNS}
+    partial_rows = dict.fromkeys(EMENDAS_BREAKDOWNS, 0)
+    labels = {}
+    rows = 0
+    for chunk in reader:
+        chunk = chunk.rename(columns=columns)
+        rows += len(chunk)
+        blank = pd.Categorical.from_codes(np.zeros(len(chunk), dtype=np.int8), [""])
+        text = {c: _strip_categories(chunk[c]) if c in chunk.columns else blank for c in EMENDAS_TEXT_COLUMNS}
+        code, name, uf = (np.asarray(text[c], dtype=object) for c in ("municipalityCode", "municipality", "uf"))
+        # Municipality key: the IBGE code, else "name|UF"; state-level and national rows have neither
+        place = np.where(code != "", code, np.where(name != "", name + "|" + uf, ""))
+        frame = pd.DataFrame({
+            "author": text["author"],
+            "year": chunk["year"].fillna(0).astype(np.int64).to_numpy(),
+            "type": text["type"],
+            "function": text["function"],
+            "place": pd.Categorical(place),
+        })
+        for c in EMENDAS_VALUE_COLUMNS:
+            frame[c] = to_centavos(chunk[c]) if c in chunk.columns else np.zeros(len(chunk), dtype=np.int64)
+        frame["count"] = 1
+
+        local = place != ""
+        for i, key in pd.Series(place[local], index=np.flatnonzero(local)).drop_duplicates().items():
+            if key not in labels:
+                labels[key] = {"code": code[i] or None, "name": name[i], "uf": uf[i]}
+
+        for by in EMENDAS_BREAKDOWNS:
+            partial = _sum_breakdown(frame[local] if by == "place" else frame, by)
+            partials[by].append(partial)
+            partial_rows[by] += len(partial)
+            if partial_rows[by] > EMENDAS_COMPACT_ROWS:
+                partials[by] = [_sum_breakdown(pd.concat(partials[by], ignore_index=True), by)]
+                partial_rows[by] = len(partials[by][0])
+
+    tables = {}
+    for by in EMENDAS_BREAKDOWNS:
+        if partials[by]:
+            tables[by] = _sum_breakdown(pd.concat(partials[by], ignore_index=True), by)
+        else:
+            tables[by] = pd.DataFrame({"author": [], by: [], "empenhado": [], "pago": [], "count": []})
+    return tables, labels, rows
+
+
+def generate_emendas(deputies, path=None):
+    """
+    Generate emendas.json and add the combined CEAP + emendas summary to each deputy.
+
+    Amendment authors are joined to the deputies on the accent-folded name, as the
+    spotlight specs are. Per-deputy aggregates cover every matched author; the
+    municipality list covers all authors (benches and senators included) and is
+    streamed. Deputies get an "emendas" block (zeros when they authored none).
+
+    Returns:
+        dict: {"output": artifact, "authors": {folded author: aggregates}}, or None
+        without an emendas file
+    """
+    path = DATA_DIR / EMENDAS_FILE if path is None else path
+    print("\nGenerating emendas.json...")
+    if not path.exists():
+        print(f"  ! Warning: {path} not found (emendas skipped)")
+        return None
+
+    start = time.perf_counter()
+    result = read_emendas(path)
+    if result is None:
+        return None
+    tables, place_labels, rows = result
+    print(f"  - Read {rows:,} amendment rows in {time.perf_counter() - start:.2f}s "
+          f"({len(tables['place']):,} author x municipality pairs)")
+
+    # Author names are folded once per distinct spelling; spellings of one name are merged
+    raw_authors = pd.unique(np.concatenate([t["author"].to_numpy(dtype=object) for t in tables.values()]))
+    folded = {a: fold_text(a).strip() for a in raw_authors}
+    display_names = {}
+    for author in raw_authors:
+        display_names.setdefault(folded[author], author)
+    for table in tables.values():
+        table["author"] = table["author"].map(folded)
+    records = {fold_text(d["name"]).strip(): d for d in deputies}
+
+    def grouped(frame, keys, sort_by=None):
+        """{first key: [records]} of the value sums per keys, optionally largest first."""
+        table = frame.groupby(keys, sort=True)[["empenhado", "pago", "count"]].sum().reset_index()
+        if sort_by:
+            table = table.sort_values([keys[0], sort_by, keys[1]], ascending=[True, False, True])
+        split = {}
+        for record in table.to_dict("records"):
+            split.setdefault(record[keys[0]], []).append(record)
+        return split
+
+    def amounts(r):
+        return {"empenhado": to_reais(r["empenhado"]), "pago": to_reais(r["pago"]), "count": int(r["count"])}
+
+    by_author = tables["year"].groupby("author")[["empenhado", "pago", "count"]].sum()
+    by_year = grouped(tables["year"], ["author", "year"])
+    by_type = grouped(tables["type"], ["author", "type"])
+    by_function = grouped(tables["function"], ["author", "function"])
+    author_places = grouped(tables["place"], ["author", "place"], sort_by="empenhado")
+
+    authors_out = {}
+    for author, r in zip(by_author.index, by_author.to_dict("records")):
+        places = author_places.get(author, [])
+        authors_out[author] = {
+            "name": str(display_names.get(author, author)),
+            **amounts(r),
+            "municipalityCount": len(places),
+            "byYear": [{"year": int(y["year"]), **amounts(y)} for y in by_year.get(author, []) if y["year"]],
+            "byType": [{"type": str(t["type"]), **amounts(t)} for t in by_type.get(author, []) if str(t["type"])],
+            "byFunction": [
+                {"function": str(f["function"]), **amounts(f)} for f in by_function.get(author, []) if str(f["function"])
+            ],
+            "topMunicipalities": [
+                {**place_labels[p["place"]], **amounts(p)} for p in places[:EMENDAS_TOP_MUNICIPALITIES]
+            ],
+        }
+
+    deputy_rows = []
+    for d in deputies:
+        author = authors_out.get(fold_text(d["name"]).strip())
+        ceap = d.get("totalSpending", 0.0)
+        empenhado = author["empenhado"] if author else 0.0
+        d["emendas"] = {
+            "empenhado": empenhado,
+            "pago": author["pago"] if author else 0.0,
+            "count": author["count"] if author else 0,
+            "municipalityCount": author["municipalityCount"] if author else 0,
+            "combinedTotal": round(ceap + empenhado, 2),
+            "ratioToCeap": round(empenhado / ceap, 1) if ceap > 0 else None,
+        }
+        if author:
+            deputy_rows.append(
+                {"id": d["id"], **author, "name": d["name"], "party": d["party"], "uf": d["uf"], "ceapTotal": ceap}
+            )
+    deputy_rows.sort(key=lambda r: r["empenhado"], reverse=True)
+
+    place_totals = (
+        tables["place"].groupby("place")[["empenhado", "pago", "count"]].sum()
+        .sort_values("empenhado", ascending=False, kind="stable")
+    )
+    place_authors = grouped(tables["place"], ["place", "author"], sort_by="empenhado")
+
+    def municipalities():
+        for place, r in zip(place_totals.index, place_totals.to_dict("records")):
+            authors_here = place_authors[place]
+            yield {
+                **place_labels[place],
+                **amounts(r),
+                "authorCount": len(authors_here),
+                "topAuthors": [
+                    {
+                        "name": authors_out[a["author"]]["name"],
+                        "deputyId": records[a["author"]]["id"] if a["author"] in records else None,
+                        "empenhado": to_reais(a["empenhado"]),
+                    }
+                    for a in authors_here[:EMENDAS_TOP_AUTHORS]
+                ],
+            }
+
+    unmatched = by_author[~by_author.index.isin(list(records))].sort_values("empenhado", ascending=False)
+    years = sorted(y for y in tables["year"]["year"].unique() if y)
+    total = by_author[["empenhado", "pago"]].sum()
+    meta = {
+        "source": path.name,
+        "rowCount": rows,
+        "firstYear": int(years[0]) if years else None,
+        "lastYear": int(years[-1]) if years else None,
+        "totalEmpenhado": to_reais(total["empenhado"]),
+        "totalPago": to_reais(total["pago"]),
+        "authorCount": len(by_author),
+        "matchedDeputies": len(deputy_rows),
+        "unmatchedAuthors": len(unmatched),
+        "unmatchedExamples": [authors_out[a]["name"] for a in unmatched.index[:EMENDAS_TOP_AUTHORS]],
+        "municipalityCount": len(place_totals),
+        "joinKey": "folded author name",
+    }
+
+    print(f"  - {len(by_author):,} authors: {len(deputy_rows)} matched to deputies, {len(unmatched):,} unmatched")
+    print(f"  - R$ {meta['totalEmpenhado']:,.2f} committed across {len(place_totals):,} municipalities")
+    return {
+        "output": {"meta": meta, "deputies": deputy_rows, "municipalities": municipalities()},
+        "authors": authors_out,
+    }
+
+
+def load_spotlight_specs(spec_dir=None):
+    """Spotlight specs from SPOTLIGHT_SPEC_DIR, sorted by file name."""
+    spec_dir = SPOTLIGHT_SPEC_DIR if spec_dir is None else spec_dir
+    specs = []
+    if not spec_dir.exists():
+        return specs
+    for path in sorted(spec_dir.glob("*.json")):
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+        spec.setdefault("id", path.stem)
+        specs.append(spec)
+    return specs
+
+
+def _window_bounds(spec):
+    """(first, last) month as YYYYMM ints from the spec's window; open ends are unbounded."""
+    window = spec.get("window") or {}
+    first = int(str(window["from"]).replace("-", "")) if window.get("from") else 0
+    last = int(str(window["to"]).replace("-", "")) if window.get("to") else 999999
+    return first, last
+
+
+def _set_path(record, path, value):
+    """Set a dotted path ('benford.chi2') on nested dicts, creating levels as needed."""
+    *parents, leaf = path.split(".")
+    for key in parents:
+        record = record.setdefault(key, {})
+    record[leaf] = value
+
+
+def _get_path(record, path):
+    for key in path.split("."):
+        if not isinstance(record, dict) or key not in record:
+            return None
+        record = record[key]
+    return record
+
+
+def generate_spotlights(specs, expenses_df, deputies, supplier_index, emendas=None, top_n=3, rules=None):
+    """
+    Build spotlights/<id>.json for every spec from one grouped pass over the expenses.
+
+    A spec names the deputies ({key: name}), a month window and focus supplier CNPJs.
+    The rows of every (spec, deputy) slice are tagged with one key and run through
+    compute_deputy_signals together, so totals, HHI and Benford counts for all
+    spotlights come out of the same grouped pass; supplier totals and focus suppliers
+    are one more groupby each. Names, party/UF and CNPJs come from the deputy records
+    and the supplier index. With emendas (generate_emendas' authors) the deputies'
+    emendas totals, yearly series and the scale section are refreshed as well. Other
+    editorial sections (narrative, investigation, emendas details) are kept from the
+    previously published file.
+
+    Returns:
+        {spotlight id: spotlight dict}
+    """
+    print("\nGenerating spotlights/...")
+    spotlights = {}
+    if not specs or expenses_df.empty:
+        print("  - No spotlight specs")
+        return spotlights
+
+    deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in expenses_df.columns else "nomeParlamentar"
+
+    names = expenses_df[deputy_col]
+    folded_names = {fold_text(n).strip(): n for n in names.dropna().unique()}
+    records = {fold_text(d["name"]).strip(): d for d in deputies}
+    if "numAno" in expenses_df.columns and "numMes" in expenses_df.columns:
+        months = year_month(expenses_df)  # undated rows fall outside every window
+    else:
+        months = None
+
+    # Tag the rows of each (spec, deputy) slice; slices of different specs may overlap
+    row_indices, row_keys, members = [], [], {}
+    for spec in specs:
+        first, last = _window_bounds(spec)
+        in_window = np.ones(len(expenses_df), dtype=bool) if months is None else (months >= first) & (months <= last)
+        for key, name in spec.get("deputies", {}).items():
+            raw_name = folded_names.get(fold_text(name).strip())
+            if raw_name is None:
+                print(f"  ! Warning: {spec['id']}: deputy '{name}' not found in expenses")
+                continue
+            rows = np.flatnonzero(in_window & (names == raw_name).to_numpy())
+            if len(rows) == 0:
+                print(f"  ! Warning: {spec['id']}: no expenses for '{name}' in the window")
+                continue
+            tag = f"{spec['id']}\x1f{key}"
+            row_indices.append(rows)
+            row_keys.append(np.full(len(rows), tag, dtype=object))
+            members[tag] = raw_name
+
+    if not members:
+        print("  - No spotlight deputies found in expenses")
+        return spotlights
+
+    rows = np.concatenate(row_indices)
+    tagged = expenses_df.iloc[rows].reset_index(drop=True)
+    tagged[deputy_col] = np.concatenate(row_keys)
+    signals = compute_deputy_signals(tagged, rules=rules)
+    tagged["month"] = months[rows] if months is not None else 0
+    tagged["valueCents"] = value_cents(tagged)
+    entities = supplier_index.get("entities")
+    if entities is None or "supplierEntity" not in tagged.columns:
+        tagged, entities, _ = resolve_suppliers(tagged)
+
+    identified = tagged[tagged["supplierEntity"] != SUPPLIER_KEY_MISSING]
+    supplier_totals = (
+        identified.groupby([deputy_col, "supplierEntity"])["valueCents"].agg(["sum", "size"]).reset_index()
+        .assign(name=lambda t: entities["name"].reindex(t["supplierEntity"]).to_numpy())
+        .sort_values([deputy_col, "sum", "name"], ascending=[True, False, True])
+    )
+    top_by_tag = {tag: group.head(top_n) for tag, group in supplier_totals.groupby(deputy_col, sort=False)}
+    slices = tagged.groupby(deputy_col).agg(total=("valueCents", "sum"), firstMonth=("month", "min"), lastMonth=("month", "max"))
+    supplier_counts = supplier_totals.groupby(deputy_col).size()
+
+    # Focus suppliers are matched on the canonical key of their (14-digit) CNPJ
+    focus_cnpjs = {
+        spec["id"]: normalize_document(pd.Series(spec.get("focusSuppliers", []), dtype=object)).str.zfill(14).tolist()
+        for spec in specs
+    }
+    focus_keys = {
+        cnpj: key for cnpjs in focus_cnpjs.values()
+        for cnpj, key in zip(cnpjs, document_keys(pd.Series(cnpjs, dtype=object)))
+    }
+    focus = tagged[tagged["supplierKey"].isin(list(focus_keys.values()))]
+    focus_totals = focus.groupby([deputy_col, "supplierKey"]).agg(
+        total=("valueCents", "sum"), count=("valueCents", "size"), firstMonth=("month", "min"), lastMonth=("month", "max")
+    )
+    for spec in specs:
+        output_path = OUTPUT_DIR / "spotlights" / f"{spec['id']}.json"
+        spotlight = {}
+        if output_path.exists():
+            with open(output_path, encoding="utf-8") as f:
+                spotlight = json.load(f)
+        spotlight["generated"] = datetime.now().isoformat()
+        spotlight["generator"] = "prepare-data.py"
+        spotlight["id"] = spec["id"]
+        for key in ("title", "subtitle"):
+            if key in spec:
+                spotlight[key] = spec[key]
+
+        section = spotlight.setdefault("deputies", {})
+        ceap_total = 0
+        emendas_total = 0
+        spec_months = []
+        emendas_years = []
+        for key in spec.get("deputies", {}):
+            tag = f"{spec['id']}\x1f{key}"
+            if tag not in members:
+                continue
+            raw_name = members[tag]
+            row = signals.loc[tag]
+            record = records.get(fold_text(raw_name).strip(), {})
+            top = top_by_tag.get(tag, supplier_totals.iloc[:0])
+            total = int(slices.at[tag, "total"])
+            benford = benford_from_counts([int(row[f"digit{d}"]) for d in range(1, 10)], row["digitSample"], rules)
+            benford_tested = row["digitSample"] >= (rules or RISK_RULES)["benford_threshold"]["min_transactions"]
+
+            entry = section.setdefault(key, {})
+            entry["name"] = record.get("name", str(raw_name))
+            entry["party"] = record.get("party", entry.get("party", "N/A"))
+            entry["uf"] = record.get("uf", entry.get("uf", "N/A"))
+            entry["ceap"] = {
+                "total": to_reais(total),
+                "transactions": int(row["transactionCount"]),
+                "suppliers": int(supplier_counts.get(tag, 0)),
+                "hhi": round(float(row["hhi"]), 0),
+                "hhiLevel": hhi_level(row["hhi"], rules),
+                "topSuppliers": [
+                    {
+                        "total": to_reais(t["sum"]),
+                        "count": int(t["size"]),
+                        "name": str(t["name"]),
+                        "cnpj": str(entities.at[t["supplierEntity"], "document"]),
+                        "pct": round(float(t["sum"] / total * 100), 2) if total > 0 else 0.0,
+                    }
+                    for _, t in top.iterrows()
+                ],
+                "benford": {
+                    "chi2": round(float(benford["chi2"]), 1),
+                    "pValue": benford["pValue"],
+                    "significant": benford["significant"],
+                    "digits": [
+                        {
+                            "digit": d["digit"],
+                            "observed": round(d["observed"], 1),
+                            "expected": d["expected"],
+                            "deviation": round(d["observed"] - d["expected"], 1) if benford_tested else 0.0,
+                        }
+                        for d in benford["digitDistribution"]
+                    ],
+                },
+                "roundPct": round(float(row["roundPct"]), 2),
+                "weekendPct": round(float(row["weekendPct"]), 2),
+            }
+            ceap_total += total
+            spec_months += [int(slices.at[tag, "firstMonth"]), int(slices.at[tag, "lastMonth"])]
+
+            author = (emendas or {}).get(fold_text(raw_name).strip())
+            if author:
+                entry_emendas = entry.setdefault("emendas", {})
+                entry_emendas["total"] = author["empenhado"]
+                entry_emendas["totalPago"] = author["pago"]
+                entry_emendas["byYear"] = [
+                    {"year": y["year"], "total": y["empenhado"], "count": y["count"]} for y in author["byYear"]
+                ]
+                emendas_total += round(author["empenhado"] * 100)
+                emendas_years += [y["year"] for y in author["byYear"]]
+
+        # Scale section: CEAP side from this run; emendas side from emendas.json when it was built
+        scale = spotlight.setdefault("scale", {})
+        scale["ceapTotal"] = to_reais(ceap_total)
+        if any(spec_months):
+            scale["ceapPeriod"] = f"{min(spec_months) // 100}-{max(spec_months) // 100}"
+        if emendas_years:
+            scale["emendasTotal"] = to_reais(emendas_total)
+            scale["emendasPeriod"] = f"{min(emendas_years)}-{max(emendas_years)}"
+        if scale.get("emendasTotal") and ceap_total > 0:
+            scale["ratio"] = int(round(scale["emendasTotal"] / to_reais(ceap_total)))
+
+        # Comparison metrics backed by a CEAP field are refreshed; the others are editorial
+        metric_fields = spec.get("comparisonMetrics", {})
+        for metric in _get_path(spotlight, "comparison.paradox.metrics") or []:
+            field = metric_fields.get(metric.get("metric"))
+            if field:
+                for key in spec.get("deputies", {}):
+                    value = _get_path(section.get(key, {}), f"ceap.{field}")
+                    if value is not None:
+                        metric[key] = value
+
+        spotlight["focusSuppliers"] = []
+        for cnpj in focus_cnpjs[spec["id"]]:
+            supplier_key = focus_keys[cnpj]
+            item = {"cnpj": cnpj, "name": str(entities["name"].get(supplier_key, "")), "total": 0, "count": 0, "byDeputy": {}}
+            months_seen = []
+            for key in spec.get("deputies", {}):
+                tag = f"{spec['id']}\x1f{key}"
+                if (tag, supplier_key) in focus_totals.index:
+                    f_row = focus_totals.loc[(tag, supplier_key)]
+                    item["byDeputy"][key] = {"total": to_reais(f_row["total"]), "count": int(f_row["count"])}
+                    item["total"] += int(f_row["total"])
+                    item["count"] += int(f_row["count"])
+                    months_seen += [int(f_row["firstMonth"]), int(f_row["lastMonth"])]
+            item["total"] = to_reais(item["total"])
+            item["firstMonth"] = f"{min(months_seen) // 100}-{min(months_seen) % 100:02d}" if months_seen else None
+            item["lastMonth"] = f"{max(months_seen) // 100}-{max(months_seen) % 100:02d}" if months_seen else None
+            spotlight["focusSuppliers"].append(item)
+
+        window = spec.get("window") or {}
+        spotlight["window"] = {"from": window.get("from"), "to": window.get("to")}
+        spotlights[spec["id"]] = spotlight
+
+    print(f"  - Built {len(spotlights)} spotlight(s) for {len(members)} deputy slices ({len(rows):,} rows)")
+    return spotlights
+
+
 def validate_output(data, output_type: str) -> tuple[bool, list]:
     """
     Validate output data before saving.
@@ -931,45 +3583,297 @@ def validate_output(data, output_type: str) -> tuple[bool, list]:
     return len(errors) == 0, errors
 
 
-def save_json(data, filename, validate=True):
-    """Save data to JSON file with optional validation."""
+# Streamed artifacts are written in chunks of about this many characters
+STREAM_CHUNK_CHARS = 1 << 20
+
+
+def _is_stream(value):
+    """True for generators and other one-shot iterators (lists, dicts and strings are not)."""
+    return isinstance(value, Iterator)
+
+
+def iter_json(data, compact=False, level=0):
+    """
+    Encode data as JSON text piece by piece, consuming generators lazily.
+
+    The text is identical to json.dumps(data, ensure_ascii=False, indent=2) (or the
+    compact separators), so a generator of records encodes exactly like the list. Only
+    iterators and dicts holding an iterator are walked member by member; any other
+    value is encoded in one json.dumps call.
+    """
+    if _is_stream(data):
+        members = ((None, item) for item in data)
+        opening, closing = "[", "]"
+    elif isinstance(data, dict) and any(_is_stream(v) for v in data.values()):
+        members = iter(data.items())
+        opening, closing = "{", "}"
+    elif compact:
+        yield json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        return
+    else:
+        yield json.dumps(data, ensure_ascii=False, indent=2).replace("\n", "\n" + "  " * level)
+        return
+
+    inner = "" if compact else "\n" + "  " * (level + 1)
+    separator = "," + inner
+    key_separator = ":" if compact else ": "
+    first = True
+    for key, value in members:
+        yield (opening + inner) if first else separator
+        first = False
+        if key is not None:
+            yield json.dumps(key if isinstance(key, str) else json.dumps(key), ensure_ascii=False) + key_separator
+        yield from iter_json(value, compact, level + 1)
+    if first:
+        yield opening + closing
+    else:
+        yield ("" if compact else "\n" + "  " * level) + closing
+
+
+class ArtifactWriter:
+    """
+    Encode and write artifacts in a thread pool, then publish them together.
+
+    submit() returns immediately; each artifact is encoded and written to a hidden temp
+    file next to its destination and fsynced in the background. commit() waits for all
+    of them and renames the temp files over the live ones (os.replace is atomic per
+    file), with manifest.json last as the generation marker. A crash before commit()
+    leaves the previous generation untouched; readers never see a truncated file.
+
+    Artifacts given as generators (or holding one) are streamed instead: iter_json
+    encodes them in the caller's thread while the stage's generator runs, and chunks of
+    STREAM_CHUNK_CHARS go to the temp file as they fill, so memory does not grow with
+    the artifact. With gzip=True a precompressed <file>.gz copy is written from the same
+    chunks (for servers that serve .gz files directly); without it stale copies are removed.
+
+    A manifest.json whose "artifacts" lists every file of its generation lets commit()
+    delete the files the previous manifest listed and the new one no longer does (e.g.
+    supplier shards that are now empty).
+    """
+
+    def __init__(self, output_dir, max_workers=4, gzip=False):
+        self.output_dir = Path(output_dir)
+        self.generation = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.gzip = gzip
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-writer")
+        self._pending = {}
+
+    def filenames(self):
+        """Artifacts queued so far."""
+        return sorted(self._pending)
+
+    def submit(self, data, filename, compact=False):
+        """Queue an artifact; a later submit of the same filename replaces the earlier one."""
+        if not _is_stream(data) and not (isinstance(data, dict) and any(_is_stream(v) for v in data.values())):
+            self._pending[filename] = self._pool.submit(self._write_temp, data, filename, compact)
+            return
+        future = Future()
+        try:
+            future.set_result(self._write_temp(data, filename, compact))
+        except Exception as e:
+            future.set_exception(e)
+        self._pending[filename] = future
+
+    def _write_temp(self, data, filename, compact):
+        path = self.output_dir / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{self.generation}.tmp")
+        gzip_path = path.with_name(path.name + ".gz")
+        gzip_temp_path = gzip_path.with_name(f".{gzip_path.name}.{self.generation}.tmp")
+
+        encode_seconds = write_seconds = 0.0
+        written = 0
+        with open(temp_path, "wb") as f, (open(gzip_temp_path, "wb") if self.gzip else nullcontext()) as raw_gz:
+            gz = gzip.GzipFile(fileobj=raw_gz, mode="wb", mtime=0) if raw_gz else None
+
+            def flush(pieces):
+                nonlocal write_seconds, written
+                start = time.perf_counter()
+                chunk = "".join(pieces).encode("utf-8")
+                f.write(chunk)
+                if gz:
+                    gz.write(chunk)
+                written += len(chunk)
+                write_seconds += time.perf_counter() - start
+
+            pieces, size = [], 0
+            start = time.perf_counter()
+            for piece in iter_json(data, compact):
+                pieces.append(piece)
+                size += len(piece)
+                if size >= STREAM_CHUNK_CHARS:
+                    encode_seconds += time.perf_counter() - start
+                    flush(pieces)
+                    pieces, size = [], 0
+                    start = time.perf_counter()
+            encode_seconds += time.perf_counter() - start
+            flush(pieces)
+
+            start = time.perf_counter()
+            f.flush()
+            os.fsync(f.fileno())
+            if gz:
+                gz.close()
+                raw_gz.flush()
+                os.fsync(raw_gz.fileno())
+            write_seconds += time.perf_counter() - start
+
+        return {
+            "filename": filename,
+            "path": path,
+            "tempPath": temp_path,
+            "gzipPath": gzip_path,
+            "gzipTempPath": gzip_temp_path if self.gzip else None,
+            "bytes": written,
+            "encodeSeconds": encode_seconds,
+            "writeSeconds": write_seconds,
+        }
+
+    def commit(self):
+        """Wait for all pending writes and swap them in. Returns per-file timings."""
+        try:
+            results = [future.result() for future in self._pending.values()]
+        except Exception:
+            self.abort()
+            raise
+
+        stale = self._stale_artifacts(results)
+
+        # manifest.json goes last so it only ever describes a fully published generation
+        results.sort(key=lambda r: r["filename"] == "manifest.json")
+        for r in results:
+            if r["gzipTempPath"]:
+                os.replace(r["gzipTempPath"], r["gzipPath"])
+            else:
+                r["gzipPath"].unlink(missing_ok=True)
+            os.replace(r["tempPath"], r["path"])
+        for filename in stale:
+            path = self.output_dir / filename
+            path.unlink(missing_ok=True)
+            path.with_name(path.name + ".gz").unlink(missing_ok=True)
+        for directory in {r["path"].parent for r in results} | {(self.output_dir / f).parent for f in stale}:
+            _fsync_directory(directory)
+
+        self._pending = {}
+        self._pool.shutdown()
+
+        if results:
+            print(f"\nPublished {len(results)} artifacts (generation {self.generation}):")
+            for r in sorted(results, key=lambda r: r["encodeSeconds"] + r["writeSeconds"], reverse=True):
+                print(f"  -> {r['filename']}: {r['bytes'] / 1024:,.0f} KB, "
+                      f"encode {r['encodeSeconds'] * 1000:,.0f} ms, write {r['writeSeconds'] * 1000:,.0f} ms")
+        if stale:
+            print(f"  - Removed {len(stale)} artifacts the previous generation left behind")
+        return results
+
+    def _stale_artifacts(self, results):
+        """Files listed by the live manifest but not by the one being published."""
+        new_manifest = next((r for r in results if r["filename"] == "manifest.json"), None)
+        old_path = self.output_dir / "manifest.json"
+        if new_manifest is None or not old_path.exists():
+            return []
+
+        def listed(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    artifacts = json.load(f).get("artifacts")
+            except (OSError, ValueError):
+                return None
+            return set(artifacts) if isinstance(artifacts, list) else None
+
+        old, new = listed(old_path), listed(new_manifest["tempPath"])
+        if old is None or new is None:
+            return []
+        # Never follow a listed name out of the output directory
+        return sorted(f for f in old - new if not Path(f).is_absolute() and ".." not in Path(f).parts)
+
+    def abort(self):
+        """Discard pending artifacts and remove their temp files."""
+        for future in self._pending.values():
+            try:
+                result = future.result()
+            except Exception:
+                continue
+            result["tempPath"].unlink(missing_ok=True)
+            if result["gzipTempPath"]:
+                result["gzipTempPath"].unlink(missing_ok=True)
+        self._pending = {}
+        self._pool.shutdown()
+
+
+def _fsync_directory(path):
+    """Persist renames in a directory (no-op where directories cannot be opened, e.g. Windows)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# Active writer for save_json(); set by main() for the duration of a run
+_artifact_writer = None
+
+
+def save_json(data, filename, validate=True, compact=False):
+    """
+    Save data to JSON file with optional validation (compact=True drops indentation).
+
+    Inside a run the artifact is queued on the active ArtifactWriter and published at
+    commit; otherwise it is written immediately through a one-off writer. Generators
+    (see iter_json) are streamed to disk and are not validated.
+    """
     # Determine output type from filename
     output_type = filename.replace(".json", "").replace("-", "_")
 
     # Validate before saving
-    if validate:
+    if validate and not _is_stream(data):
         is_valid, errors = validate_output(data, output_type)
         if not is_valid:
             print(f"  ! Warning: {len(errors)} validation issues (saving anyway)")
             for err in errors[:3]:
                 print(f"      - {err}")
 
-    output_path = OUTPUT_DIR / filename
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"  -> Saved {output_path}")
+    if _artifact_writer is not None:
+        _artifact_writer.submit(data, filename, compact)
+        return
+
+    # Keep the .gz copy of a --gzip run in step instead of dropping it
+    writer = ArtifactWriter(OUTPUT_DIR, max_workers=1, gzip=(OUTPUT_DIR / f"{filename}.gz").exists())
+    writer.submit(data, filename, compact)
+    writer.commit()
+
 
+def generate_manifest(expenses_df, aggregations, deputies, fraud_flags, mismatches, suppliers=None, search_index=None,
+                      rules=None, changes=None, sources=None, artifacts=None, bootstrap=None):
+    """
+    Generate manifest.json for data reproducibility and auditing.
 
-def generate_manifest(expenses_df, aggregations, deputies, fraud_flags, mismatches):
-    """Generate manifest.json for data reproducibility and auditing."""
+    artifacts: extra output_files entries, {filename: (record_count, description)}
+    bootstrap: the replicates, seed and level the confidence intervals were drawn with
+    (BOOTSTRAP when not given)
+    """
+    bootstrap = {**BOOTSTRAP, **(bootstrap or {})}
     print("\nGenerating manifest.json...")
 
-    # Calculate hash of source data
-    source_file = DATA_DIR / "despesas_combined_2023_2025.csv"
-    source_hash = ""
-    source_size = 0
-    source_modified = None
-
-    if source_file.exists():
-        # Calculate SHA256 hash of source file
-        sha256_hash = hashlib.sha256()
-        with open(source_file, "rb") as f:
-            for chunk in iter(lambda: f.read(8192), b""):
-                sha256_hash.update(chunk)
-        source_hash = sha256_hash.hexdigest()
-        source_size = source_file.stat().st_size
-        source_modified = datetime.fromtimestamp(source_file.stat().st_mtime).isoformat()
-        print(f"  - Source file hash: {source_hash[:16]}...")
+    # Source fingerprints were taken while loading; a single file keeps its own hash,
+    # several partitions are summarized by the hash of their hashes
+    sources = sources or []
+    if len(sources) == 1:
+        source_file = sources[0]["file"]
+        source_hash = sources[0]["sha256"]
+    elif sources:
+        source_file = f"{len(sources)} partitions"
+        source_hash = hashlib.sha256("".join(src["sha256"] for src in sources).encode()).hexdigest()
+    else:
+        source_file = EXPENSES_COMBINED_FILE
+        source_hash = ""
+    source_size = sum(src["size_bytes"] for src in sources)
+    source_modified = max((src["last_modified"] for src in sources), default=None)
+    if source_hash:
+        print(f"  - Source hash ({source_file}): {source_hash[:16]}...")
 
     # Get data characteristics
     if not expenses_df.empty:
@@ -989,11 +3893,10 @@ def generate_manifest(expenses_df, aggregations, deputies, fraud_flags, mismatch
             period_start = "unknown"
             period_end = "unknown"
 
-        record_count = len(expenses_df)
+        record_count = weighted_count(transaction_weights(expenses_df).sum())
 
-        # Value column for total
-        value_col = "vlrLiquido" if "vlrLiquido" in expenses_df.columns else "vlrDocumento"
-        total_value = float(expenses_df[value_col].sum()) if value_col in expenses_df.columns else 0
+        # Total in centavos, converted once
+        total_value = to_reais(value_cents(expenses_df).sum())
     else:
         period_start = "unknown"
         period_end = "unknown"
@@ -1004,9 +3907,10 @@ def generate_manifest(expenses_df, aggregations, deputies, fraud_flags, mismatch
         "version": "1.0.0",
         "generated_at": datetime.now().isoformat(),
         "generator": "prepare-data.py",
+        "generation": _artifact_writer.generation if _artifact_writer else None,
 
         "source_data": {
-            "file": "despesas_combined_2023_2025.csv",
+            "file": source_file,
             "sha256": source_hash,
             "size_bytes": source_size,
             "last_modified": source_modified,
@@ -1016,7 +3920,8 @@ def generate_manifest(expenses_df, aggregations, deputies, fraud_flags, mismatch
                 "end": period_end
             },
             "record_count": record_count,
-            "total_value_brl": total_value
+            "total_value_brl": total_value,
+            "partitions": sources
         },
 
         "output_files": {
@@ -1035,52 +3940,35 @@ def generate_manifest(expenses_df, aggregations, deputies, fraud_flags, mismatch
             "mismatches.json": {
                 "record_count": len(mismatches),
                 "description": "CNPJ activity code mismatches"
-            }
-        },
-
-        "methodology": {
-            "benford_threshold": {
-                "chi2_critical_001": 20.09,
-                "chi2_critical_005": 15.51,
-                "degrees_of_freedom": 8,
-                "description": "Chi-squared test for first digit distribution"
             },
-            "hhi_thresholds": {
-                "low": 1500,
-                "moderate": 2500,
-                "high": 3000,
-                "very_high": 5000,
-                "description": "Herfindahl-Hirschman Index for supplier concentration"
+            "suppliers/": {
+                "record_count": suppliers["index"]["meta"]["totalSuppliers"] if suppliers else 0,
+                "description": "Per-CNPJ supplier profiles sharded by document prefix, with top-N index"
             },
-            "risk_score": {
-                "base_weights": {
-                    "hhi_critical": 0.9,
-                    "hhi_high": 0.7,
-                    "hhi_moderate": 0.4,
-                    "hhi_low": 0.2
-                },
-                "additive_penalties": {
-                    "benford_significant": 0.15,
-                    "round_values_above_20pct": 0.10,
-                    "top_supplier_above_50pct": 0.10,
-                    "zscore_party_above_2std": 0.08,
-                    "zscore_state_above_2std": 0.08
-                },
-                "max_score": 1.0,
-                "risk_level_thresholds": {
-                    "critico": 0.75,
-                    "alto": 0.55,
-                    "medio": 0.35,
-                    "baixo": 0.0
-                }
+            "search-index.json": {
+                "record_count": search_index["meta"]["entityCount"] if search_index else 0,
+                "description": "Accent-folded prefix index over deputies, suppliers and CNPJs"
+            },
+            "changes.json": {
+                "record_count": len(changes["deputies"]) if changes else 0,
+                "description": "Per-deputy deltas since the previous snapshot"
+            },
+            **{
+                filename: {"record_count": count, "description": description}
+                for filename, (count, description) in (artifacts or {}).items()
             }
         },
 
+        "methodology": risk_methodology(rules),
+
         "reproducibility_notes": [
             "All random operations use fixed seeds where applicable",
             "Chi-squared p-values use critical value lookup (discrete: 0.01, 0.05, 0.10)",
             "Source data hash can be used to verify identical input data",
-            "Benford analysis requires minimum 50 transactions per deputy for reliability"
+            "Benford analysis requires minimum 50 transactions per deputy for reliability",
+            f"Bootstrap intervals use seed {bootstrap['seed']} and {bootstrap['replicates']} replicates "
+            f"({int(bootstrap['level'] * 100)}% percentile intervals)" if bootstrap["replicates"] > 0
+            else "Bootstrap intervals were disabled for this run (--bootstrap-replicates 0)"
         ]
     }
 
@@ -1091,18 +3979,475 @@ def generate_manifest(expenses_df, aggregations, deputies, fraud_flags, mismatch
     return manifest
 
 
+def snapshot_outputs(run_id=None):
+    """
+    Store the current outputs as a snapshot.
+
+    Each artifact is gzipped under objects/ keyed by the SHA256 of its bytes, so files
+    that did not change between runs are stored once. The run record maps file -> hash.
+    """
+    run_id = run_id or datetime.now().strftime("%Y%m%dT%H%M%S")
+    objects_dir = SNAPSHOT_DIR / "objects"
+    runs_dir = SNAPSHOT_DIR / "runs"
+    objects_dir.mkdir(parents=True, exist_ok=True)
+    runs_dir.mkdir(parents=True, exist_ok=True)
+
+    files = {}
+    new_objects = 0
+    for filename in SNAPSHOT_FILES:
+        path = OUTPUT_DIR / filename
+        if not path.exists():
+            continue
+        content = path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = objects_dir / f"{digest}.json.gz"
+        if not object_path.exists():
+            with gzip.open(object_path, "wb") as f:
+                f.write(content)
+            new_objects += 1
+        files[filename] = digest
+
+    record = {"runId": run_id, "createdAt": datetime.now().isoformat(), "files": files}
+    with open(runs_dir / f"{run_id}.json", "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+
+    print(f"  - Snapshot {run_id}: {len(files)} files, {new_objects} new objects")
+    return record
+
+
+def list_snapshots():
+    """Run ids in the snapshot store, oldest first."""
+    runs_dir = SNAPSHOT_DIR / "runs"
+    if not runs_dir.exists():
+        return []
+    return sorted(p.stem for p in runs_dir.glob("*.json"))
+
+
+def load_snapshot_file(run_id, filename):
+    """Load one artifact of a snapshot, or None if the run or file is missing."""
+    run_path = SNAPSHOT_DIR / "runs" / f"{run_id}.json"
+    if not run_path.exists():
+        return None
+    with open(run_path, encoding="utf-8") as f:
+        digest = json.load(f)["files"].get(filename)
+    if digest is None:
+        return None
+    with gzip.open(SNAPSHOT_DIR / "objects" / f"{digest}.json.gz", "rb") as f:
+        return json.loads(f.read())
+
+
+def _flag_key(flag):
+    """Red flag text with numbers masked, so 'HHI=3100' -> 'HHI=3200' is not reported as a new flag."""
+    return re.sub(r"\d+(?:[.,]\d+)*", "#", flag)
+
+
+def generate_changes(old_deputies, new_deputies, from_run=None, to_run=None):
+    """
+    Generate changes.json: per-deputy deltas between two runs.
+
+    Deputies are joined by name (ids are positional and can shift between runs) with
+    one outer merge; only added, removed or changed deputies are listed.
+    """
+    print("\nGenerating changes.json...")
+    start = time.perf_counter()
+
+    columns = ["name", "id", "party", "uf", "totalSpending", "riskScore", "riskLevel", "redFlags"]
+
+    def frame(deputies):
+        if not deputies:
+            return pd.DataFrame(columns=columns)
+        return pd.DataFrame([{c: d.get(c) for c in columns} for d in deputies]).drop_duplicates("name")
+
+    merged = frame(old_deputies).merge(frame(new_deputies), on="name", how="outer",
+                                       suffixes=("Old", "New"), indicator=True)
+
+    spending_delta = merged["totalSpendingNew"].fillna(0) - merged["totalSpendingOld"].fillna(0)
+    score_delta = merged["riskScoreNew"].fillna(0) - merged["riskScoreOld"].fillna(0)
+    status = merged["_merge"].map({"left_only": "removed", "right_only": "added", "both": "changed"})
+    level_changed = merged["riskLevelOld"] != merged["riskLevelNew"]
+
+    changes = []
+    for i, row in enumerate(merged.to_dict("records")):
+        old_flags = row["redFlagsOld"] if isinstance(row["redFlagsOld"], list) else []
+        new_flags = row["redFlagsNew"] if isinstance(row["redFlagsNew"], list) else []
+        old_keys = {_flag_key(f) for f in old_flags}
+        new_keys = {_flag_key(f) for f in new_flags}
+        added_flags = [f for f in new_flags if _flag_key(f) not in old_keys]
+        resolved_flags = [f for f in old_flags if _flag_key(f) not in new_keys]
+
+        if (status.iat[i] == "changed" and abs(spending_delta.iat[i]) < 0.005 and abs(score_delta.iat[i]) < 0.005
+                and not level_changed.iat[i] and not added_flags and not resolved_flags):
+            continue
+
+        current = "New" if status.iat[i] != "removed" else "Old"
+        changes.append({
+            "id": int(row[f"id{current}"]),
+            "name": str(row["name"]),
+            "party": str(row[f"party{current}"]),
+            "uf": str(row[f"uf{current}"]),
+            "status": status.iat[i],
+            "spendingDelta": round(float(spending_delta.iat[i]), 2),
+            "riskScoreDelta": round(float(score_delta.iat[i]), 2),
+            "riskLevelFrom": row["riskLevelOld"] if pd.notna(row["riskLevelOld"]) else None,
+            "riskLevelTo": row["riskLevelNew"] if pd.notna(row["riskLevelNew"]) else None,
+            "newRedFlags": added_flags,
+            "resolvedRedFlags": resolved_flags,
+        })
+
+    changes.sort(key=lambda c: abs(c["riskScoreDelta"]), reverse=True)
+    result = {
+        "meta": {
+            "fromRun": from_run,
+            "toRun": to_run,
+            "generatedAt": datetime.now().isoformat(),
+        },
+        "summary": {
+            "added": sum(1 for c in changes if c["status"] == "added"),
+            "removed": sum(1 for c in changes if c["status"] == "removed"),
+            "changed": sum(1 for c in changes if c["status"] == "changed"),
+            "riskLevelChanges": sum(
+                1 for c in changes
+                if c["status"] == "changed" and c["riskLevelFrom"] != c["riskLevelTo"]
+            ),
+            "withNewRedFlags": sum(1 for c in changes if c["newRedFlags"]),
+        },
+        "deputies": changes,
+    }
+
+    print(f"  - Compared against run {from_run}: {len(changes)} deputies changed "
+          f"({result['summary']['riskLevelChanges']} risk level changes) in {time.perf_counter() - start:.3f}s")
+    return result
+
+
+def diff_snapshots(from_run, to_run):
+    """Diff two stored runs and write changes.json."""
+    runs = list_snapshots()
+    aliases = {"latest": runs[-1] if runs else None, "previous": runs[-2] if len(runs) > 1 else None}
+    from_run = aliases.get(from_run, from_run)
+    to_run = aliases.get(to_run, to_run)
+
+    old_deputies = load_snapshot_file(from_run, "deputies.json")
+    new_deputies = load_snapshot_file(to_run, "deputies.json")
+    if old_deputies is None or new_deputies is None:
+        print(f"  ! Snapshot not found: {from_run if old_deputies is None else to_run}")
+        print(f"    Available runs: {', '.join(runs) or 'none'}")
+        return None
+
+    changes = generate_changes(old_deputies, new_deputies, from_run, to_run)
+    save_json(changes, "changes.json", validate=False)
+    return changes
+
+
+def rescore_outputs(rules=None, output_dir=None, gzip=False):
+    """
+    Re-apply the risk rules to an existing deputies.json without rerunning the aggregation stages.
+
+    Z-scores are recomputed from totalSpending, so only the rules change between runs. Benford
+    significance (from the stored chi²) and the HHI band are re-derived from the rule thresholds
+    before scoring. Every artifact that copies the results is refreshed with it: fraud-flags.json
+    (riskScore, riskLevel, the Benford and concentration flags), distributions.json (deputy metrics
+    and ranks; the transaction sketches are kept), changes.json when it compares a snapshot with
+    the current output, the preview risk ranges and the manifest methodology.
+
+    The chi² itself needs the digit samples, so a changed benford_threshold.min_transactions only
+    takes effect on a full run. Precompressed .gz copies are written with gzip=True, and also
+    whenever the last full run wrote them, so they never go stale.
+    """
+    output_dir = output_dir or OUTPUT_DIR
+    print("\nRe-scoring deputies.json...")
+    deputies_path = output_dir / "deputies.json"
+    if not deputies_path.exists():
+        print(f"  ! {deputies_path} not found - run the full pipeline first")
+        return
+
+    def load(filename):
+        path = output_dir / filename
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    deputies = load("deputies.json")
+    manifest = load("manifest.json")
+    min_sample = (rules or RISK_RULES)["benford_threshold"]["min_transactions"]
+    if manifest is not None and manifest["methodology"]["benford_threshold"]["min_transactions"] != min_sample:
+        print("  ! benford_threshold.min_transactions changed - Benford chi² kept from the last full run")
+    for d in deputies:
+        if d["benford"]["chi2"] > 0:  # 0 marks a sample below min_transactions (pValue stays 1.0)
+            d["benford"]["pValue"], d["benford"]["significant"] = benford_significance(d["benford"]["chi2"], rules)
+        d["hhi"]["level"] = hhi_level(d["hhi"]["value"], rules)
+    score_deputies(deputies, rules)
+    risk_score_ranges(deputies, rules)
+    print(f"  - Critical: {sum(1 for d in deputies if d['riskLevel'] == 'CRITICO')}")
+    print(f"  - High: {sum(1 for d in deputies if d['riskLevel'] == 'ALTO')}")
+
+    writer = ArtifactWriter(output_dir, gzip=gzip or (output_dir / "deputies.json.gz").exists())
+    writer.submit(deputies, "deputies.json")
+
+    fraud_flags = load("fraud-flags.json")
+    if fraud_flags is not None:
+        by_id = {d["id"]: d for d in deputies}
+        for flag in fraud_flags:
+            deputy = by_id.get(flag["deputyId"])
+            if deputy is not None:
+                flag["details"]["benfordDeviation"] = bool(deputy["benford"]["significant"])
+                flag["details"]["supplierConcentration"] = bool(
+                    flag["details"]["hhiValue"] > (rules or RISK_RULES)["hhi_thresholds"]["moderate"]
+                )
+                flag["flags"] = fraud_flag_labels(flag["details"])
+                flag["riskScore"] = deputy["riskScore"]
+                flag["riskLevel"] = deputy["riskLevel"]
+        writer.submit(fraud_flags, "fraud-flags.json")
+
+    distributions = load("distributions.json")
+    if distributions is not None:
+        metrics, ranks = deputy_metric_distributions(deputies, distributions["meta"].get("bins", DISTRIBUTION_BINS))
+        distributions["metrics"] = metrics
+        distributions["ranks"] = ranks
+        distributions["meta"]["deputyCount"] = len(deputies)
+        distributions["meta"]["metrics"] = list(metrics)
+        writer.submit(distributions, "distributions.json", compact=True)
+
+    changes = load("changes.json")
+    if changes is not None and changes["meta"].get("toRun") == "current":
+        previous_deputies = load_snapshot_file(changes["meta"]["fromRun"], "deputies.json")
+        if previous_deputies is not None:
+            writer.submit(
+                generate_changes(previous_deputies, deputies, changes["meta"]["fromRun"], "current"), "changes.json"
+            )
+        else:
+            print(f"  ! Snapshot {changes['meta']['fromRun']} not found - changes.json left as it was")
+
+    if manifest is not None:
+        manifest["methodology"] = risk_methodology(rules)
+        writer.submit(manifest, "manifest.json")
+    writer.commit()
+
+    # The frontend imports the thresholds of the published output, not of a preview
+    if output_dir == OUTPUT_DIR:
+        save_frontend_thresholds(rules)
+
+
+def generate_outputs(data, rules, snapshot=True, bootstrap_replicates=None):
+    """
+    Run every generation stage and queue its artifacts on the active writer.
+
+    With data["preview"] (sample_expenses) the expenses are a stratified sample: aggregations
+    and deputies get their sampling errors, and the manifest records the sample design.
+    """
+    preview = data.get("preview")
+    with timed_stage("aggregations"):
+        aggregations = generate_aggregations(data["expenses"])
+        if preview:
+            preview_aggregations(aggregations, data["expenses"], preview["strata"], preview["fraction"])
+        save_json(aggregations, "aggregations.json")
+
+    with timed_stage("supplier_index"):
+        print("\nIndexing suppliers...")
+        supplier_index = build_supplier_index(data["expenses"], data.get("supplier_entities"))
+
+    # Mismatches first: the per-deputy signals count the flagged CNPJs
+    with timed_stage("mismatches"):
+        mismatches = generate_mismatches(data["mismatches"], data["expenses"], data.get("cnae"))
+        save_json(mismatches, "mismatches.json")
+
+    with timed_stage("signals"):
+        print("\nComputing fraud signals...")
+        mismatch_cnpjs = [m["cnpj"] for m in mismatches]
+        outlier_scores = score_transaction_outliers(data["expenses"])
+        signals = compute_deputy_signals(data["expenses"], mismatch_cnpjs, outlier_scores, rules)
+
+    with timed_stage("deputies"):
+        deputies = generate_deputies(
+            data["expenses"], data["hhi"], data["fraud"], data.get("enrichment"), supplier_index, rules, signals
+        )
+    with timed_stage("bootstrap"):
+        bootstrap_deputy_intervals(data["expenses"], deputies, bootstrap_replicates, rules=rules)
+    if preview:
+        with timed_stage("preview_estimates"):
+            print("\nEstimating preview sampling errors...")
+            preview_deputies(deputies, data["expenses"], preview["strata"], rules)
+
+    # Emendas add their combined summary to the deputy records, so they run before deputies.json is queued
+    with timed_stage("emendas"):
+        emendas = generate_emendas(deputies)
+        if emendas is not None:
+            save_json(emendas["output"], "emendas.json", validate=False)
+    save_json(deputies, "deputies.json")
+
+    with timed_stage("suppliers"):
+        suppliers = generate_suppliers(supplier_index)
+        save_json(suppliers["index"], "suppliers/index.json", validate=False)
+        for shard, profiles in suppliers["shards"].items():
+            save_json(profiles, f"suppliers/{shard}.json", validate=False)
+
+    with timed_stage("search_index"):
+        search_index = generate_search_index(deputies, suppliers)
+        save_json(search_index, "search-index.json", validate=False, compact=True)
+
+    artifacts = {}
+    if emendas is not None:
+        artifacts["emendas.json"] = (
+            emendas["output"]["meta"]["matchedDeputies"], "Parliamentary amendments per deputy and per municipality"
+        )
+    with timed_stage("outliers"):
+        outliers = generate_outliers(data["expenses"], outlier_scores, deputies)
+        save_json(outliers, "outliers.json", validate=False)
+    artifacts["outliers.json"] = (len(outliers["transactions"]), "Atypical transactions (robust z-score within category x month)")
+
+    with timed_stage("distributions"):
+        distributions = generate_distributions(deputies, data["expenses"])
+        save_json(distributions, "distributions.json", validate=False, compact=True)
+    artifacts["distributions.json"] = (
+        len(distributions["metrics"]), "Deputy metric histograms, percentile ranks and transaction value sketches"
+    )
+
+    with timed_stage("networks"):
+        party_network = generate_party_network(data["expenses"], deputies)
+        save_json(party_network, "party-network.json", validate=False, compact=True)
+        region_network = generate_region_network(data["expenses"], deputies)
+        save_json(region_network, "region-network.json", validate=False, compact=True)
+    artifacts["party-network.json"] = (len(party_network["connections"]), "Party pairs sharing suppliers (CNPJ incidence product)")
+    artifacts["region-network.json"] = (len(region_network["connections"]), "UF pairs sharing suppliers and region-to-region totals")
+
+    if data.get("quality") is not None:
+        save_json(data["quality"], "data-quality.json", validate=False)
+        artifacts["data-quality.json"] = (
+            len(data["quality"]["columns"]), "Column profile, CNPJ/CPF check digits, duplicates and monthly completeness"
+        )
+
+    with timed_stage("spotlights"):
+        spotlights = generate_spotlights(
+            load_spotlight_specs(), data["expenses"], deputies, supplier_index, emendas["authors"] if emendas else None,
+            rules=rules,
+        )
+        for spotlight_id, spotlight in spotlights.items():
+            save_json(spotlight, f"spotlights/{spotlight_id}.json", validate=False)
+            artifacts[f"spotlights/{spotlight_id}.json"] = (
+                len(spotlight.get("deputies", {})), "Spotlight case study (CEAP sections rebuilt from its spec)"
+            )
+
+    with timed_stage("fraud_flags"):
+        fraud_flags = generate_fraud_flags(deputies, signals, data["fraud"], rules)
+        save_json(fraud_flags, "fraud-flags.json")
+
+    # Diff against the previous snapshot (if any) before this run is stored
+    changes = None
+    previous_runs = list_snapshots()
+    if previous_runs and snapshot:
+        with timed_stage("changes"):
+            previous_deputies = load_snapshot_file(previous_runs[-1], "deputies.json")
+            if previous_deputies is not None:
+                changes = generate_changes(previous_deputies, deputies, previous_runs[-1], "current")
+                save_json(changes, "changes.json", validate=False)
+
+    # Generate manifest for reproducibility
+    with timed_stage("manifest"):
+        manifest = generate_manifest(
+            data["expenses"],
+            aggregations,
+            deputies,
+            fraud_flags,
+            mismatches,
+            suppliers,
+            search_index,
+            rules,
+            changes,
+            data.get("sources"),
+            artifacts,
+            {"replicates": BOOTSTRAP["replicates"] if bootstrap_replicates is None else bootstrap_replicates},
+        )
+        if preview:
+            manifest["preview"] = {
+                "fraction": preview["fraction"],
+                "seed": preview["seed"],
+                "strata": "deputy x month",
+                "sampledTransactions": len(data["expenses"]),
+                "populationTransactions": preview["population"],
+                "note": "Money totals and transaction counts in aggregations, deputies, suppliers, mismatches and "
+                        "source_data are expansion estimates (deputy and monthly counts are exact); spotlight "
+                        "values are estimates and their counts, outliers, distributions, networks and "
+                        "data-quality.json describe the sample",
+            }
+        if _artifact_writer is not None:
+            manifest["artifacts"] = sorted({*_artifact_writer.filenames(), "manifest.json"})
+        save_json(manifest, "manifest.json")
+
+
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Generate dashboard JSON files from processed CEAP data.")
+    parser.add_argument("--rules", type=Path, help="JSON file overriding RISK_RULES (same keys)")
+    parser.add_argument("--rescore", action="store_true",
+                        help="Only re-apply risk rules to the existing outputs (the preview ones with --preview)")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="Do not store this run in the snapshot history")
+    parser.add_argument("--diff", nargs=2, metavar=("FROM", "TO"),
+                        help="Write changes.json between two stored runs (run ids, 'previous' or 'latest')")
+    parser.add_argument("--list-snapshots", action="store_true", help="List stored run ids")
+    parser.add_argument("--profile", action="store_true",
+                        help="Trace per-stage peak memory (slower) and print the stage table")
+    parser.add_argument("--bootstrap-replicates", type=int, default=BOOTSTRAP["replicates"],
+                        help="Bootstrap replicates for deputy confidence intervals (0 disables)")
+    parser.add_argument("--gzip", action="store_true",
+                        help="Also write a precompressed <file>.gz next to each artifact")
+    parser.add_argument("--preview", nargs="?", type=float, const=PREVIEW["fraction"], metavar="FRACTION",
+                        help=f"Run on a stratified sample (deputy x month, default {PREVIEW['fraction']}) "
+                             f"with error estimates, written to <output>{PREVIEW['dir_suffix']}/")
+    args = parser.parse_args()
+    if args.preview is not None and not 0 < args.preview <= 1:
+        parser.error("--preview FRACTION must be in (0, 1]")
+
+    if args.list_snapshots:
+        for run_id in list_snapshots():
+            print(run_id)
+        return
+
+    if args.diff:
+        diff_snapshots(*args.diff)
+        return
+
+    rules = RISK_RULES
+    if args.rules:
+        try:
+            rules = load_risk_rules(args.rules)
+        except ValueError as e:
+            parser.error(f"--rules {args.rules}: {e}")
+
     print("=" * 60)
     print("CEAP Dashboard Data Preparation")
     print("=" * 60)
 
+    if args.rescore:
+        rescore_outputs(rules, preview_output_dir() if args.preview is not None else None, gzip=args.gzip)
+        return
+
+    STAGE_METRICS.clear()
+    if args.profile:
+        tracemalloc.start()
+
     # Load data
-    data = load_data()
+    with timed_stage("load"):
+        data = load_data()
+
+    # Preview: everything below runs on the sample; snapshots and frontend thresholds are left alone
+    output_dir = OUTPUT_DIR
+    if args.preview is not None:
+        print("\nSampling expenses for preview...")
+        with timed_stage("sample"):
+            population = len(data["expenses"])
+            data["expenses"], strata = sample_expenses(data["expenses"], args.preview)
+        data["preview"] = {"fraction": args.preview, "seed": PREVIEW["seed"], "strata": strata, "population": population}
+        output_dir = preview_output_dir()
+
+    # Column profile (data-quality.json); validation reads its counts from it
+    with timed_stage("profile"):
+        data["quality"] = profile_expenses(data["expenses"])
 
     # Validate expense data
     print("\nValidating expense data...")
-    is_valid, errors, warnings = validate_expenses(data["expenses"])
+    with timed_stage("validate"):
+        is_valid, errors, warnings = validate_expenses(data["expenses"], data["quality"])
 
     if errors:
         print("  ERRORS (will prevent processing):")
@@ -1123,32 +4468,41 @@ def main():
     if not errors and not warnings:
         print("  - All validations passed")
 
-    # Generate JSON files
-    aggregations = generate_aggregations(data["expenses"])
-    save_json(aggregations, "aggregations.json")
-
-    deputies = generate_deputies(data["expenses"], data["hhi"], data["fraud"], data.get("enrichment"))
-    save_json(deputies, "deputies.json")
-
-    fraud_flags = generate_fraud_flags(data["fraud"])
-    save_json(fraud_flags, "fraud-flags.json")
-
-    mismatches = generate_mismatches(data["mismatches"])
-    save_json(mismatches, "mismatches.json")
+    # Canonical supplier keys and entities; every stage below groups suppliers on them
+    print("\nResolving supplier identities...")
+    with timed_stage("identity"):
+        data["expenses"], data["supplier_entities"], data["quality"]["suppliers"] = resolve_suppliers(data["expenses"])
 
-    # Generate manifest for reproducibility
-    manifest = generate_manifest(
-        data["expenses"],
-        aggregations,
-        deputies,
-        fraud_flags,
-        mismatches
-    )
-    save_json(manifest, "manifest.json")
+    # Generate JSON files; they are encoded in the background and published together
+    global _artifact_writer
+    _artifact_writer = ArtifactWriter(output_dir, gzip=args.gzip)
+    try:
+        generate_outputs(
+            data, rules, snapshot=not args.no_snapshot and args.preview is None,
+            bootstrap_replicates=args.bootstrap_replicates,
+        )
+        with timed_stage("publish"):
+            _artifact_writer.commit()
+    except BaseException:
+        _artifact_writer.abort()
+        raise
+    finally:
+        _artifact_writer = None
+
+    if args.preview is None:
+        save_frontend_thresholds(rules)
+
+    if not args.no_snapshot and args.preview is None:
+        print("\nStoring snapshot...")
+        snapshot_outputs()
+
+    if args.profile:
+        tracemalloc.stop()
+        print_stage_metrics()
 
     print("\n" + "=" * 60)
     print("Data preparation complete!")
-    print(f"Output directory: {OUTPUT_DIR}")
+    print(f"Output directory: {output_dir}")
     print("=" * 60)
 
 
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Load test for the local query API (scripts/query-server.py)
+
+Builds a request mix from the running server's own deputy list (deputy pages,
+transaction drill-downs, summaries, supplier profiles), replays it from concurrent
+workers and reports latency percentiles and throughput.
+
+Usage:
+    python scripts/query-loadtest.py [--url http://127.0.0.1:8765] [--requests 5000] [--concurrency 16]
+    python scripts/query-loadtest.py --revalidate   # send If-None-Match to exercise 304s
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+import numpy as np
+
+
+def fetch(url, etag=None):
+    """GET url; returns (status, etag, body bytes)."""
+    request = Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urlopen(request, timeout=30) as response:
+            return response.status, response.headers.get("ETag"), response.read()
+    except HTTPError as e:
+        return e.code, e.headers.get("ETag"), e.read()
+
+
+def build_workload(base_url, size, seed):
+    """Request paths weighted towards drill-downs, drawn from the served deputies."""
+    status, _, body = fetch(f"{base_url}/api/deputies?pageSize=500")
+    if status != 200:
+        raise SystemExit(f"Server did not return deputies (HTTP {status})")
+    deputies = json.loads(body)["data"]
+    if not deputies:
+        raise SystemExit("Server has no deputies loaded")
+
+    rng = random.Random(seed)
+    detail = json.loads(fetch(f"{base_url}/api/deputies/{deputies[0]['id']}")[2])
+    cnpjs = [s["cnpj"] for s in detail.get("topSuppliers", []) if s.get("cnpj")] or [""]
+    parties = sorted({d["party"] for d in deputies})
+    ufs = sorted({d["uf"] for d in deputies})
+    years = (2023, 2024, 2025)
+
+    templates = [
+        (4, lambda d: f"/api/transactions?deputy={d['id']}&page={rng.randint(1, 3)}"),
+        (2, lambda d: f"/api/transactions?deputy={d['id']}&year={rng.choice(years)}"),
+        (2, lambda d: f"/api/summary?by=month&deputy={d['id']}"),
+        (2, lambda d: f"/api/summary?by=category&party={quote(d['party'])}&year={rng.choice(years)}"),
+        (1, lambda d: f"/api/summary?by=supplier&uf={quote(rng.choice(ufs))}"),
+        (1, lambda d: f"/api/deputies?party={quote(rng.choice(parties))}&sort=riskScore"),
+        (1, lambda d: f"/api/deputies/{d['id']}"),
+        (1, lambda d: f"/api/suppliers/{rng.choice(cnpjs)}"),
+    ]
+    weights = [w for w, _ in templates]
+    paths = []
+    for _ in range(size):
+        _, template = rng.choices(templates, weights)[0]
+        paths.append(template(rng.choice(deputies)))
+    return paths
+
+
+def run(base_url, paths, concurrency, revalidate):
+    """Replay paths from a thread pool; returns per-request latencies (ms) and status counts."""
+    etags = {}
+
+    def one(path):
+        start = time.perf_counter()
+        status, etag, _ = fetch(base_url + path, etags.get(path) if revalidate else None)
+        elapsed = (time.perf_counter() - start) * 1000
+        if etag:
+            etags[path] = etag
+        return elapsed, status
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, paths))
+    wall = time.perf_counter() - wall_start
+
+    latencies = np.array([r[0] for r in results])
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return latencies, statuses, wall
+
+
+def report(label, latencies, statuses, wall):
+    print(f"\n{label}")
+    print(f"  - Requests:   {len(latencies):,} in {wall:.2f}s ({len(latencies) / wall:,.0f} req/s)")
+    print(f"  - Latency ms: p50 {np.percentile(latencies, 50):.2f}  p90 {np.percentile(latencies, 90):.2f}  "
+          f"p99 {np.percentile(latencies, 99):.2f}  max {latencies.max():.2f}")
+    print(f"  - Status:     {', '.join(f'{k}: {v:,}' for k, v in sorted(statuses.items()))}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Measure latency and throughput of the local query API.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="Server base URL")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per phase")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client threads")
+    parser.add_argument("--seed", type=int, default=42, help="Workload seed (same seed = same request mix)")
+    parser.add_argument("--revalidate", action="store_true",
+                        help="Send If-None-Match with previously seen ETags (304 path)")
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip("/")
+    paths = build_workload(base_url, args.requests, args.seed)
+    print(f"Workload: {len(paths):,} requests, {len(set(paths)):,} distinct, concurrency {args.concurrency}")
+
+    # First pass fills the server's LRU; the replay shows the warm-cache numbers
+    report("Cold (first pass)", *run(base_url, paths, args.concurrency, False))
+    report("Warm (replay)", *run(base_url, paths, args.concurrency, args.revalidate))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
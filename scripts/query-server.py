@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+CEAP Dashboard local query API
+
+Optional read-only HTTP service over the pipeline outputs, for drill-downs that are too
+big to ship as static JSON. Deputies, supplier profiles and aggregations are read from
+public/data/, transactions from the same expense files prepare-data.py reads; everything
+is loaded once and indexed in memory.
+
+Usage:
+    python scripts/query-server.py [--port 8765] [--cache-size 1024]
+
+Endpoints (GET, JSON):
+    /api/health
+    /api/aggregations
+    /api/deputies?party=PT&uf=SP&q=silva&sort=riskScore&page=1&pageSize=50
+    /api/deputies/<id>
+    /api/suppliers/<cnpj>
+    /api/transactions?deputy=<id>&supplier=<cnpj>&year=2024&month=3&category=...&party=&uf=&page=&pageSize=
+    /api/summary?by=month|year|category|party|uf|deputy|supplier&<same filters as transactions>
+
+Responses carry an ETag; repeated queries are answered from an LRU cache and
+If-None-Match requests get 304.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = Path(__file__).parent
+
+# prepare-data.py is not importable by name (hyphen); load it for its loaders and helpers
+_spec = importlib.util.spec_from_file_location("prepare_data", SCRIPT_DIR / "prepare-data.py")
+pipeline = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(pipeline)
+
+DEFAULT_PORT = 8765
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_CACHE_SIZE = 1024
+
+# Query parameter -> transaction column it filters
+FILTER_DIMENSIONS = ("deputy", "supplier", "year", "month", "category", "party", "uf")
+SUMMARY_DIMENSIONS = ("month", "year", "category", "party", "uf", "deputy", "supplier")
+# Transaction record field -> column in the in-memory table
+TRANSACTION_FIELDS = {
+    "date": "date", "year": "year", "month": "month", "deputyId": "deputy", "deputyName": "deputyName",
+    "party": "party", "uf": "uf", "category": "category", "cnpj": "supplier", "supplierName": "supplierName",
+    "value": "value",
+}
+DEPUTY_SORT_FIELDS = ("totalSpending", "riskScore", "transactionCount", "avgTicket", "supplierCount", "name")
+
+
+class QueryError(Exception):
+    """Bad request (400) or missing resource (404)."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _read_json(path, default=None):
+    if not path.exists():
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _int_column(df, column):
+    if column not in df.columns:
+        return pd.Series(0, index=df.index)
+    return pd.to_numeric(df[column], errors="coerce").fillna(0).astype(int)
+
+
+def _page_params(params):
+    try:
+        page = int(params.get("page", 1))
+        page_size = int(params.get("pageSize", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise QueryError("page and pageSize must be integers")
+    if page < 1 or page_size < 1:
+        raise QueryError("page and pageSize must be positive")
+    return page, min(page_size, MAX_PAGE_SIZE)
+
+
+def _paginate(total, page, page_size):
+    start = (page - 1) * page_size
+    return start, min(start + page_size, total), {
+        "page": page,
+        "pageSize": page_size,
+        "total": int(total),
+        "pages": int(-(-total // page_size)),
+    }
+
+
+class QueryIndex:
+    """In-memory deputies, supplier profiles and a transaction table with per-dimension postings."""
+
+    def __init__(self, output_dir, expenses_df):
+        start = time.perf_counter()
+        self.aggregations = _read_json(output_dir / "aggregations.json", {})
+        self.deputies = _read_json(output_dir / "deputies.json", [])
+        manifest = _read_json(output_dir / "manifest.json", {})
+        self.generation = manifest.get("generation") or manifest.get("generated_at") or ""
+
+        self.deputies_by_id = {d["id"]: d for d in self.deputies}
+        self.suppliers = {}
+        suppliers_dir = output_dir / "suppliers"
+        for shard in sorted(suppliers_dir.glob("*.json")) if suppliers_dir.exists() else []:
+            if shard.name != "index.json":
+                for profile in _read_json(shard, []):
+                    self.suppliers[profile["cnpj"]] = profile
+
+        self._build_transactions(expenses_df)
+        print(f"  - Indexed {len(self.deputies):,} deputies, {len(self.suppliers):,} suppliers and "
+              f"{self.row_count:,} transactions in {time.perf_counter() - start:.2f}s")
+
+    def _build_transactions(self, expenses_df):
+        """Column arrays sorted newest first, plus {dimension: {key: ascending row positions}}."""
+        df = expenses_df
+        deputy_col = "txNomeParlamentar" if "txNomeParlamentar" in df.columns else "nomeParlamentar"
+        value_col = "vlrLiquido" if "vlrLiquido" in df.columns else "vlrDocumento"
+        supplier_col = "txtFornecedor" if "txtFornecedor" in df.columns else "fornecedor"
+
+        ids_by_name = {d["name"]: d["id"] for d in self.deputies}
+        issued = pd.to_datetime(df["datEmissao"], errors="coerce") if "datEmissao" in df.columns else None
+        columns = {
+            "date": issued.dt.strftime("%Y-%m-%d").fillna("") if issued is not None else pd.Series("", index=df.index),
+            "year": _int_column(df, "numAno"),
+            "month": _int_column(df, "numMes"),
+            "deputy": df[deputy_col].map(ids_by_name).fillna(0).astype(int),
+            "deputyName": df[deputy_col].astype(str),
+            "party": df["sgPartido"].fillna("").astype(str).str.upper() if "sgPartido" in df.columns else "",
+            "uf": df["sgUF"].fillna("").astype(str).str.upper() if "sgUF" in df.columns else "",
+            "category": df["txtDescricao"].fillna("").astype(str) if "txtDescricao" in df.columns else "",
+            "supplierName": df[supplier_col].fillna("").astype(str),
+            "supplier": pipeline.canonical_documents(df["txtCNPJCPF"]) if "txtCNPJCPF" in df.columns else "",
+            "value": df[value_col].astype(float),
+        }
+        table = pd.DataFrame(columns, index=df.index)
+        if issued is not None:
+            table = table.iloc[np.argsort(-issued.fillna(pd.Timestamp(0)).to_numpy().astype("int64"), kind="stable")]
+        table = table.reset_index(drop=True)
+
+        self.row_count = len(table)
+        self.columns = {name: table[name].to_numpy() for name in table.columns}
+
+        # Categories are matched by folded key; fold each distinct label once
+        labels, label_codes = np.unique(table["category"].to_numpy(dtype=str), return_inverse=True)
+        folded = np.array([pipeline.category_key(label) for label in labels], dtype=object)
+        self.category_keys = {}
+        for key, label in zip(folded, labels):
+            self.category_keys.setdefault(key, str(label))
+
+        self.codes = {}
+        self.labels = {}
+        self.postings = {}
+        for dimension in SUMMARY_DIMENSIONS:
+            values = folded[label_codes] if dimension == "category" else table[dimension].to_numpy()
+            codes, uniques = pd.factorize(values, sort=True)
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.codes[dimension] = codes
+            self.labels[dimension] = uniques
+            self.postings[dimension] = {
+                key: order[bounds[i]:bounds[i + 1]] for i, key in enumerate(uniques.tolist())
+            }
+
+    # ---- queries -------------------------------------------------------------------------
+
+    def _filter_key(self, dimension, raw):
+        try:
+            if dimension in ("deputy", "year", "month"):
+                return int(raw)
+        except ValueError:
+            raise QueryError(f"{dimension} must be an integer")
+        if dimension == "category":
+            return pipeline.category_key(raw)
+        if dimension == "supplier":
+            return pipeline.canonical_documents([raw]).iloc[0]
+        return raw.upper()
+
+    def select(self, params):
+        """Row positions (ascending = newest first) matching every filter given."""
+        lists = []
+        for dimension in FILTER_DIMENSIONS:
+            if params.get(dimension):
+                key = self._filter_key(dimension, params[dimension])
+                lists.append(self.postings[dimension].get(key, np.empty(0, dtype=np.intp)))
+        if not lists:
+            return np.arange(self.row_count)
+        lists.sort(key=len)
+        positions = lists[0]
+        for other in lists[1:]:
+            if len(positions) == 0:
+                break
+            positions = np.intersect1d(positions, other, assume_unique=True)
+        return positions
+
+    def transactions(self, params):
+        positions = self.select(params)
+        page, page_size = _page_params(params)
+        start, end, meta = _paginate(len(positions), page, page_size)
+        meta["totalValue"] = round(float(self.columns["value"][positions].sum()), 2)
+        rows = positions[start:end]
+        page_columns = [self.columns[column][rows].tolist() for column in TRANSACTION_FIELDS.values()]
+        data = [dict(zip(TRANSACTION_FIELDS, values)) for values in zip(*page_columns)]
+        return {"meta": meta, "data": data}
+
+    def summary(self, params):
+        dimension = params.get("by", "month")
+        if dimension not in SUMMARY_DIMENSIONS:
+            raise QueryError(f"by must be one of: {', '.join(SUMMARY_DIMENSIONS)}")
+        positions = self.select(params)
+        codes = self.codes[dimension][positions]
+        size = len(self.labels[dimension])
+        totals = np.bincount(codes, weights=self.columns["value"][positions], minlength=size)
+        counts = np.bincount(codes, minlength=size)
+        present = np.flatnonzero(counts)
+        if dimension not in ("month", "year"):
+            present = present[np.argsort(-totals[present], kind="stable")]
+
+        groups = []
+        for code in present:
+            key = self.labels[dimension][code]
+            key = key.item() if hasattr(key, "item") else key
+            if dimension == "category":
+                key = self.category_keys.get(key, key)
+            groups.append({"key": key, "value": round(float(totals[code]), 2), "transactionCount": int(counts[code])})
+        return {
+            "meta": {"by": dimension, "total": len(groups), "transactionCount": int(len(positions)),
+                     "totalValue": round(float(totals.sum()), 2)},
+            "data": groups,
+        }
+
+    def deputy_list(self, params):
+        rows = self.deputies
+        if params.get("party"):
+            rows = [d for d in rows if d["party"].upper() == params["party"].upper()]
+        if params.get("uf"):
+            rows = [d for d in rows if d["uf"].upper() == params["uf"].upper()]
+        if params.get("riskLevel"):
+            rows = [d for d in rows if d["riskLevel"] == params["riskLevel"].upper()]
+        if params.get("q"):
+            query = pipeline.fold_text(params["q"])
+            rows = [d for d in rows if query in pipeline.fold_text(d["name"])]
+
+        sort = params.get("sort", "totalSpending")
+        if sort.lstrip("-") not in DEPUTY_SORT_FIELDS:
+            raise QueryError(f"sort must be one of: {', '.join(DEPUTY_SORT_FIELDS)} (prefix '-' for ascending)")
+        rows = sorted(rows, key=lambda d: d[sort.lstrip("-")], reverse=not sort.startswith("-"))
+
+        page, page_size = _page_params(params)
+        start, end, meta = _paginate(len(rows), page, page_size)
+        summary_fields = ("id", "name", "party", "uf", "totalSpending", "transactionCount", "avgTicket",
+                          "supplierCount", "riskScore", "riskLevel")
+        return {"meta": meta, "data": [{f: d[f] for f in summary_fields} for d in rows[start:end]]}
+
+    def route(self, path, params):
+        parts = [p for p in path.split("/") if p]
+        if parts[:1] != ["api"] or len(parts) < 2:
+            raise QueryError("not found", 404)
+        resource, rest = parts[1], parts[2:]
+
+        if resource == "health" and not rest:
+            return {"status": "ok", "generation": self.generation, "transactions": self.row_count}
+        if resource == "aggregations" and not rest:
+            return self.aggregations
+        if resource == "deputies" and not rest:
+            return self.deputy_list(params)
+        if resource == "deputies" and len(rest) == 1:
+            try:
+                deputy = self.deputies_by_id.get(int(rest[0]))
+            except ValueError:
+                raise QueryError("deputy id must be an integer")
+            if deputy is None:
+                raise QueryError("deputy not found", 404)
+            return deputy
+        if resource == "suppliers" and rest:
+            # Punctuated CNPJs ("12.345.678/0001-90") arrive split on the slash
+            profile = self.suppliers.get(self._filter_key("supplier", "".join(rest)))
+            if profile is None:
+                raise QueryError("supplier not found", 404)
+            return profile
+        if resource == "transactions" and not rest:
+            return self.transactions(params)
+        if resource == "summary" and not rest:
+            return self.summary(params)
+        raise QueryError("not found", 404)
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded responses keyed by normalized request."""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+def make_handler(index, cache, verbose=False):
+    """Request handler class bound to a loaded index and cache."""
+
+    class QueryHandler(BaseHTTPRequestHandler):
+        server_version = "CEAPQuery/1.0"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            key = url.path.rstrip("/") + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+
+            entry = cache.get(key)
+            if entry is None:
+                try:
+                    body = json.dumps(index.route(url.path, params), ensure_ascii=False,
+                                      separators=(",", ":")).encode("utf-8")
+                except QueryError as e:
+                    self._send(e.status, json.dumps({"error": str(e)}).encode("utf-8"))
+                    return
+                etag = '"' + hashlib.sha1(index.generation.encode() + body).hexdigest()[:20] + '"'
+                entry = (etag, body)
+                cache.put(key, entry)
+
+            etag, body = entry
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", etag)
+            else:
+                self._send(200, body, etag)
+
+        def _send(self, status, body, etag=None):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return QueryHandler
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Serve read-only CEAP queries over the pipeline outputs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-dir", type=Path, default=pipeline.DATA_DIR, help="Processed CSV directory")
+    parser.add_argument("--output-dir", type=Path, default=pipeline.OUTPUT_DIR, help="Generated JSON directory")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="LRU entries (0 disables)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("CEAP Query API")
+    print("=" * 60)
+
+    pipeline.DATA_DIR = args.data_dir
+    data = pipeline.load_data()
+    if data["expenses"].empty:
+        print("  ! No expense data found, transaction endpoints will be empty")
+    index = QueryIndex(args.output_dir, data["expenses"])
+    cache = ResponseCache(args.cache_size)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(index, cache, args.verbose))
+    print(f"\nListening on http://{args.host}:{args.port}/api/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nCache: {cache.hits:,} hits, {cache.misses:,} misses")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
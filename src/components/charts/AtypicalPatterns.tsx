@@ -1,6 +1,7 @@
 import { useMemo } from 'react';
 import type { Deputy, MonthlyData, CategoryData } from '../../types/data';
 import { formatReais } from '../../utils/formatters';
+import { useOutliers } from '../../hooks/useFraudFlags';
 
 interface AtypicalPatternsProps {
   deputy: Deputy;
@@ -29,6 +30,8 @@ export function AtypicalPatterns({
   allDeputies,
   aggregatedCategories,
 }: AtypicalPatternsProps) {
+  const { data: outliers } = useOutliers();
+
   const patterns = useMemo(() => {
     const detected: Pattern[] = [];
 
@@ -211,8 +214,31 @@ export function AtypicalPatterns({
       });
     }
 
+    // 9. Atypical transactions (robust z-score within category and month, outliers.json)
+    if (deputy.outliers && deputy.outliers.count > 0 && outliers) {
+      const { count, pct, value } = deputy.outliers;
+      const { outlierCount, scoredTransactions, zThreshold } = outliers.meta;
+      const overallPct = scoredTransactions > 0 ? (outlierCount / scoredTransactions) * 100 : 0;
+
+      if (pct > overallPct) {
+        const extreme = outliers.transactions.find((t) => t.deputyId === deputy.id);
+        detected.push({
+          id: 'atypical-transactions',
+          title: 'Transações Atípicas',
+          description: `${count} transações (${pct.toFixed(1)}%) estão a mais de ${zThreshold} desvios robustos (MAD) da mediana da mesma categoria e mês, somando ${formatReais(value)}.` +
+            (extreme
+              ? ` A mais extrema: ${formatReais(extreme.value)} em ${extreme.category} (${extreme.month}), contra mediana de ${formatReais(extreme.groupMedian)}.`
+              : ''),
+          value: `${pct.toFixed(1)}%`,
+          comparison: `Geral: ${overallPct.toFixed(1)}%`,
+          severity: pct > overallPct * 3 ? 'high' : pct > overallPct * 1.5 ? 'moderate' : 'info',
+          icon: '🔍',
+        });
+      }
+    }
+
     return detected;
-  }, [deputy, allDeputies, aggregatedCategories]);
+  }, [deputy, allDeputies, aggregatedCategories, outliers]);
 
   if (patterns.length === 0) {
     return (
@@ -1,11 +1,12 @@
 import { useRef, useEffect, useMemo } from 'react';
 import * as d3 from 'd3';
-import type { Deputy, Aggregations } from '../../types/data';
+import type { Deputy, Aggregations, DataQuality } from '../../types/data';
 import { formatNumber, formatReais, formatPercent } from '../../utils/formatters';
 
 interface DataQualityDashboardProps {
   deputies: Deputy[];
   aggregations: Aggregations;
+  quality?: DataQuality;  // data-quality.json profile of the raw expenses, when loaded
   height?: number;
 }
 
@@ -29,6 +30,7 @@ interface DataIssue {
 export function DataQualityDashboard({
   deputies,
   aggregations,
+  quality,
   height = 300,
 }: DataQualityDashboardProps) {
   const completenessRef = useRef<HTMLDivElement>(null);
@@ -184,11 +186,53 @@ export function DataQualityDashboard({
       });
     }
 
+    // Raw expense checks from the pipeline's column profile
+    const supplierDocs = quality?.documents.supplier;
+    if (supplierDocs) {
+      const invalidDocs = supplierDocs.invalidCnpj + supplierDocs.invalidCpf + supplierDocs.invalidLength;
+      if (invalidDocs > 0) {
+        issues.push({
+          type: 'suspicious',
+          severity: invalidDocs / Math.max(supplierDocs.checked, 1) > 0.01 ? 'high' : 'medium',
+          message: `${formatNumber(invalidDocs)} transacoes com CNPJ/CPF de digito verificador invalido`,
+          count: invalidDocs,
+        });
+      }
+      if (supplierDocs.empty > 0) {
+        issues.push({
+          type: 'missing',
+          severity: 'low',
+          message: `${formatNumber(supplierDocs.empty)} transacoes sem CNPJ/CPF do fornecedor`,
+          count: supplierDocs.empty,
+        });
+      }
+    }
+
+    const exactDuplicates = quality?.duplicates.exactRows ?? 0;
+    if (exactDuplicates > 0) {
+      issues.push({
+        type: 'suspicious',
+        severity: 'medium',
+        message: `${formatNumber(exactDuplicates)} linhas duplicadas na base de despesas`,
+        count: exactDuplicates,
+      });
+    }
+
+    const sameKeyDuplicates = quality?.duplicates.sameDeputySupplierValueDate ?? 0;
+    if (sameKeyDuplicates > 0) {
+      issues.push({
+        type: 'suspicious',
+        severity: 'low',
+        message: `${formatNumber(sameKeyDuplicates)} despesas repetidas (mesmo deputado, fornecedor, valor e data)`,
+        count: sameKeyDuplicates,
+      });
+    }
+
     return issues.sort((a, b) => {
       const severityOrder = { high: 0, medium: 1, low: 2 };
       return severityOrder[a.severity] - severityOrder[b.severity];
     });
-  }, [deputies]);
+  }, [deputies, quality]);
 
   // Calculate overall data quality score
   const qualityScore = useMemo(() => {
@@ -221,7 +265,13 @@ export function DataQualityDashboard({
 
   // Data coverage by time
   const dataCoverage = useMemo(() => {
-    const months = aggregations.byMonth || [];
+    // Prefer the profile's month list: it counts raw expense rows, before any aggregation
+    const months = quality?.completeness.months.length
+      ? quality.completeness.months.map((month, i) => ({
+          month,
+          transactionCount: quality.completeness.transactions[i],
+        }))
+      : aggregations.byMonth || [];
     if (months.length === 0) return null;
 
     const sortedMonths = [...months].sort((a, b) => a.month.localeCompare(b.month));
@@ -236,7 +286,7 @@ export function DataQualityDashboard({
       monthsWithData,
       coverage: (monthsWithData / months.length) * 100,
     };
-  }, [aggregations]);
+  }, [aggregations, quality]);
 
   // D3 distribution chart
   useEffect(() => {
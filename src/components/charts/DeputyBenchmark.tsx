@@ -2,6 +2,7 @@ import { useEffect, useRef, useState, useMemo } from 'react';
 import * as d3 from 'd3';
 import type { Deputy } from '../../types/data';
 import { formatReais } from '../../utils/formatters';
+import { useDistributions, useUnfilteredDistributions, getPercentileRank } from '../../hooks/useDistributions';
 
 interface DeputyBenchmarkProps {
   deputies: Deputy[];
@@ -18,6 +19,8 @@ interface BenchmarkData {
   vsPartyPct: number;
   vsStatePct: number;
   anomalyScore: number;
+  partyRank: number | null;  // Spending percentile within the party (distributions.json)
+  stateRank: number | null;
 }
 
 export function DeputyBenchmark({
@@ -30,28 +33,39 @@ export function DeputyBenchmark({
   const containerRef = useRef<HTMLDivElement>(null);
   const tooltipRef = useRef<HTMLDivElement>(null);
   const [sortBy, setSortBy] = useState<'anomaly' | 'vsParty' | 'vsState'>('anomaly');
+  const { data: distributions } = useDistributions();
+  // Precomputed party/UF means stand in for the filtered aggregates when nothing is filtered
+  const spending = useUnfilteredDistributions()?.metrics.totalSpending;
 
   // Memoize party averages map
   const partyAvgMap = useMemo(() => {
     const map = new Map<string, number>();
-    partyData.forEach((p) => map.set(p.party, p.avgPerDeputy));
+    if (spending) {
+      Object.entries(spending.byParty).forEach(([party, g]) => map.set(party, g.mean));
+    } else {
+      partyData.forEach((p) => map.set(p.party, p.avgPerDeputy));
+    }
     return map;
-  }, [partyData]);
+  }, [partyData, spending]);
 
   // Memoize state averages map
   const stateAvgMap = useMemo(() => {
     const map = new Map<string, number>();
-    stateData.forEach((s) => map.set(s.uf, s.avgPerDeputy));
+    if (spending) {
+      Object.entries(spending.byUf).forEach(([uf, g]) => map.set(uf, g.mean));
+    } else {
+      stateData.forEach((s) => map.set(s.uf, s.avgPerDeputy));
+    }
     return map;
-  }, [stateData]);
+  }, [stateData, spending]);
 
   // Calculate global average
-  const globalAvg = useMemo(() =>
-    deputies.length
+  const globalAvg = useMemo(() => {
+    if (spending) return spending.mean;
+    return deputies.length
       ? deputies.reduce((sum, d) => sum + d.totalSpending, 0) / deputies.length
-      : 800000,
-    [deputies]
-  );
+      : 800000;
+  }, [deputies, spending]);
 
   // Memoize benchmark data to prevent unnecessary recalculations
   const sortedData = useMemo(() => {
@@ -72,6 +86,8 @@ export function DeputyBenchmark({
           vsPartyPct,
           vsStatePct,
           anomalyScore,
+          partyRank: null,
+          stateRank: null,
         };
       });
 
@@ -81,8 +97,13 @@ export function DeputyBenchmark({
         if (sortBy === 'vsParty') return b.vsPartyPct - a.vsPartyPct;
         return b.vsStatePct - a.vsStatePct;
       })
-      .slice(0, maxItems);
-  }, [deputies, partyAvgMap, stateAvgMap, globalAvg, sortBy, maxItems]);
+      .slice(0, maxItems)
+      .map((d) => distributions ? {
+        ...d,
+        partyRank: getPercentileRank(distributions, d.deputy.id, 'totalSpending', 'party'),
+        stateRank: getPercentileRank(distributions, d.deputy.id, 'totalSpending', 'uf'),
+      } : d);
+  }, [deputies, partyAvgMap, stateAvgMap, globalAvg, sortBy, maxItems, distributions]);
 
   useEffect(() => {
     if (!containerRef.current || sortedData.length === 0) return;
@@ -200,6 +221,13 @@ export function DeputyBenchmark({
                 ${d.vsStatePct >= 0 ? '+' : ''}${d.vsStatePct.toFixed(1)}%
               </span>
             </div>
+            ${d.partyRank !== null && d.stateRank !== null ? `
+            <div style="display: flex; justify-content: space-between; gap: 16px; margin-top: 4px;">
+              <span style="color: #6B7280;">Percentil partido / UF:</span>
+              <span style="font-family: monospace; color: #A0A3B1;">
+                ${d.partyRank.toFixed(0)}º / ${d.stateRank.toFixed(0)}º
+              </span>
+            </div>` : ''}
           </div>
         </div>
       `;
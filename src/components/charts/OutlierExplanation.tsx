@@ -2,6 +2,7 @@ import { useRef, useEffect, useMemo } from 'react';
 import * as d3 from 'd3';
 import type { Deputy } from '../../types/data';
 import { formatReais, formatNumber, formatPercent } from '../../utils/formatters';
+import { useOutliers } from '../../hooks/useFraudFlags';
 
 interface OutlierExplanationProps {
   deputy: Deputy;
@@ -138,6 +139,13 @@ export function OutlierExplanation({
   const containerRef = useRef<HTMLDivElement>(null);
   const svgRef = useRef<SVGSVGElement>(null);
   const tooltipRef = useRef<HTMLDivElement>(null);
+  const { data: outliers } = useOutliers();
+
+  // The deputy's entries among the most extreme transactions in outliers.json
+  const extremeTransactions = useMemo(
+    () => (outliers?.transactions ?? []).filter((t) => t.deputyId === deputy.id).slice(0, 5),
+    [outliers, deputy.id]
+  );
 
   // Calculate statistics and outlier analysis
   const analysis = useMemo((): MetricAnalysis[] => {
@@ -457,12 +465,40 @@ export function OutlierExplanation({
         </div>
       )}
 
+      {/* Atypical transactions (outliers.json) */}
+      {deputy.outliers && deputy.outliers.count > 0 && (
+        <div className="mt-4 space-y-2">
+          <h4 className="text-sm font-semibold text-text-secondary">
+            Transações atípicas: {formatNumber(deputy.outliers.count)} ({formatPercent(deputy.outliers.pct)}),{' '}
+            {formatReais(deputy.outliers.value, true)}
+          </h4>
+          {extremeTransactions.map((t, i) => (
+            <div key={`${t.month}-${t.cnpj}-${i}`} className="p-3 rounded-lg border bg-bg-secondary border-border">
+              <div className="flex items-center justify-between">
+                <span className="text-sm font-medium text-text-primary truncate">{t.supplierName}</span>
+                <span className="text-sm font-mono text-risk-high">{formatReais(t.value)}</span>
+              </div>
+              <p className="text-xs text-text-muted mt-1">
+                {t.category} · {t.date ?? t.month} · mediana da categoria no mês {formatReais(t.groupMedian)} · Z robusto{' '}
+                {t.robustZ.toFixed(1)}
+              </p>
+            </div>
+          ))}
+        </div>
+      )}
+
       {/* Methodology note */}
       <div className="mt-4 p-3 bg-bg-card border border-border rounded-lg">
         <p className="text-xs text-text-muted">
           <span className="font-medium text-text-secondary">Metodologia:</span> Outliers são
           identificados usando Z-score (desvios-padrão da média). Valores com |Z| &gt; 2 são
           considerados atípicos. A cor indica severidade baseada no contexto de cada métrica.
+          {outliers && (
+            <>
+              {' '}Transações atípicas usam Z robusto (mediana e MAD) dentro da mesma categoria e mês,
+              com |Z| &gt; {outliers.meta.zThreshold}.
+            </>
+          )}
         </p>
       </div>
     </div>
@@ -1,25 +1,10 @@
 import { useMemo, useRef, useEffect, useState } from 'react';
 import * as d3 from 'd3';
-import type { Deputy } from '../../types/data';
+import type { PartyNetwork } from '../../types/data';
 import { formatReais, formatNumber } from '../../utils/formatters';
 
 interface PartyNetworkAnalysisProps {
-  deputies: Deputy[];
-}
-
-interface PartyStats {
-  party: string;
-  deputyCount: number;
-  totalSpending: number;
-  avgHHI: number;
-  suppliers: Set<string>;
-}
-
-interface PartyConnection {
-  party1: string;
-  party2: string;
-  sharedSuppliers: string[];
-  totalValue: number;
+  network: PartyNetwork;  // party-network.json (all deputies, all supplier entities)
 }
 
 // Party colors (Brazilian political parties)
@@ -50,88 +35,19 @@ const getPartyColor = (party: string): string => {
   return PARTY_COLORS[party] || '#6B7280';
 };
 
-export function PartyNetworkAnalysis({ deputies }: PartyNetworkAnalysisProps) {
+export function PartyNetworkAnalysis({ network }: PartyNetworkAnalysisProps) {
   const svgRef = useRef<SVGSVGElement>(null);
   const containerRef = useRef<HTMLDivElement>(null);
   const tooltipRef = useRef<HTMLDivElement>(null);
   const [activeView, setActiveView] = useState<'network' | 'table' | 'stats'>('network');
   const [selectedParty, setSelectedParty] = useState<string | null>(null);
 
-  // Analyze party data
-  const { partyStats, connections, topConnections } = useMemo(() => {
-    // Build party stats
-    const statsMap = new Map<string, PartyStats>();
-
-    deputies.forEach((d) => {
-      if (!statsMap.has(d.party)) {
-        statsMap.set(d.party, {
-          party: d.party,
-          deputyCount: 0,
-          totalSpending: 0,
-          avgHHI: 0,
-          suppliers: new Set(),
-        });
-      }
-
-      const stats = statsMap.get(d.party)!;
-      stats.deputyCount++;
-      stats.totalSpending += d.totalSpending;
-      stats.avgHHI += d.hhi.value;
-
-      // Add top suppliers
-      d.topSuppliers.forEach((s) => {
-        stats.suppliers.add(s.name.toLowerCase().trim());
-      });
-    });
-
-    // Calculate averages
-    const partyStatsList: PartyStats[] = [];
-    statsMap.forEach((stats) => {
-      stats.avgHHI = stats.avgHHI / stats.deputyCount;
-      partyStatsList.push(stats);
-    });
-
-    // Sort by total spending
-    partyStatsList.sort((a, b) => b.totalSpending - a.totalSpending);
-
-    // Find connections between parties via shared suppliers
-    const connectionsList: PartyConnection[] = [];
-    const parties = partyStatsList.map((p) => p.party);
-
-    for (let i = 0; i < parties.length; i++) {
-      for (let j = i + 1; j < parties.length; j++) {
-        const party1Stats = statsMap.get(parties[i])!;
-        const party2Stats = statsMap.get(parties[j])!;
-
-        // Find shared suppliers
-        const shared: string[] = [];
-        party1Stats.suppliers.forEach((supplier) => {
-          if (party2Stats.suppliers.has(supplier)) {
-            shared.push(supplier);
-          }
-        });
-
-        if (shared.length >= 3) {
-          // Only show connections with 3+ shared suppliers
-          connectionsList.push({
-            party1: parties[i],
-            party2: parties[j],
-            sharedSuppliers: shared,
-            totalValue: party1Stats.totalSpending + party2Stats.totalSpending,
-          });
-        }
-      }
-    }
-
-    // Sort connections by number of shared suppliers
-    connectionsList.sort((a, b) => b.sharedSuppliers.length - a.sharedSuppliers.length);
-
-    return {
-      partyStats: partyStatsList,
-      connections: connectionsList,
-      topConnections: connectionsList.slice(0, 10),
-    };
-  }, [deputies]);
+  // Party stats and shared-supplier pairs are precomputed by prepare-data.py
+  const { partyStats, connections, topConnections } = useMemo(() => ({
+    partyStats: network.parties,
+    connections: network.connections,
+    topConnections: network.connections.slice(0, 10),
+  }), [network]);
 
   // Network visualization
   useEffect(() => {
@@ -169,7 +85,7 @@ export function PartyNetworkAnalysis({ deputies }: PartyNetworkAnalysisProps) {
       deputyCount: p.deputyCount,
       totalSpending: p.totalSpending,
       avgHHI: p.avgHHI,
-      supplierCount: p.suppliers.size,
+      supplierCount: p.supplierCount,
     }));
 
     const nodeIds = new Set(nodes.map((n) => n.id));
@@ -179,7 +95,7 @@ export function PartyNetworkAnalysis({ deputies }: PartyNetworkAnalysisProps) {
       .map((c) => ({
         source: c.party1,
         target: c.party2,
-        sharedCount: c.sharedSuppliers.length,
+        sharedCount: c.sharedSuppliers,
       }));
 
     // Size scale based on total spending
@@ -412,7 +328,7 @@ export function PartyNetworkAnalysis({ deputies }: PartyNetworkAnalysisProps) {
                   return (
                     <div key={`${c.party1}-${c.party2}`} className="flex items-center justify-between text-xs">
                       <span className="text-text-secondary">{otherParty}</span>
-                      <span className="text-accent-teal">{c.sharedSuppliers.length} fornec.</span>
+                      <span className="text-accent-teal">{c.sharedSuppliers} fornec.</span>
                     </div>
                   );
                 })}
@@ -455,14 +371,14 @@ export function PartyNetworkAnalysis({ deputies }: PartyNetworkAnalysisProps) {
                   <td className="p-2 text-right">
                     <span
                       className={`font-mono ${
-                        c.sharedSuppliers.length >= 20
+                        c.sharedSuppliers >= 20
                           ? 'text-risk-critical'
-                          : c.sharedSuppliers.length >= 10
+                          : c.sharedSuppliers >= 10
                           ? 'text-risk-high'
                           : 'text-text-primary'
                       }`}
                     >
-                      {c.sharedSuppliers.length}
+                      {c.sharedSuppliers}
                     </span>
                   </td>
                 </tr>
@@ -504,7 +420,7 @@ export function PartyNetworkAnalysis({ deputies }: PartyNetworkAnalysisProps) {
                 </div>
                 <div>
                   <p className="text-text-muted">Fornecedores</p>
-                  <p className="font-medium text-text-primary">{formatNumber(p.suppliers.size)}</p>
+                  <p className="font-medium text-text-primary">{formatNumber(p.supplierCount)}</p>
                 </div>
               </div>
             </div>
@@ -513,12 +429,12 @@ export function PartyNetworkAnalysis({ deputies }: PartyNetworkAnalysisProps) {
       )}
 
       {/* Insight */}
-      {topConnections.length > 0 && topConnections[0].sharedSuppliers.length >= 15 && (
+      {topConnections.length > 0 && topConnections[0].sharedSuppliers >= 15 && (
         <div className="mt-4 p-3 bg-accent-gold/10 border border-accent-gold/30 rounded-lg">
           <p className="text-sm text-accent-gold">
             <span className="font-bold">{topConnections[0].party1}</span> e{' '}
             <span className="font-bold">{topConnections[0].party2}</span> compartilham{' '}
-            <span className="font-bold">{topConnections[0].sharedSuppliers.length}</span> fornecedores em comum.
+            <span className="font-bold">{topConnections[0].sharedSuppliers}</span> fornecedores em comum.
           </p>
         </div>
       )}
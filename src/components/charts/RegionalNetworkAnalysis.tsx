@@ -1,28 +1,12 @@
 import { useMemo, useRef, useEffect, useState } from 'react';
 import * as d3 from 'd3';
-import type { Deputy } from '../../types/data';
+import type { RegionNetwork } from '../../types/data';
 import { formatReais, formatNumber } from '../../utils/formatters';
 
 interface RegionalNetworkAnalysisProps {
-  deputies: Deputy[];
+  network: RegionNetwork;  // region-network.json (all deputies, all supplier entities)
 }
 
-// Brazilian regions and their states
-const REGIONS: Record<string, string[]> = {
-  Norte: ['AC', 'AP', 'AM', 'PA', 'RO', 'RR', 'TO'],
-  Nordeste: ['AL', 'BA', 'CE', 'MA', 'PB', 'PE', 'PI', 'RN', 'SE'],
-  'Centro-Oeste': ['DF', 'GO', 'MS', 'MT'],
-  Sudeste: ['ES', 'MG', 'RJ', 'SP'],
-  Sul: ['PR', 'RS', 'SC'],
-};
-
-const STATE_TO_REGION: Record<string, string> = {};
-Object.entries(REGIONS).forEach(([region, states]) => {
-  states.forEach((state) => {
-    STATE_TO_REGION[state] = region;
-  });
-});
-
 // Region colors
 const REGION_COLORS: Record<string, string> = {
   Norte: '#10B981',
@@ -32,133 +16,20 @@ const REGION_COLORS: Record<string, string> = {
   Sul: '#EC4899',
 };
 
-interface StateStats {
-  uf: string;
-  region: string;
-  deputyCount: number;
-  totalSpending: number;
-  avgHHI: number;
-  suppliers: Set<string>;
-}
-
-interface StateConnection {
-  state1: string;
-  state2: string;
-  region1: string;
-  region2: string;
-  sharedSuppliers: number;
-  crossRegion: boolean;
-}
-
-export function RegionalNetworkAnalysis({ deputies }: RegionalNetworkAnalysisProps) {
+export function RegionalNetworkAnalysis({ network }: RegionalNetworkAnalysisProps) {
   const svgRef = useRef<SVGSVGElement>(null);
   const containerRef = useRef<HTMLDivElement>(null);
   const tooltipRef = useRef<HTMLDivElement>(null);
   const [activeView, setActiveView] = useState<'network' | 'regions' | 'crossregion'>('network');
   const [selectedRegion, setSelectedRegion] = useState<string | null>(null);
 
-  // Analyze state and region data
-  const { stateStats, regionStats, connections, crossRegionConnections } = useMemo(() => {
-    // Build state stats
-    const statesMap = new Map<string, StateStats>();
-
-    deputies.forEach((d) => {
-      if (!statesMap.has(d.uf)) {
-        statesMap.set(d.uf, {
-          uf: d.uf,
-          region: STATE_TO_REGION[d.uf] || 'Desconhecido',
-          deputyCount: 0,
-          totalSpending: 0,
-          avgHHI: 0,
-          suppliers: new Set(),
-        });
-      }
-
-      const stats = statesMap.get(d.uf)!;
-      stats.deputyCount++;
-      stats.totalSpending += d.totalSpending;
-      stats.avgHHI += d.hhi.value;
-
-      d.topSuppliers.forEach((s) => {
-        stats.suppliers.add(s.name.toLowerCase().trim());
-      });
-    });
-
-    // Calculate averages and build list
-    const stateStatsList: StateStats[] = [];
-    statesMap.forEach((stats) => {
-      if (stats.deputyCount > 0) {
-        stats.avgHHI = stats.avgHHI / stats.deputyCount;
-        stateStatsList.push(stats);
-      }
-    });
-    stateStatsList.sort((a, b) => b.totalSpending - a.totalSpending);
-
-    // Aggregate by region
-    const regionMap = new Map<string, { deputyCount: number; totalSpending: number; avgHHI: number; states: string[] }>();
-    stateStatsList.forEach((state) => {
-      if (!regionMap.has(state.region)) {
-        regionMap.set(state.region, { deputyCount: 0, totalSpending: 0, avgHHI: 0, states: [] });
-      }
-      const reg = regionMap.get(state.region)!;
-      reg.deputyCount += state.deputyCount;
-      reg.totalSpending += state.totalSpending;
-      reg.avgHHI += state.avgHHI * state.deputyCount;
-      reg.states.push(state.uf);
-    });
-
-    const regionStatsList: { region: string; deputyCount: number; totalSpending: number; avgHHI: number; states: string[] }[] = [];
-    regionMap.forEach((stats, region) => {
-      regionStatsList.push({
-        region,
-        ...stats,
-        avgHHI: stats.deputyCount > 0 ? stats.avgHHI / stats.deputyCount : 0,
-      });
-    });
-    regionStatsList.sort((a, b) => b.totalSpending - a.totalSpending);
-
-    // Find connections between states via shared suppliers
-    const connectionsList: StateConnection[] = [];
-    const states = stateStatsList.map((s) => s.uf);
-
-    for (let i = 0; i < states.length; i++) {
-      for (let j = i + 1; j < states.length; j++) {
-        const state1Stats = statesMap.get(states[i])!;
-        const state2Stats = statesMap.get(states[j])!;
-
-        // Count shared suppliers
-        let sharedCount = 0;
-        state1Stats.suppliers.forEach((supplier) => {
-          if (state2Stats.suppliers.has(supplier)) {
-            sharedCount++;
-          }
-        });
-
-        if (sharedCount >= 5) {
-          const crossRegion = state1Stats.region !== state2Stats.region;
-          connectionsList.push({
-            state1: states[i],
-            state2: states[j],
-            region1: state1Stats.region,
-            region2: state2Stats.region,
-            sharedSuppliers: sharedCount,
-            crossRegion,
-          });
-        }
-      }
-    }
-
-    connectionsList.sort((a, b) => b.sharedSuppliers - a.sharedSuppliers);
-
-    const crossRegion = connectionsList.filter((c) => c.crossRegion);
-
-    return {
-      stateStats: stateStatsList,
-      regionStats: regionStatsList,
-      connections: connectionsList,
-      crossRegionConnections: crossRegion,
-    };
-  }, [deputies]);
+  // State/region stats and shared-supplier pairs are precomputed by prepare-data.py
+  const { stateStats, regionStats, connections, crossRegionConnections } = useMemo(() => ({
+    stateStats: network.states,
+    regionStats: network.regions,
+    connections: network.connections,
+    crossRegionConnections: network.connections.filter((c) => c.crossRegion),
+  }), [network]);
 
   // Network visualization
   useEffect(() => {
@@ -315,7 +186,7 @@ export function RegionalNetworkAnalysis({ deputies }: RegionalNetworkAnalysisPro
           <div class="text-xs text-text-secondary mt-2 space-y-1">
             <div>Deputados: <span class="text-text-primary font-medium">${d.deputyCount}</span></div>
             <div>Total: <span class="text-text-primary font-medium">${formatReais(d.totalSpending, true)}</span></div>
-            <div>Fornecedores: <span class="text-text-primary font-medium">${formatNumber(state?.suppliers.size || 0)}</span></div>
+            <div>Fornecedores: <span class="text-text-primary font-medium">${formatNumber(state?.supplierCount || 0)}</span></div>
             <div>Conexoes: <span class="text-text-primary font-medium">${stateConnections.length}</span></div>
           </div>
         `;
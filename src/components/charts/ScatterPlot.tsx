@@ -1,7 +1,8 @@
 import { useEffect, useRef, useState, useMemo } from 'react';
 import * as d3 from 'd3';
 import { useNavigate } from 'react-router-dom';
-import type { Deputy } from '../../types/data';
+import type { Deputy, DistributionMetric } from '../../types/data';
+import { useDistributions, useUnfilteredDistributions, getPercentileRank } from '../../hooks/useDistributions';
 import { colors, getRiskLevelColor } from '../../utils/colors';
 import { formatReais, formatNumber } from '../../utils/formatters';
 import { FEATURES } from '../../config/features';
@@ -33,6 +34,14 @@ const Y_METRIC_LABELS: Record<YMetric, string> = {
   spending: 'Gasto Total (R$)',
 };
 
+// Axis metrics summarized in distributions.json
+const DISTRIBUTION_KEYS: Partial<Record<XMetric | YMetric, DistributionMetric>> = {
+  spending: 'totalSpending',
+  hhi: 'hhi',
+  roundValuePct: 'roundValuePct',
+  benfordChi2: 'benfordChi2',
+};
+
 export function ScatterPlot({ deputies, height = 400 }: ScatterPlotProps) {
   const containerRef = useRef<HTMLDivElement>(null);
   const svgRef = useRef<SVGSVGElement>(null);
@@ -42,6 +51,8 @@ export function ScatterPlot({ deputies, height = 400 }: ScatterPlotProps) {
   const [xMetric, setXMetric] = useState<XMetric>('spending');
   const [yMetric, setYMetric] = useState<YMetric>('hhi');
   const [colorBy, setColorBy] = useState<ColorBy>('riskLevel');
+  const { data: distributions } = useDistributions();
+  const unfilteredDistributions = useUnfilteredDistributions();
 
   // Prepare data with computed values
   const scatterData = useMemo(() => {
@@ -141,20 +152,20 @@ export function ScatterPlot({ deputies, height = 400 }: ScatterPlotProps) {
     const denom = Math.sqrt(xDenom * yDenom);
     const r = denom === 0 ? 0 : numerator / denom;
 
+    // Axis summaries come precomputed when the view is unfiltered
+    const axisStats = (metric: XMetric | YMetric, values: number[], mean: number) => {
+      const key = DISTRIBUTION_KEYS[metric];
+      const summary = key ? unfilteredDistributions?.metrics[key] : undefined;
+      if (summary) return { min: summary.min, max: summary.max, avg: summary.mean };
+      return { min: d3.min(values) ?? 0, max: d3.max(values) ?? 0, avg: mean };
+    };
+
     return {
       correlation: r,
-      xStats: {
-        min: d3.min(xValues) ?? 0,
-        max: d3.max(xValues) ?? 0,
-        avg: xMean,
-      },
-      yStats: {
-        min: d3.min(yValues) ?? 0,
-        max: d3.max(yValues) ?? 0,
-        avg: yMean,
-      },
+      xStats: axisStats(xMetric, xValues, xMean),
+      yStats: axisStats(yMetric, yValues, yMean),
     };
-  }, [scatterData]);
+  }, [scatterData, xMetric, yMetric, unfilteredDistributions]);
 
   useEffect(() => {
     if (!scatterData.length || !containerRef.current || !svgRef.current || !tooltipRef.current) return;
@@ -222,6 +233,8 @@ export function ScatterPlot({ deputies, height = 400 }: ScatterPlotProps) {
 
         const xLabel = X_METRIC_LABELS[xMetric];
         const yLabel = Y_METRIC_LABELS[yMetric];
+        const yKey = DISTRIBUTION_KEYS[yMetric];
+        const yRank = distributions && yKey ? getPercentileRank(distributions, d.id, yKey) : null;
 
         tooltip
           .style('opacity', 1)
@@ -237,6 +250,10 @@ export function ScatterPlot({ deputies, height = 400 }: ScatterPlotProps) {
                <span class="text-text-muted">${yLabel.split(' ')[0]}:</span>
                <span class="font-medium">${formatMetricValue(d.y, yMetric)}</span>
              </div>
+             ${yRank !== null ? `<div class="tooltip-row flex justify-between gap-4">
+               <span class="text-text-muted">Percentil:</span>
+               <span class="font-medium">${yRank.toFixed(0)}º</span>
+             </div>` : ''}
              <div class="tooltip-row flex justify-between gap-4">
                <span class="text-text-muted">Risco:</span>
                <span class="font-medium" style="color: ${getRiskLevelColor(d.riskLevel)}">${d.riskLevel}</span>
@@ -325,7 +342,7 @@ export function ScatterPlot({ deputies, height = 400 }: ScatterPlotProps) {
         .text(Y_METRIC_LABELS[yMetric]);
     }
 
-  }, [scatterData, height, xMetric, yMetric, colorScale, navigate]);
+  }, [scatterData, height, xMetric, yMetric, colorScale, navigate, distributions]);
 
   // Helper functions
   function formatAxisLabel(value: number, metric: XMetric | YMetric): string {
@@ -1,12 +1,19 @@
 import { useEffect, useRef, useState, useMemo } from 'react';
 import * as d3 from 'd3';
 import type { Deputy } from '../../types/data';
+import { useUnfilteredDistributions } from '../../hooks/useDistributions';
 import { useThemeColors } from '../../utils/colors';
 import { formatReais, formatNumber } from '../../utils/formatters';
 import { getStandardMargins, getResponsiveFontSizes } from '../../utils/responsive';
 
 type MetricMode = 'spending' | 'transactions';
 
+interface HistogramBin {
+  x0: number;
+  x1: number;
+  count: number;
+}
+
 interface SpendingHistogramProps {
   deputies: Deputy[];
   bins?: number;
@@ -23,9 +30,28 @@ export function SpendingHistogram({
   const [mode, setMode] = useState<MetricMode>('spending');
   const themeColors = useThemeColors();
 
+  const distributions = useUnfilteredDistributions();
+
   // Compute histogram data
   const histogramData = useMemo(() => {
-    if (!deputies.length) return { bins: [], median: 0, p25: 0, p75: 0, max: 0, binWidth: 0 };
+    const empty = { bins: [] as HistogramBin[], median: 0, p25: 0, p75: 0, min: 0, max: 0, binWidth: 0, total: 0 };
+    if (!deputies.length) return empty;
+
+    // Unfiltered spending: read the precomputed histogram instead of binning every deputy
+    const spending = distributions?.metrics.totalSpending;
+    if (mode === 'spending' && spending && distributions.meta.bins === bins) {
+      const { edges, counts } = spending.histogram;
+      return {
+        bins: counts.map((count, i) => ({ x0: edges[i], x1: edges[i + 1], count })),
+        median: spending.median,
+        p25: spending.p25,
+        p75: spending.p75,
+        min: spending.min,
+        max: spending.max,
+        binWidth: edges[1] - edges[0],
+        total: spending.count,
+      };
+    }
 
     const values = deputies.map((d) =>
       mode === 'spending' ? d.totalSpending : d.transactionCount
@@ -46,17 +72,19 @@ export function SpendingHistogram({
       .domain([0, max + binWidth * 0.01] as [number, number]) // Slightly extend to include max value
       .thresholds(thresholds);
 
-    const binnedData = histogram(values);
+    const binnedData = histogram(values).map((b) => ({ x0: b.x0 ?? 0, x1: b.x1 ?? 0, count: b.length }));
 
     return {
       bins: binnedData,
       median,
       p25,
       p75,
+      min: sorted[0],
       max,
       binWidth,
+      total: values.length,
     };
-  }, [deputies, bins, mode]);
+  }, [deputies, bins, mode, distributions]);
 
   useEffect(() => {
     if (!deputies.length || !containerRef.current || !svgRef.current) return;
@@ -92,7 +120,7 @@ export function SpendingHistogram({
 
     const yScale = d3
       .scaleLinear()
-      .domain([0, d3.max(histogramData.bins, (d) => d.length) || 0])
+      .domain([0, d3.max(histogramData.bins, (d) => d.count) || 0])
       .range([chartHeight, 0])
       .nice();
 
@@ -111,8 +139,8 @@ export function SpendingHistogram({
       .data(histogramData.bins)
       .join('rect')
       .attr('class', 'bar')
-      .attr('x', (d) => xScale(d.x0 ?? 0) + barGap / 2)
-      .attr('width', (d) => Math.max(0, xScale(d.x1 ?? 0) - xScale(d.x0 ?? 0) - barGap))
+      .attr('x', (d) => xScale(d.x0) + barGap / 2)
+      .attr('width', (d) => Math.max(0, xScale(d.x1) - xScale(d.x0) - barGap))
       .attr('y', chartHeight)
       .attr('height', 0)
       .attr('fill', themeColors.accentTeal)
@@ -121,15 +149,15 @@ export function SpendingHistogram({
       .on('mouseenter', function (event, d) {
         d3.select(this).attr('fill', themeColors.accentAmber);
         const rangeLabel = mode === 'spending'
-          ? `${formatReais(d.x0 ?? 0, true)} - ${formatReais(d.x1 ?? 0, true)}`
-          : `${formatNumber(d.x0 ?? 0)} - ${formatNumber(d.x1 ?? 0)}`;
+          ? `${formatReais(d.x0, true)} - ${formatReais(d.x1, true)}`
+          : `${formatNumber(d.x0)} - ${formatNumber(d.x1)}`;
 
         tooltip
           .style('opacity', 1)
           .html(
-            `<div class="tooltip-title">${d.length} deputado${d.length !== 1 ? 's' : ''}</div>
+            `<div class="tooltip-title">${d.count} deputado${d.count !== 1 ? 's' : ''}</div>
              <div class="tooltip-label">${rangeLabel}</div>
-             <div class="tooltip-value">${((d.length / deputies.length) * 100).toFixed(1)}% do total</div>`
+             <div class="tooltip-value">${((d.count / histogramData.total) * 100).toFixed(1)}% do total</div>`
           );
 
         // Position tooltip - flip to left side if near right edge
@@ -154,8 +182,8 @@ export function SpendingHistogram({
       .duration(600)
       .delay((_, i) => i * 30)
       .ease(d3.easeCubicOut)
-      .attr('y', (d) => yScale(d.length))
-      .attr('height', (d) => chartHeight - yScale(d.length));
+      .attr('y', (d) => yScale(d.count))
+      .attr('height', (d) => chartHeight - yScale(d.count));
 
     // Draw median line
     const medianX = xScale(histogramData.median);
@@ -289,7 +317,7 @@ export function SpendingHistogram({
             Distribuição de Gastos
           </h3>
           <p className="text-sm text-text-muted">
-            {deputies.length} deputados analisados
+            {histogramData.total} deputados analisados
           </p>
         </div>
 
@@ -331,8 +359,8 @@ export function SpendingHistogram({
           <p className="text-xs text-text-muted">Mínimo</p>
           <p className="text-sm font-semibold text-text-primary">
             {mode === 'spending'
-              ? formatReais(d3.min(deputies, (d) => d.totalSpending) ?? 0, true)
-              : formatNumber(d3.min(deputies, (d) => d.transactionCount) ?? 0)}
+              ? formatReais(histogramData.min, true)
+              : formatNumber(histogramData.min)}
           </p>
         </div>
         <div className="text-center">
@@ -1,7 +1,8 @@
 import { useMemo, useState, useRef, useEffect } from 'react';
 import { createPortal } from 'react-dom';
 import { Link } from 'react-router-dom';
-import type { Deputy } from '../../types/data';
+import type { Deputy, Distributions, DistributionMetric } from '../../types/data';
+import { useUnfilteredDistributions, sketchQuantile } from '../../hooks/useDistributions';
 import { formatReais, formatNumber } from '../../utils/formatters';
 import { getRiskLevelColor } from '../../utils/colors';
 import { FEATURES } from '../../config/features';
@@ -126,6 +127,16 @@ function calculateStats(values: number[]): { mean: number; std: number } {
   return { mean, std };
 }
 
+// Mean and std of a metric: precomputed when distributions.json covers the view
+function metricStats(
+  distributions: Distributions | undefined,
+  metric: DistributionMetric,
+  values: number[]
+): { mean: number; std: number } {
+  const summary = distributions?.metrics[metric];
+  return summary ? { mean: summary.mean, std: summary.std } : calculateStats(values);
+}
+
 function calculateZScore(value: number, mean: number, std: number): number {
   return std === 0 ? 0 : (value - mean) / std;
 }
@@ -276,6 +287,7 @@ export function StatisticalInsights({ deputies }: StatisticalInsightsProps) {
   const [showOnlyOutliers, setShowOnlyOutliers] = useState(false);
   const [page, setPage] = useState(0);
   const pageSize = 15;
+  const distributions = useUnfilteredDistributions();
 
   // Compute enriched data
   const { enrichedDeputies, descriptiveStats } = useMemo(() => {
@@ -294,10 +306,10 @@ export function StatisticalInsights({ deputies }: StatisticalInsightsProps) {
     const benfordChi2 = validDeputies.map((d) => d.benford?.chi2 ?? 0);
 
     // Calculate statistics
-    const spendingStats = calculateStats(spending);
-    const hhiStats = calculateStats(hhi);
-    const benfordStats = calculateStats(benfordChi2);
-    const roundStats = calculateStats(roundValuePct);
+    const spendingStats = metricStats(distributions, 'totalSpending', spending);
+    const hhiStats = metricStats(distributions, 'hhi', hhi);
+    const benfordStats = metricStats(distributions, 'benfordChi2', benfordChi2);
+    const roundStats = metricStats(distributions, 'roundValuePct', roundValuePct);
 
     // Calculate top supplier percentage stats
     const topSupplierPcts = validDeputies.map((d) => d.topSuppliers?.[0]?.pct ?? 0);
@@ -322,7 +334,12 @@ export function StatisticalInsights({ deputies }: StatisticalInsightsProps) {
     const descriptiveStats = {
       totalDeputies: validDeputies.length,
       spendingMean: spendingStats.mean,
-      spendingMedian: [...spending].sort((a, b) => a - b)[Math.floor(spending.length / 2)],
+      spendingMedian: distributions?.metrics.totalSpending.median
+        ?? [...spending].sort((a, b) => a - b)[Math.floor(spending.length / 2)],
+      // Median transaction value, read from the merged per-year sketch
+      transactionMedian: distributions
+        ? sketchQuantile(distributions.transactionValues.sketches.overall, 0.5)
+        : null,
       spendingStd: spendingStats.std,
       hhiMean: hhiStats.mean,
       benfordMean: benfordStats.mean,
@@ -330,7 +347,7 @@ export function StatisticalInsights({ deputies }: StatisticalInsightsProps) {
     };
 
     return { enrichedDeputies: enriched, descriptiveStats };
-  }, [deputies]);
+  }, [deputies, distributions]);
 
   // Filter and sort
   const filteredDeputies = useMemo(() => {
@@ -430,6 +447,11 @@ export function StatisticalInsights({ deputies }: StatisticalInsightsProps) {
             {formatReais(descriptiveStats.spendingMean, true)}
           </p>
           <p className="text-xs text-text-muted">Mediana: {formatReais(descriptiveStats.spendingMedian, true)}</p>
+          {descriptiveStats.transactionMedian !== null && (
+            <p className="text-xs text-text-muted">
+              Transação mediana: {formatReais(descriptiveStats.transactionMedian)}
+            </p>
+          )}
         </div>
         <div className="p-3 bg-bg-secondary rounded-lg">
           <p className="text-xs text-text-muted uppercase tracking-wide">HHI Médio</p>
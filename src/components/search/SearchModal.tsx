@@ -1,19 +1,27 @@
 import { useState, useEffect, useRef, useMemo } from 'react';
 import { useDeputies } from '../../hooks/useDeputies';
+import { useSearch } from '../../hooks/useSearchIndex';
+import { useSupplierProfile } from '../../hooks/useSuppliers';
 import { useFiltersStore } from '../../store/filters';
-import { formatReais, abbreviateName, getRiskColor } from '../../utils/formatters';
+import { formatReais, formatCNPJ, formatMonthYear, abbreviateName, getRiskColor } from '../../utils/formatters';
 import type { Deputy } from '../../types/data';
 
 interface SearchModalProps {
   isOpen: boolean;
   onClose: () => void;
   onSelectDeputy?: (deputy: Deputy) => void;
+  /** Also list suppliers (by name or CNPJ/CPF) in the results */
+  includeSuppliers?: boolean;
 }
 
-export function SearchModal({ isOpen, onClose, onSelectDeputy }: SearchModalProps) {
+type SupplierMatch = { cnpj: string; name: string; deputyCount: number };
+
+export function SearchModal({ isOpen, onClose, onSelectDeputy, includeSuppliers = true }: SearchModalProps) {
   const [query, setQuery] = useState('');
+  const [selectedSupplier, setSelectedSupplier] = useState<string | null>(null);
   const inputRef = useRef<HTMLInputElement>(null);
   const { data: deputies = [] } = useDeputies();
+  const { data: results, isLoading: indexLoading } = useSearch(query, includeSuppliers ? 20 : 10);
   const setSearchQuery = useFiltersStore((s) => s.setSearchQuery);
 
   // Focus input when modal opens
@@ -37,19 +45,22 @@ export function SearchModal({ isOpen, onClose, onSelectDeputy }: SearchModalProp
     }
   }, [isOpen, onClose]);
 
-  // Filter deputies based on query
-  const filteredDeputies = useMemo(() => {
-    if (!query.trim()) return [];
-    const lowerQuery = query.toLowerCase();
-    return deputies
-      .filter(
-        (d) =>
-          d.name.toLowerCase().includes(lowerQuery) ||
-          d.party.toLowerCase().includes(lowerQuery) ||
-          d.uf.toLowerCase().includes(lowerQuery)
-      )
-      .slice(0, 10);
-  }, [deputies, query]);
+  const deputiesById = useMemo(() => new Map(deputies.map((d) => [d.id, d])), [deputies]);
+
+  // Split index matches into deputies and suppliers, keeping the index ranking
+  const { filteredDeputies, filteredSuppliers } = useMemo(() => {
+    const matchedDeputies: Deputy[] = [];
+    const matchedSuppliers: SupplierMatch[] = [];
+    for (const entity of results) {
+      if (entity[0] === 'd') {
+        const deputy = deputiesById.get(entity[1]);
+        if (deputy && matchedDeputies.length < 10) matchedDeputies.push(deputy);
+      } else if (includeSuppliers && matchedSuppliers.length < 10) {
+        matchedSuppliers.push({ cnpj: entity[1], name: entity[2], deputyCount: entity[3] });
+      }
+    }
+    return { filteredDeputies: matchedDeputies, filteredSuppliers: matchedSuppliers };
+  }, [results, deputiesById, includeSuppliers]);
 
   const handleSelect = (deputy: Deputy) => {
     if (onSelectDeputy) {
@@ -62,6 +73,11 @@ export function SearchModal({ isOpen, onClose, onSelectDeputy }: SearchModalProp
     onClose();
   };
 
+  const handleQueryChange = (value: string) => {
+    setQuery(value);
+    setSelectedSupplier(null);
+  };
+
   if (!isOpen) return null;
 
   return (
@@ -93,8 +109,12 @@ export function SearchModal({ isOpen, onClose, onSelectDeputy }: SearchModalProp
             ref={inputRef}
             type="text"
             value={query}
-            onChange={(e) => setQuery(e.target.value)}
-            placeholder="Buscar deputado por nome, partido ou estado..."
+            onChange={(e) => handleQueryChange(e.target.value)}
+            placeholder={
+              includeSuppliers
+                ? 'Buscar deputado, fornecedor ou CNPJ...'
+                : 'Buscar deputado por nome, partido ou estado...'
+            }
             className="flex-1 bg-transparent text-text-primary placeholder-text-muted outline-none text-lg"
           />
           <kbd className="hidden sm:inline-block px-2 py-1 text-xs text-text-muted bg-bg-card rounded border border-border">
@@ -104,15 +124,26 @@ export function SearchModal({ isOpen, onClose, onSelectDeputy }: SearchModalProp
 
         {/* Results */}
         <div className="max-h-96 overflow-y-auto">
-          {query.trim() && filteredDeputies.length === 0 && (
+          {selectedSupplier && (
+            <SupplierDetail cnpj={selectedSupplier} onBack={() => setSelectedSupplier(null)} />
+          )}
+
+          {!selectedSupplier && query.trim() && indexLoading && (
+            <div className="p-8 text-center">
+              <p className="text-text-muted">Carregando índice de busca...</p>
+            </div>
+          )}
+
+          {!selectedSupplier && query.trim() && !indexLoading &&
+            filteredDeputies.length === 0 && filteredSuppliers.length === 0 && (
             <div className="p-8 text-center">
               <p className="text-text-muted">
-                Nenhum deputado encontrado para "{query}"
+                Nenhum {includeSuppliers ? 'resultado' : 'deputado'} encontrado para "{query}"
               </p>
             </div>
           )}
 
-          {filteredDeputies.map((deputy) => (
+          {!selectedSupplier && filteredDeputies.map((deputy) => (
             <button
               key={deputy.id}
               onClick={() => handleSelect(deputy)}
@@ -158,6 +189,28 @@ export function SearchModal({ isOpen, onClose, onSelectDeputy }: SearchModalProp
               </div>
             </button>
           ))}
+
+          {!selectedSupplier && filteredSuppliers.length > 0 && (
+            <div className="px-4 pt-3 pb-1 text-xs font-medium uppercase tracking-wide text-text-muted">
+              Fornecedores
+            </div>
+          )}
+
+          {!selectedSupplier && filteredSuppliers.map((supplier) => (
+            <button
+              key={supplier.cnpj}
+              onClick={() => setSelectedSupplier(supplier.cnpj)}
+              className="w-full flex items-center gap-4 p-4 hover:bg-bg-card transition-colors text-left"
+            >
+              <div className="flex-1 min-w-0">
+                <span className="block font-medium text-text-primary truncate">{supplier.name}</span>
+                <span className="text-sm text-text-muted font-mono">{formatCNPJ(supplier.cnpj)}</span>
+              </div>
+              <span className="text-xs text-text-muted">
+                {supplier.deputyCount.toLocaleString('pt-BR')} deputado{supplier.deputyCount !== 1 ? 's' : ''}
+              </span>
+            </button>
+          ))}
         </div>
 
         {/* Footer hint */}
@@ -165,7 +218,7 @@ export function SearchModal({ isOpen, onClose, onSelectDeputy }: SearchModalProp
           <div className="p-4 border-t border-border">
             <p className="text-sm text-text-muted text-center">
               Digite para buscar entre {deputies.length.toLocaleString('pt-BR')}{' '}
-              deputados
+              deputados{includeSuppliers && ' e seus fornecedores (nome ou CNPJ)'}
             </p>
           </div>
         )}
@@ -174,6 +227,66 @@ export function SearchModal({ isOpen, onClose, onSelectDeputy }: SearchModalProp
   );
 }
 
+// Supplier profile shown when a supplier result is picked
+function SupplierDetail({ cnpj, onBack }: { cnpj: string; onBack: () => void }) {
+  const { data: profile, isLoading } = useSupplierProfile(cnpj);
+
+  return (
+    <div className="p-4 space-y-4">
+      <button onClick={onBack} className="text-sm text-text-muted hover:text-text-secondary">
+        ← Voltar aos resultados
+      </button>
+
+      {isLoading && <p className="text-text-muted text-center">Carregando fornecedor...</p>}
+
+      {!isLoading && !profile && (
+        <p className="text-text-muted text-center">Perfil do fornecedor {formatCNPJ(cnpj)} indisponível</p>
+      )}
+
+      {profile && (
+        <>
+          <div>
+            <p className="font-medium text-text-primary">{profile.name}</p>
+            <p className="text-sm text-text-muted font-mono">{formatCNPJ(profile.cnpj)}</p>
+            {profile.firstMonth && profile.lastMonth && (
+              <p className="text-xs text-text-muted mt-1">
+                {formatMonthYear(profile.firstMonth)} – {formatMonthYear(profile.lastMonth)}
+              </p>
+            )}
+          </div>
+
+          <div className="grid grid-cols-3 gap-3 text-center">
+            <div className="bg-bg-card rounded-lg p-2">
+              <p className="text-sm font-semibold text-text-primary">{formatReais(profile.totalValue, true)}</p>
+              <p className="text-xs text-text-muted">recebido</p>
+            </div>
+            <div className="bg-bg-card rounded-lg p-2">
+              <p className="text-sm font-semibold text-text-primary">
+                {profile.transactionCount.toLocaleString('pt-BR')}
+              </p>
+              <p className="text-xs text-text-muted">transações</p>
+            </div>
+            <div className="bg-bg-card rounded-lg p-2">
+              <p className="text-sm font-semibold text-text-primary">{profile.deputyCount}</p>
+              <p className="text-xs text-text-muted">deputados</p>
+            </div>
+          </div>
+
+          <div>
+            <p className="text-xs font-medium uppercase tracking-wide text-text-muted mb-2">Principais deputados</p>
+            {profile.deputies.slice(0, 5).map((deputy) => (
+              <div key={deputy.name} className="flex justify-between text-sm py-1">
+                <span className="text-text-secondary truncate">{abbreviateName(deputy.name)}</span>
+                <span className="text-text-primary">{formatReais(deputy.value, true)}</span>
+              </div>
+            ))}
+          </div>
+        </>
+      )}
+    </div>
+  );
+}
+
 // Search trigger button component
 export function SearchTrigger({ onClick }: { onClick: () => void }) {
   return (
@@ -189,7 +302,7 @@ export function SearchTrigger({ onClick }: { onClick: () => void }) {
           d="M21 21l-6-6m2-5a7 7 0 11-14 0 7 7 0 0114 0z"
         />
       </svg>
-      <span className="text-sm">Buscar deputado...</span>
+      <span className="text-sm">Buscar deputado ou fornecedor...</span>
       <kbd className="hidden sm:inline-block px-1.5 py-0.5 text-xs bg-bg-card rounded border border-border ml-2">
         /
       </kbd>
@@ -1,17 +1,29 @@
 /**
  * Statistical thresholds and risk scoring constants for CEAP analysis.
  *
- * These thresholds are used across the dashboard and analysis pipeline.
- * Changes here should be reflected in:
+ * HHI, Benford and risk score values come from risk-thresholds.json, which
+ * dashboard/scripts/prepare-data.py generates from its RISK_RULES. Change them
+ * there, not here. Other constants should still be reflected in:
  * - Python analysis scripts (analysis/lib/metrics.py)
- * - Data preparation (dashboard/scripts/prepare-data.py)
  * - Methodology documentation (dashboard/src/pages/Methodology.tsx)
  *
  * @see https://www.justice.gov/atr/herfindahl-hirschman-index for HHI reference
  * @see Benford's Law: https://en.wikipedia.org/wiki/Benford%27s_law
  */
 
-import type { RiskLevel } from '../types/data';
+import type { Deputy, RiskLevel } from '../types/data';
+import riskThresholds from './risk-thresholds.json';
+
+const RULES = riskThresholds;
+
+/**
+ * Threshold of a risk signal in the generated rule list, by signal id.
+ */
+function signalThreshold(id: string): number {
+  const signal = RULES.risk_score.signals.find((s) => s.id === id);
+  if (!signal) throw new Error(`Risk signal ${id} missing from risk-thresholds.json`);
+  return signal.above;
+}
 
 // ============================================================================
 // HHI (Herfindahl-Hirschman Index) Thresholds
@@ -27,13 +39,13 @@ import type { RiskLevel } from '../types/data';
  */
 export const HHI_THRESHOLDS = {
   /** Below this: Competitive market, low concentration risk */
-  LOW: 1500,
+  LOW: RULES.hhi_thresholds.low,
   /** 1500-2500: Moderate concentration, warrants monitoring */
-  MODERATE: 2500,
+  MODERATE: RULES.hhi_thresholds.moderate,
   /** 2500-3000: High concentration, significant risk */
-  HIGH: 3000,
+  HIGH: RULES.hhi_thresholds.high,
   /** Above 5000: Very high concentration, near-monopoly conditions */
-  VERY_HIGH: 5000,
+  VERY_HIGH: RULES.hhi_thresholds.very_high,
 } as const;
 
 /**
@@ -62,13 +74,13 @@ export function getHHIRiskLevel(hhi: number): RiskLevel {
  */
 export const BENFORD_THRESHOLDS = {
   /** Chi-squared critical value for p < 0.05 */
-  CHI2_CRITICAL_005: 15.51,
+  CHI2_CRITICAL_005: RULES.benford_threshold.chi2_critical_005,
   /** Chi-squared critical value for p < 0.01 */
-  CHI2_CRITICAL_001: 20.09,
+  CHI2_CRITICAL_001: RULES.benford_threshold.chi2_critical_001,
   /** Degrees of freedom for 9 digits (1-9) */
-  DEGREES_OF_FREEDOM: 8,
+  DEGREES_OF_FREEDOM: RULES.benford_threshold.degrees_of_freedom,
   /** Minimum transactions required for reliable Benford analysis */
-  MIN_TRANSACTIONS: 50,
+  MIN_TRANSACTIONS: RULES.benford_threshold.min_transactions,
 } as const;
 
 /**
@@ -100,8 +112,8 @@ export const BENFORD_EXPECTED_FREQUENCIES = {
 export const ROUND_VALUE_THRESHOLDS = {
   /** Below this percentage: Normal, no concern */
   NORMAL_PERCENT: 15,
-  /** 15-20%: Elevated, worth monitoring */
-  ELEVATED_PERCENT: 20,
+  /** 15-20%: Elevated, worth monitoring (the round-value risk signal threshold) */
+  ELEVATED_PERCENT: signalThreshold('round_values_above_20pct'),
   /** 20-30%: High, potential red flag */
   HIGH_PERCENT: 30,
   /** Above 30%: Very high, strong indicator of anomaly */
@@ -115,16 +127,15 @@ export const ROUND_VALUE_THRESHOLDS = {
 /**
  * Base risk scores by HHI level.
  *
- * The risk score is a composite metric (0.0 to 1.0) combining:
- * - HHI concentration (base score)
- * - Benford deviation (additive penalty)
- * - Round value percentage (additive penalty)
+ * The risk score is a composite metric (0.0 to 1.0): a base score from the HHI
+ * band plus the penalty of every signal in RULES.risk_score.signals whose field
+ * is above its threshold (see calculateRiskScore).
  */
 export const RISK_SCORE_BASE = {
-  CRITICO: 0.9,
-  ALTO: 0.7,
-  MEDIO: 0.4,
-  BAIXO: 0.2,
+  CRITICO: RULES.risk_score.base_weights.hhi_critical,
+  ALTO: RULES.risk_score.base_weights.hhi_high,
+  MEDIO: RULES.risk_score.base_weights.hhi_moderate,
+  BAIXO: RULES.risk_score.base_weights.hhi_low,
 } as const;
 
 /**
@@ -132,47 +143,67 @@ export const RISK_SCORE_BASE = {
  */
 export const RISK_SCORE_PENALTIES = {
   /** Added if Benford test is significant (p < 0.05) */
-  BENFORD_SIGNIFICANT: 0.15,
+  BENFORD_SIGNIFICANT: RULES.risk_score.additive_penalties.benford_significant,
   /** Added if round value percentage exceeds ROUND_VALUE_THRESHOLDS.ELEVATED_PERCENT */
-  ROUND_VALUES_HIGH: 0.10,
+  ROUND_VALUES_HIGH: RULES.risk_score.additive_penalties.round_values_above_20pct,
 } as const;
 
 /**
  * Maximum risk score (capped at 1.0).
  */
-export const RISK_SCORE_MAX = 1.0;
+export const RISK_SCORE_MAX = RULES.risk_score.max_score;
+
+/**
+ * Signal values the risk rules read, keyed by the rule `field`
+ * (hhi, topSupplierPct, roundValuePct, benfordSignificant, zScoreParty, zScoreState, outlierPct).
+ */
+export type RiskSignals = Record<string, number | boolean>;
 
 /**
- * Calculate composite risk score from individual metrics.
+ * Risk signals of a deputy record, as the pipeline reads them.
  */
-export function calculateRiskScore(
-  hhi: number,
-  benfordSignificant: boolean,
-  roundValuePct: number
-): number {
-  // Base score from HHI
+export function getRiskSignals(deputy: Deputy): RiskSignals {
+  return {
+    hhi: deputy.hhi.value,
+    topSupplierPct: deputy.topSuppliers[0]?.pct ?? 0,
+    roundValuePct: deputy.roundValuePct,
+    benfordSignificant: deputy.benford.significant,
+    benfordChi2: deputy.benford.chi2,
+    outlierCount: deputy.outliers?.count ?? 0,
+    outlierPct: deputy.outliers?.pct ?? 0,
+    zScoreParty: deputy.zScoreParty ?? 0,
+    zScoreState: deputy.zScoreState ?? 0,
+  };
+}
+
+/**
+ * Composite risk score from the generated rules: HHI base weight plus the
+ * penalty of every triggered signal, rounded to 2 decimals and capped.
+ * Same rules as prepare-data.py, so it matches deputy.riskScore; use it to
+ * score values that are not in deputies.json (e.g. what-if inputs), and
+ * getRiskLevelFromScore (utils/thresholds) for the level.
+ */
+export function calculateRiskScore(signals: RiskSignals): number {
+  const hhi = Number(signals.hhi ?? 0);
+  const t = RULES.hhi_thresholds;
   let score: number;
-  if (hhi > HHI_THRESHOLDS.HIGH) {
+  if (hhi > t.high) {
     score = RISK_SCORE_BASE.CRITICO;
-  } else if (hhi > HHI_THRESHOLDS.MODERATE) {
+  } else if (hhi > t.moderate) {
     score = RISK_SCORE_BASE.ALTO;
-  } else if (hhi > HHI_THRESHOLDS.LOW) {
+  } else if (hhi > t.low) {
     score = RISK_SCORE_BASE.MEDIO;
   } else {
     score = RISK_SCORE_BASE.BAIXO;
   }
 
-  // Add penalties
-  if (benfordSignificant) {
-    score += RISK_SCORE_PENALTIES.BENFORD_SIGNIFICANT;
-  }
-
-  if (roundValuePct > ROUND_VALUE_THRESHOLDS.ELEVATED_PERCENT) {
-    score += RISK_SCORE_PENALTIES.ROUND_VALUES_HIGH;
+  for (const signal of RULES.risk_score.signals) {
+    if (Number(signals[signal.field] ?? 0) > signal.above) {
+      score += signal.penalty;
+    }
   }
 
-  // Cap at maximum
-  return Math.min(score, RISK_SCORE_MAX);
+  return Math.min(Math.round(score * 100) / 100, RISK_SCORE_MAX);
 }
 
 // ============================================================================
@@ -1,5 +1,5 @@
 import { useQuery } from '@tanstack/react-query';
-import type { Aggregations } from '../types/data';
+import type { Aggregations, DataQuality } from '../types/data';
 
 async function fetchAggregations(): Promise<Aggregations> {
   const response = await fetch('/data/aggregations.json');
@@ -9,6 +9,14 @@ async function fetchAggregations(): Promise<Aggregations> {
   return response.json();
 }
 
+async function fetchDataQuality(): Promise<DataQuality> {
+  const response = await fetch('/data/data-quality.json');
+  if (!response.ok) {
+    throw new Error('Failed to fetch data quality profile');
+  }
+  return response.json();
+}
+
 export function useAggregations() {
   return useQuery({
     queryKey: ['aggregations'],
@@ -18,6 +26,15 @@ export function useAggregations() {
   });
 }
 
+export function useDataQuality() {
+  return useQuery({
+    queryKey: ['data-quality'],
+    queryFn: fetchDataQuality,
+    staleTime: Infinity,
+    gcTime: Infinity,
+  });
+}
+
 // Derived hooks for specific data slices
 export function useTotalSpending() {
   const { data } = useAggregations();
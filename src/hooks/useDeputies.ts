@@ -2,6 +2,7 @@ import { useQuery } from '@tanstack/react-query';
 import { useMemo } from 'react';
 import type { Deputy, CategoryData, PartyData, StateData, MonthlyData, Aggregations } from '../types/data';
 import { useFiltersStore } from '../store/filters';
+import { foldText, useDeputySearch } from './useSearchIndex';
 
 // Fetch original aggregations for totalSuppliers
 async function fetchAggregations(): Promise<Aggregations> {
@@ -64,6 +65,13 @@ export function useCurrentMandatoDeputies() {
 export function useFilteredDeputies() {
   const { data: deputies = [], ...rest } = useCurrentMandatoDeputies();
   const { states, parties, riskLevels, categories, searchQuery, years } = useFiltersStore();
+  const searchIds = useDeputySearch(searchQuery);
+
+  // Folded once per deputy list, for queries the search index can't answer
+  const searchText = useMemo(
+    () => new Map(deputies.map((d) => [d.id, foldText(`${d.name} ${d.party} ${d.uf}`)])),
+    [deputies]
+  );
 
   const filtered = useMemo(() => {
     let result = deputies;
@@ -104,13 +112,12 @@ export function useFilteredDeputies() {
 
     // Filter by search query (only for Deputies page, not Overview)
     if (searchQuery.length > 0) {
-      const query = searchQuery.toLowerCase();
-      result = result.filter(
-        (d) =>
-          d.name.toLowerCase().includes(query) ||
-          d.party.toLowerCase().includes(query) ||
-          d.uf.toLowerCase().includes(query)
-      );
+      if (searchIds) {
+        result = result.filter((d) => searchIds.has(d.id));
+      } else {
+        const query = foldText(searchQuery.trim());
+        result = result.filter((d) => searchText.get(d.id)?.includes(query));
+      }
     }
 
     // IMPORTANT: Recalculate spending values when year/category filters are active
@@ -157,7 +164,7 @@ export function useFilteredDeputies() {
     }
 
     return result;
-  }, [deputies, states, parties, riskLevels, categories, searchQuery, years]);
+  }, [deputies, states, parties, riskLevels, categories, searchQuery, searchIds, searchText, years]);
 
   return { data: filtered, ...rest };
 }
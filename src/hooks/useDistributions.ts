@@ -0,0 +1,99 @@
+import { useQuery } from '@tanstack/react-query';
+import type { Distributions, DistributionMetric, QuantileSketch } from '../types/data';
+import { useFiltersStore } from '../store/filters';
+
+async function fetchDistributions(): Promise<Distributions> {
+  const response = await fetch('/data/distributions.json');
+  if (!response.ok) {
+    throw new Error('Failed to fetch distributions');
+  }
+  return response.json();
+}
+
+export function useDistributions() {
+  return useQuery({
+    queryKey: ['distributions'],
+    queryFn: fetchDistributions,
+    staleTime: Infinity, // Static data, never refetch
+    gcTime: Infinity,
+  });
+}
+
+/**
+ * distributions.json describes every deputy, so charts can use it in place of the deputies
+ * array only while no filter narrows the view. Undefined while loading or when filters are
+ * active; callers then compute from the deputies they were given.
+ */
+export function useUnfilteredDistributions(): Distributions | undefined {
+  const { data } = useDistributions();
+  const filtered = useFiltersStore((s) => s.hasActiveFilters());
+  return filtered ? undefined : data;
+}
+
+export type RankScope = 'overall' | 'party' | 'uf';
+
+/** Precomputed percentile rank (0-100) of a deputy for a metric, or null if unknown. */
+export function getPercentileRank(
+  distributions: Distributions,
+  deputyId: number,
+  metric: DistributionMetric,
+  scope: RankScope = 'overall'
+): number | null {
+  const position = distributions.ranks.ids.indexOf(deputyId);
+  if (position < 0 || !distributions.ranks[metric]) return null;
+  return distributions.ranks[metric][scope][position];
+}
+
+// Same bucket layout as quantile_sketch() in prepare-data.py
+function mergeStores(stores: { offset: number; counts: number[] }[]) {
+  const filled = stores.filter((s) => s.counts.length > 0);
+  if (filled.length === 0) return { offset: 0, counts: [] as number[] };
+  const offset = Math.min(...filled.map((s) => s.offset));
+  const end = Math.max(...filled.map((s) => s.offset + s.counts.length));
+  const counts = new Array<number>(end - offset).fill(0);
+  for (const s of filled) {
+    s.counts.forEach((c, i) => {
+      counts[s.offset - offset + i] += c;
+    });
+  }
+  return { offset, counts };
+}
+
+/** Merge sketches (e.g. the selected years or categories) into one. */
+export function mergeSketches(sketches: QuantileSketch[]): QuantileSketch {
+  return {
+    relativeAccuracy: sketches[0]?.relativeAccuracy ?? 0.01,
+    count: sketches.reduce((sum, s) => sum + s.count, 0),
+    zeroCount: sketches.reduce((sum, s) => sum + s.zeroCount, 0),
+    positive: mergeStores(sketches.map((s) => s.positive)),
+    negative: mergeStores(sketches.map((s) => s.negative)),
+  };
+}
+
+/** Approximate q-quantile (0-1), within the sketch's relative accuracy. */
+export function sketchQuantile(sketch: QuantileSketch, q: number): number {
+  if (sketch.count === 0) return 0;
+  const gamma = (1 + sketch.relativeAccuracy) / (1 - sketch.relativeAccuracy);
+  let rank = q * (sketch.count - 1);
+
+  const negativeTotal = sketch.negative.counts.reduce((a, b) => a + b, 0);
+  if (rank < negativeTotal) {
+    // Most negative values sit in the highest buckets
+    let acc = 0;
+    for (let i = sketch.negative.counts.length - 1; i >= 0; i--) {
+      acc += sketch.negative.counts[i];
+      if (acc > rank) return (-2 * gamma ** (i + sketch.negative.offset)) / (gamma + 1);
+    }
+  }
+  rank -= negativeTotal;
+  if (rank < sketch.zeroCount) return 0;
+  rank -= sketch.zeroCount;
+
+  let acc = 0;
+  const { counts, offset } = sketch.positive;
+  for (let i = 0; i < counts.length; i++) {
+    acc += counts[i];
+    if (acc > rank) return (2 * gamma ** (i + offset)) / (gamma + 1);
+  }
+  return (2 * gamma ** (counts.length - 1 + offset)) / (gamma + 1);
+}
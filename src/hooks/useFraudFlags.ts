@@ -1,6 +1,6 @@
 import { useQuery } from '@tanstack/react-query';
 import { useMemo } from 'react';
-import type { FraudFlag, CNPJMismatch } from '../types/data';
+import type { FraudFlag, CNPJMismatch, OutliersData } from '../types/data';
 
 async function fetchFraudFlags(): Promise<FraudFlag[]> {
   const response = await fetch('/data/fraud-flags.json');
@@ -18,6 +18,14 @@ async function fetchMismatches(): Promise<CNPJMismatch[]> {
   return response.json();
 }
 
+async function fetchOutliers(): Promise<OutliersData> {
+  const response = await fetch('/data/outliers.json');
+  if (!response.ok) {
+    throw new Error('Failed to fetch outliers');
+  }
+  return response.json();
+}
+
 export function useFraudFlags() {
   return useQuery({
     queryKey: ['fraud-flags'],
@@ -36,6 +44,15 @@ export function useMismatches() {
   });
 }
 
+export function useOutliers() {
+  return useQuery({
+    queryKey: ['outliers'],
+    queryFn: fetchOutliers,
+    staleTime: Infinity,
+    gcTime: Infinity,
+  });
+}
+
 // Aggregate Benford's Law data from fraud flags
 export function useBenfordAnalysis() {
   const { data: fraudFlags = [] } = useFraudFlags();
@@ -0,0 +1,36 @@
+import { useQuery } from '@tanstack/react-query';
+import type { PartyNetwork, RegionNetwork } from '../types/data';
+
+async function fetchPartyNetwork(): Promise<PartyNetwork> {
+  const response = await fetch('/data/party-network.json');
+  if (!response.ok) {
+    throw new Error('Failed to fetch party network');
+  }
+  return response.json();
+}
+
+async function fetchRegionNetwork(): Promise<RegionNetwork> {
+  const response = await fetch('/data/region-network.json');
+  if (!response.ok) {
+    throw new Error('Failed to fetch region network');
+  }
+  return response.json();
+}
+
+export function usePartyNetwork() {
+  return useQuery({
+    queryKey: ['party-network'],
+    queryFn: fetchPartyNetwork,
+    staleTime: Infinity, // Static data, never refetch
+    gcTime: Infinity,
+  });
+}
+
+export function useRegionNetwork() {
+  return useQuery({
+    queryKey: ['region-network'],
+    queryFn: fetchRegionNetwork,
+    staleTime: Infinity,
+    gcTime: Infinity,
+  });
+}
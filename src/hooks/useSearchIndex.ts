@@ -0,0 +1,135 @@
+import { useQuery } from '@tanstack/react-query';
+import { useMemo } from 'react';
+import type { SearchIndex, SearchEntity } from '../types/data';
+
+async function fetchSearchIndex(): Promise<SearchIndex> {
+  const response = await fetch('/data/search-index.json');
+  if (!response.ok) {
+    throw new Error('Failed to fetch search index');
+  }
+  return response.json();
+}
+
+/**
+ * Lazily loaded prefix index over deputies, suppliers and CNPJs.
+ * Pass enabled=false to defer the download until the search UI opens.
+ */
+export function useSearchIndex(enabled = true) {
+  return useQuery({
+    queryKey: ['search-index'],
+    queryFn: fetchSearchIndex,
+    staleTime: Infinity,
+    gcTime: Infinity,
+    enabled,
+  });
+}
+
+// Same folding as fold_text() in prepare-data.py
+export function foldText(text: string): string {
+  return text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+}
+
+function tokenize(text: string): string[] {
+  return foldText(text).match(/[a-z0-9]+/g) ?? [];
+}
+
+/**
+ * Query tokens that can be looked up: at least minPrefix characters and not a stopword,
+ * since stopwords ("da", "ltda") are left out of the index. A query made only of stopwords
+ * keeps them, as prefixes of longer indexed words ("sa" -> "santos").
+ */
+function indexableTokens(index: SearchIndex, query: string): string[] {
+  const tokens = tokenize(query).filter((token) => token.length >= index.meta.minPrefix);
+  const stopwords = new Set(index.meta.stopwords ?? []);
+  const content = tokens.filter((token) => !stopwords.has(token));
+  return content.length > 0 ? content : tokens;
+}
+
+/**
+ * Look up entities matching every token of the query.
+ *
+ * Each token maps to the longest indexed prefix key; candidates are then verified
+ * against the label (or the CNPJ for document queries) since keys are truncated.
+ */
+export function searchEntities(index: SearchIndex, query: string, limit = 10): SearchEntity[] {
+  const { maxPrefix, docPrefixes } = index.meta;
+  const digits = query.replace(/\D/g, '');
+  const isDocument = digits.length >= docPrefixes[0] && /^[\d.\-/\s]+$/.test(query.trim());
+
+  const lookups: { key: string; verify: (entity: SearchEntity) => boolean }[] = [];
+  if (isDocument) {
+    const length = [...docPrefixes].reverse().find((l) => l <= digits.length) ?? docPrefixes[0];
+    lookups.push({
+      key: `#${digits.slice(0, length)}`,
+      verify: (e) => e[0] === 's' && String(e[1]).startsWith(digits),
+    });
+  } else {
+    for (const token of indexableTokens(index, query)) {
+      lookups.push({
+        key: token.slice(0, maxPrefix),
+        verify: (e) => tokenize(`${e[2]} ${e[0] === 'd' ? e[3] : ''}`).some((t) => t.startsWith(token)),
+      });
+    }
+  }
+  if (lookups.length === 0) return [];
+
+  // Decode delta-encoded positions and intersect, starting from the shortest list
+  const lists = lookups.map(({ key }) => {
+    const deltas = index.postings[key] ?? [];
+    const positions: number[] = [];
+    let acc = 0;
+    for (const d of deltas) {
+      acc += d;
+      positions.push(acc);
+    }
+    return positions;
+  });
+  const order = lists.map((_, i) => i).sort((a, b) => lists[a].length - lists[b].length);
+  let candidates = lists[order[0]];
+  for (const i of order.slice(1)) {
+    const set = new Set(lists[i]);
+    candidates = candidates.filter((p) => set.has(p));
+  }
+
+  const results: SearchEntity[] = [];
+  for (const position of candidates) {
+    const entity = index.entities[position];
+    if (lookups.every(({ verify }) => verify(entity))) {
+      results.push(entity);
+      if (results.length >= limit) break;
+    }
+  }
+  return results;
+}
+
+export function useSearch(query: string, limit = 10) {
+  const { data: index, ...rest } = useSearchIndex(query.trim().length > 0);
+
+  const results = useMemo(() => {
+    if (!index || !query.trim()) return [];
+    return searchEntities(index, query, limit);
+  }, [index, query, limit]);
+
+  return { data: results, ...rest };
+}
+
+/**
+ * Ids of the deputies matching a query, or null while the index is loading or when the
+ * query has no indexable token (shorter than minPrefix, or only stopwords), so callers can
+ * fall back to a scan.
+ */
+export function useDeputySearch(query: string): Set<number> | null {
+  const { data: index } = useSearchIndex(query.trim().length > 0);
+
+  return useMemo(() => {
+    if (!index) return null;
+    const stopwords = new Set(index.meta.stopwords ?? []);
+    const indexable = indexableTokens(index, query).some((token) => !stopwords.has(token));
+    if (!indexable) return null;
+    const ids = new Set<number>();
+    for (const entity of searchEntities(index, query, Infinity)) {
+      if (entity[0] === 'd') ids.add(entity[1]);
+    }
+    return ids;
+  }, [index, query]);
+}
@@ -0,0 +1,31 @@
+import { useQuery } from '@tanstack/react-query';
+import type { SupplierProfile } from '../types/data';
+
+// Profiles are sharded by the first two digits of the document (generate_suppliers)
+function supplierShard(cnpj: string): string {
+  return cnpj.replace(/\D/g, '').slice(0, 2);
+}
+
+async function fetchSupplierShard(shard: string): Promise<SupplierProfile[]> {
+  const response = await fetch(`/data/suppliers/${shard}.json`);
+  if (!response.ok) {
+    throw new Error('Failed to fetch supplier profiles');
+  }
+  return response.json();
+}
+
+/**
+ * Full profile of one supplier, loading only the shard that holds it.
+ * Pass null to skip the download.
+ */
+export function useSupplierProfile(cnpj: string | null) {
+  const shard = cnpj ? supplierShard(cnpj) : '';
+  return useQuery({
+    queryKey: ['suppliers', shard],
+    queryFn: () => fetchSupplierShard(shard),
+    staleTime: Infinity,
+    gcTime: Infinity,
+    enabled: shard.length === 2,
+    select: (profiles) => profiles.find((p) => p.cnpj === cnpj) ?? null,
+  });
+}
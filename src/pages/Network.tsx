@@ -8,6 +8,7 @@ import { NetworkStats } from '../components/charts/NetworkStats';
 import { ChartSkeleton } from '../components/ui/Skeleton';
 import { NetworkEmpty } from '../components/ui/EmptyState';
 import { useDeputies } from '../hooks/useDeputies';
+import { usePartyNetwork, useRegionNetwork } from '../hooks/useNetworks';
 import { formatNumber } from '../utils/formatters';
 
 // Debounce hook for slider inputs
@@ -27,6 +28,8 @@ function useDebouncedValue<T>(value: T, delay: number): T {
 
 export function Network() {
   const { data: deputies = [], isLoading } = useDeputies();
+  const { data: partyNetwork } = usePartyNetwork();
+  const { data: regionNetwork } = useRegionNetwork();
   const [maxDeputies, setMaxDeputies] = useState(50);
   const [minSupplierPct, setMinSupplierPct] = useState(15);
   const [minHHI, setMinHHI] = useState(1000);
@@ -153,15 +156,10 @@ export function Network() {
         <SharedSuppliersClusters deputies={filteredDeputies} />
       )}
 
-      {/* Party Network Analysis */}
-      {!isLoading && filteredDeputies.length > 0 && (
-        <PartyNetworkAnalysis deputies={filteredDeputies} />
-      )}
+      {/* Party and Regional Network Analysis (all deputies, precomputed) */}
+      {partyNetwork && <PartyNetworkAnalysis network={partyNetwork} />}
 
-      {/* Regional Network Analysis */}
-      {!isLoading && filteredDeputies.length > 0 && (
-        <RegionalNetworkAnalysis deputies={filteredDeputies} />
-      )}
+      {regionNetwork && <RegionalNetworkAnalysis network={regionNetwork} />}
 
       {/* Network Stats & Export */}
       {!isLoading && filteredDeputies.length > 0 && (
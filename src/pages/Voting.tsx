@@ -252,6 +252,7 @@ export function Voting() {
         isOpen={isSearchOpen}
         onClose={() => setIsSearchOpen(false)}
         onSelectDeputy={handleSelectDeputy}
+        includeSuppliers={false}
       />
     </div>
   );
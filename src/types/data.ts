@@ -13,6 +13,7 @@ export interface Aggregations {
       end: string;
     };
     lastUpdated: string;
+    preview?: AggregationsPreview;  // Only in prepare-data.py --preview output
   };
   byMonth: MonthlyData[];
   byCategory: CategoryData[];
@@ -20,10 +21,21 @@ export interface Aggregations {
   byState: StateData[];
 }
 
+// Sample design and total spending error of a --preview run
+export interface AggregationsPreview {
+  fraction: number;
+  sampledTransactions: number;
+  strata: number;  // deputy x month strata
+  level: number;  // e.g. 0.95
+  totalSpendingSE: number;
+  totalSpendingCI: [number, number];
+}
+
 export interface MonthlyData {
   month: string; // YYYY-MM
   value: number;
   transactionCount: number;
+  valueSE?: number;  // Standard error of value (--preview only)
 }
 
 export interface CategoryData {
@@ -32,6 +44,8 @@ export interface CategoryData {
   value: number;
   pct: number;
   transactionCount: number;
+  valueSE?: number;  // Standard errors (--preview only)
+  transactionCountSE?: number;
 }
 
 export interface PartyData {
@@ -39,6 +53,7 @@ export interface PartyData {
   value: number;
   deputyCount: number;
   avgPerDeputy: number;
+  valueSE?: number;  // Standard error of value (--preview only)
 }
 
 export interface StateData {
@@ -46,6 +61,7 @@ export interface StateData {
   value: number;
   deputyCount: number;
   avgPerDeputy: number;
+  valueSE?: number;  // Standard error of value (--preview only)
 }
 
 export interface BenfordDigit {
@@ -97,6 +113,8 @@ export interface Deputy {
     digitDistribution?: BenfordDigit[];
   };
   roundValuePct: number;
+  outliers?: DeputyOutliers;  // Atypical transactions (robust z-score within category x month)
+  confidence?: DeputyConfidence;  // Bootstrap intervals for the risk signals
   riskScore: number;
   riskLevel: RiskLevel;
   topSuppliers: SupplierShare[];
@@ -113,6 +131,35 @@ export interface Deputy {
   mandateCount?: number;    // Number of terms served
   // Attendance metrics
   attendance?: DeputyAttendance;
+  emendas?: DeputyEmendasSummary;  // Combined CEAP + emendas summary (when emendas were ingested)
+  preview?: DeputyPreview;  // Sampling errors (prepare-data.py --preview only)
+}
+
+// Sampling errors of a --preview run; ranges are [low, high]
+export interface DeputyPreview {
+  sampledTransactions: number;
+  totalSpendingSE: number;
+  totalSpendingCI: [number, number];
+  riskScoreRange?: [number, number];  // Risk rules applied to the bootstrap bounds
+  riskLevelRange?: [RiskLevel, RiskLevel];
+}
+
+// Percentile bootstrap intervals [low, high]
+export interface DeputyConfidence {
+  level: number;  // e.g. 0.95
+  replicates: number;
+  benfordChi2: [number, number];
+  roundValuePct: [number, number];
+  hhi: [number, number];  // Supplier-share HHI computed from the expenses
+  zScoreParty: [number, number];
+  zScoreState: [number, number];
+}
+
+export interface DeputyOutliers {
+  count: number;
+  pct: number;  // Share of the deputy's transactions (0-100)
+  value: number;
+  maxRobustZ: number;
 }
 
 export interface SupplierShare {
@@ -154,6 +201,277 @@ export interface CNPJMismatch {
   uf: string;
 }
 
+// Supplier profiles (suppliers/<prefix>.json)
+export interface SupplierProfile {
+  cnpj: string;
+  name: string;
+  nameVariants: { name: string; transactionCount: number }[];
+  totalValue: number;
+  transactionCount: number;
+  deputyCount: number;
+  deputies: { name: string; value: number; transactionCount: number }[];
+  categories: { category: string; value: number; transactionCount: number }[];
+  firstMonth: string | null;
+  lastMonth: string | null;
+}
+
+export interface SupplierSummary {
+  cnpj: string;
+  name: string;
+  totalValue: number;
+  transactionCount: number;
+  deputyCount: number;
+  shard: string;  // File name under suppliers/ holding the full profile
+}
+
+export interface SupplierIndex {
+  meta: {
+    totalSuppliers: number;
+    shardCount: number;
+    topN: number;
+  };
+  top: SupplierSummary[];
+}
+
+// Search index (search-index.json)
+// Entity tuple: [type, id, label, detail] where type 'd' = deputy (id, "PARTY-UF")
+// and 's' = supplier (CNPJ/CPF, deputy count)
+export type SearchEntity =
+  | ['d', number, string, string]
+  | ['s', string, string, number];
+
+export interface SearchIndex {
+  version: number;
+  meta: {
+    entityCount: number;
+    keyCount: number;
+    minPrefix: number;
+    maxPrefix: number;
+    docPrefixes: number[];
+    stopwords: string[];  // Tokens left out of the index ("da", "ltda", ...)
+  };
+  entities: SearchEntity[];
+  postings: Record<string, number[]>;  // Prefix key -> delta-encoded entity positions
+}
+
+// Run-to-run changes (changes.json)
+export interface DeputyChange {
+  id: number;
+  name: string;
+  party: string;
+  uf: string;
+  status: 'added' | 'removed' | 'changed';
+  spendingDelta: number;
+  riskScoreDelta: number;
+  riskLevelFrom: RiskLevel | null;
+  riskLevelTo: RiskLevel | null;
+  newRedFlags: string[];
+  resolvedRedFlags: string[];
+}
+
+export interface DeputyChanges {
+  meta: {
+    fromRun: string | null;
+    toRun: string | null;
+    generatedAt: string;
+  };
+  summary: {
+    added: number;
+    removed: number;
+    changed: number;
+    riskLevelChanges: number;
+    withNewRedFlags: number;
+  };
+  deputies: DeputyChange[];
+}
+
+// Atypical transactions (outliers.json)
+export interface OutlierTransaction {
+  deputyId: number | null;
+  deputyName: string;
+  date: string | null;
+  month: string;
+  category: string;
+  supplierName: string;
+  cnpj: string;
+  value: number;
+  groupMedian: number;  // Median value of the same category and month
+  robustZ: number;
+}
+
+export interface OutliersData {
+  meta: {
+    method: string;
+    zThreshold: number;
+    minGroupSize: number;
+    scoredTransactions: number;
+    outlierCount: number;
+    outlierValue: number;
+  };
+  byCategory: {
+    category: string;
+    transactionCount: number;
+    outlierCount: number;
+    outlierPct: number;
+    outlierValue: number;
+  }[];
+  deputies: ({ id: number; name: string; party: string; uf: string; transactionCount: number } & DeputyOutliers)[];
+  transactions: OutlierTransaction[];  // Most extreme first
+}
+
+// Precomputed distributions (distributions.json)
+export type DistributionMetric =
+  | 'totalSpending'
+  | 'avgTicket'
+  | 'hhi'
+  | 'benfordChi2'
+  | 'roundValuePct'
+  | 'riskScore';
+
+export interface GroupDistribution {
+  count: number;
+  mean: number;
+  p25: number;
+  median: number;
+  p75: number;
+}
+
+export interface MetricDistribution {
+  count: number;
+  min: number;
+  max: number;
+  mean: number;
+  std: number;  // Population standard deviation
+  p25: number;
+  median: number;
+  p75: number;
+  p90: number;
+  histogram: {
+    edges: number[];  // bins + 1 fixed-width bin edges
+    counts: number[];
+  };
+  byParty: Record<string, GroupDistribution>;
+  byUf: Record<string, GroupDistribution>;
+}
+
+// Log-bucketed quantile sketch; sketches merge by adding bucket counts
+export interface QuantileSketch {
+  relativeAccuracy: number;
+  count: number;
+  zeroCount: number;
+  positive: { offset: number; counts: number[] };
+  negative: { offset: number; counts: number[] };
+}
+
+export interface Distributions {
+  meta: {
+    deputyCount: number;
+    bins: number;
+    metrics: DistributionMetric[];
+    sketchRelativeAccuracy: number;
+  };
+  metrics: Record<DistributionMetric, MetricDistribution>;
+  // Percentile ranks (0-100), column-wise in the order of ids
+  ranks: { ids: number[] } & Record<DistributionMetric, { overall: number[]; party: number[]; uf: number[] }>;
+  transactionValues: {
+    quantiles: Record<'p25' | 'p50' | 'p75' | 'p90' | 'p99', number>;
+    sketches: {
+      overall: QuantileSketch;
+      byYear: Record<string, QuantileSketch>;
+      byCategory: Record<string, QuantileSketch>;
+    };
+  };
+}
+
+// Column profile of the expense data (data-quality.json)
+export interface ColumnProfile {
+  dtype: string;
+  nulls: number;
+  empty: number;
+  filledPct: number;
+  distinct: number;  // Exact for text columns, HyperLogLog estimate for numeric columns
+  min?: number | string | null;  // Numbers, or YYYY-MM-DD for date columns
+  max?: number | string | null;
+  negative?: number;
+  zero?: number;
+  unparseable?: number;
+  minLength?: number | null;
+  maxLength?: number | null;
+}
+
+export interface DocumentValidity {
+  checked: number;
+  cnpj: number;
+  cpf: number;
+  invalidCnpj: number;  // 14 digits, wrong check digits
+  invalidCpf: number;  // 11 digits, wrong check digits
+  invalidLength: number;
+  empty: number;
+  invalidExamples: { value: string; count: number }[];
+}
+
+// Supplier identity resolution: raw CNPJ/CPF forms -> canonical documents -> supplier entities
+export interface SupplierIdentitySummary {
+  rawDocuments: number;
+  documents: number;
+  invalidDocuments: number;  // Canonical documents failing length or check digits
+  entities: number;
+  nameOnlyEntities: number;  // Suppliers never seen with a document
+  multiNameEntities: number;
+  rowsResolvedByName: number;
+  rowsWithoutSupplier: number;
+}
+
+export interface DataQuality {
+  meta: { rows: number; columns: number; distinctPrecision: number };
+  columns: Record<string, ColumnProfile>;
+  documents: { supplier?: DocumentValidity; deputyCpf?: DocumentValidity };
+  duplicates: { exactRows?: number; documentIds?: number; sameDeputySupplierValueDate?: number };
+  checks: { negativeValues?: number; yearRange?: [number, number]; invalidMonths?: number };
+  suppliers?: SupplierIdentitySummary;
+  // filledPct[i][j]: share of filled values of columns[j] in months[i]
+  completeness: { columns: string[]; months: string[]; transactions: number[]; filledPct: number[][] };
+}
+
+// Shared-supplier networks (party-network.json, region-network.json)
+// Two groups are connected when their deputies paid at least meta.minShared of the
+// same supplier entities (CNPJ/CPF, or name when there is no document); sharedValue is
+// what both groups paid those suppliers
+export interface NetworkGroupStats {
+  deputyCount: number;
+  totalSpending: number;
+  avgHHI: number;
+  supplierCount: number;
+}
+
+export interface NetworkMeta {
+  suppliers: number;
+  minShared: number;
+  supplierKey: string;
+}
+
+export interface PartyNetwork {
+  meta: NetworkMeta;
+  parties: (NetworkGroupStats & { party: string })[];
+  connections: { party1: string; party2: string; sharedSuppliers: number; sharedValue: number }[];
+}
+
+export interface RegionNetwork {
+  meta: NetworkMeta & { crossRegionConnections: number };
+  states: (NetworkGroupStats & { uf: string; region: string })[];
+  regions: (NetworkGroupStats & { region: string; states: string[] })[];
+  connections: {
+    state1: string;
+    state2: string;
+    region1: string;
+    region2: string;
+    sharedSuppliers: number;
+    sharedValue: number;
+    crossRegion: boolean;
+  }[];
+  crossRegion: { region1: string; region2: string; sharedSuppliers: number; sharedValue: number }[];
+}
+
 export interface NetworkNode {
   id: string;
   type: 'deputy' | 'supplier';
@@ -224,6 +542,59 @@ export interface CaseStudyComparison {
 // Emendas Parlamentares Types (Spotlight Integration)
 // ============================================
 
+export interface EmendasAmounts {
+  empenhado: number;  // Committed (R$)
+  pago: number;       // Paid (R$)
+  count: number;      // Amendment rows
+}
+
+export interface DeputyEmendasSummary extends EmendasAmounts {
+  municipalityCount: number;
+  combinedTotal: number;       // CEAP total + emendas committed
+  ratioToCeap: number | null;  // Emendas committed per R$ 1 of CEAP
+}
+
+export interface EmendasMunicipality extends EmendasAmounts {
+  code: string | null;  // IBGE code
+  name: string;
+  uf: string;
+}
+
+export interface EmendasDeputy extends EmendasAmounts {
+  id: number;
+  name: string;
+  party: string;
+  uf: string;
+  ceapTotal: number;
+  municipalityCount: number;
+  byYear: (EmendasAmounts & { year: number })[];
+  byType: (EmendasAmounts & { type: string })[];
+  byFunction: (EmendasAmounts & { function: string })[];
+  topMunicipalities: EmendasMunicipality[];
+}
+
+export interface EmendasData {
+  meta: {
+    source: string;
+    rowCount: number;
+    firstYear: number | null;
+    lastYear: number | null;
+    totalEmpenhado: number;
+    totalPago: number;
+    authorCount: number;
+    matchedDeputies: number;
+    unmatchedAuthors: number;
+    unmatchedExamples: string[];
+    municipalityCount: number;
+    joinKey: string;
+  };
+  deputies: EmendasDeputy[];
+  municipalities: (EmendasMunicipality & {
+    authorCount: number;
+    topAuthors: { name: string; deputyId: number | null; empenhado: number }[];
+  })[];
+}
+
 export interface BeneficiaryShare {
   name: string;
   cnpj: string | null;
@@ -332,6 +703,7 @@ export interface DataManifest {
   version: string;
   generated_at: string;
   generator: string;
+  generation?: string | null;  // Writer generation id of the artifact set this manifest was published with
   source_data: {
     file: string;
     sha256: string;
@@ -344,6 +716,14 @@ export interface DataManifest {
     };
     record_count: number;
     total_value_brl: number;
+    partitions?: {
+      file: string;
+      sha256: string;
+      size_bytes: number;
+      last_modified: string;
+      record_count: number;
+      years?: number[];
+    }[];
   };
   output_files: {
     [filename: string]: {
@@ -356,6 +736,7 @@ export interface DataManifest {
       chi2_critical_001: number;
       chi2_critical_005: number;
       degrees_of_freedom: number;
+      min_transactions?: number;
       description: string;
     };
     hhi_thresholds: {
@@ -379,6 +760,12 @@ export interface DataManifest {
         zscore_party_above_2std: number;
         zscore_state_above_2std: number;
       };
+      signals?: {
+        id: string;
+        field: string;
+        above: number;
+        penalty: number;
+      }[];
       max_score: number;
       risk_level_thresholds: {
         critico: number;
@@ -389,4 +776,5 @@ export interface DataManifest {
     };
   };
   reproducibility_notes: string[];
+  artifacts?: string[];  // Every file of this generation, used to prune stale ones
 }
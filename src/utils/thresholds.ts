@@ -1,50 +1,38 @@
 // Risk scoring thresholds and weights
-// These values must match the Python prepare-data.py script
+// Generated by scripts/prepare-data.py from RISK_RULES (src/constants/risk-thresholds.json)
+import riskThresholds from '../constants/risk-thresholds.json';
+
+const { risk_score: riskScore, hhi_thresholds: hhi, benford_threshold: benford } = riskThresholds;
 
 export const RISK_SCORING = {
   // Base score from HHI concentration
-  baseWeights: {
-    hhi_critical: 0.9,  // HHI > 3000
-    hhi_high: 0.7,      // HHI > 2500
-    hhi_moderate: 0.4,  // HHI > 1500
-    hhi_low: 0.2,       // HHI <= 1500
-  },
+  baseWeights: riskScore.base_weights,
 
   // Additive penalties
-  penalties: {
-    benford_significant: 0.15,
-    round_values_above_20pct: 0.10,
-    top_supplier_above_50pct: 0.10,
-    zscore_party_above_2std: 0.08,
-    zscore_state_above_2std: 0.08,
-  },
+  penalties: riskScore.additive_penalties,
 
   // Risk level thresholds
-  levels: {
-    critico: 0.75,
-    alto: 0.55,
-    medio: 0.35,
-    baixo: 0.0,
-  },
+  levels: riskScore.risk_level_thresholds,
 
-  maxScore: 1.0,
-} as const;
+  maxScore: riskScore.max_score,
+};
 
 export const HHI_THRESHOLDS = {
-  low: 1500,
-  moderate: 2500,
-  high: 3000,
-  very_high: 5000,
-} as const;
+  low: hhi.low,
+  moderate: hhi.moderate,
+  high: hhi.high,
+  very_high: hhi.very_high,
+};
 
 export const BENFORD_THRESHOLDS = {
-  chi2_critical_001: 20.09,
-  chi2_critical_005: 15.51,
-  degrees_of_freedom: 8,
-} as const;
-
-// Z-score threshold for outlier detection
-export const ZSCORE_THRESHOLD = 2.0;
+  chi2_critical_001: benford.chi2_critical_001,
+  chi2_critical_005: benford.chi2_critical_005,
+  degrees_of_freedom: benford.degrees_of_freedom,
+};
+
+// Z-score threshold for outlier detection (the party z-score risk signal)
+export const ZSCORE_THRESHOLD =
+  riskScore.signals.find((signal) => signal.id === 'zscore_party_above_2std')?.above ?? 2.0;
 
 // Get risk level label from score
 export function getRiskLevelFromScore(score: number): 'CRITICO' | 'ALTO' | 'MEDIO' | 'BAIXO' {
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Build the fixed pipeline fixture in tests/pipeline/fixtures/processed/.
+
+The CSVs are committed; this script only documents (and can rebuild) how they were
+made. Rebuilding changes the inputs, so regenerate the golden outputs afterwards:
+
+    python tests/pipeline/make_fixture.py
+    PIPELINE_UPDATE_GOLDEN=1 python -m pytest tests/pipeline
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "processed"
+
+CATEGORIES = [
+    "COMBUSTÍVEIS E LUBRIFICANTES.",
+    "TELEFONIA",
+    "DIVULGAÇÃO DA ATIVIDADE PARLAMENTAR.",
+    "PASSAGEM AÉREA - SIGEPA",
+    "LOCAÇÃO OU FRETAMENTO DE VEÍCULOS AUTOMOTORES",
+    "FORNECIMENTO DE ALIMENTAÇÃO DO PARLAMENTAR",
+]
+CNAES = ["4731800", "6110801", "7311400", "5111100", "7711000", "5611201", "8630501"]
+
+
+def check_digit(digits, weights):
+    remainder = sum(int(d) * w for d, w in zip(digits, weights)) % 11
+    return "0" if remainder < 2 else str(11 - remainder)
+
+
+def make_cnpj(i):
+    base = f"{20000000 + i * 13:08d}0001"
+    d1 = check_digit(base, [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+    d2 = check_digit(base + d1, [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+    return base + d1 + d2
+
+
+def make_cpf(i):
+    base = f"{300000000 + i * 7:09d}"
+    d1 = check_digit(base, range(10, 1, -1))
+    d2 = check_digit(base + d1, range(11, 1, -1))
+    return base + d1 + d2
+
+
+EMENDA_TYPES = [
+    "Emenda Individual - Transferências com Finalidade Definida",
+    "Emenda Individual - Transferências Especiais",
+    "Emenda de Bancada",
+]
+FUNCTIONS = ["Saúde", "Educação", "Urbanismo", "Agricultura", "Assistência social"]
+
+
+def brl(value):
+    """1234.5 -> '1.234,50', as the Portal da Transparência exports values."""
+    return f"{value:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def make_emendas(names):
+    """Emendas dump in the portal's own format (';', Latin-1, Brazilian decimals)."""
+    rng = np.random.default_rng(2014)
+    n_rows = 3000
+    # Deputies 0-19 author amendments (name case varies), plus a bench and a senator
+    authors = [n.title() if i % 2 else n for i, n in enumerate(names[:20])] + ["BANCADA DA BAHIA", "SENADOR TESTE"]
+    municipalities = [(f"{2900000 + i * 17}", f"MUNICÍPIO {i:02d}", "BA" if i % 2 else "SP") for i in range(40)]
+
+    author = rng.choice(len(authors), n_rows)
+    place = np.minimum(rng.zipf(1.6, n_rows) - 1, len(municipalities) - 1)
+    state_level = rng.random(n_rows) < 0.05
+    committed = np.round(rng.lognormal(12.5, 1.2, n_rows), 2)
+    paid = np.round(committed * rng.uniform(0, 1, n_rows), 2)
+    rows = []
+    for i in range(n_rows):
+        code, municipality, uf = ("", "", "BA") if state_level[i] else municipalities[place[i]]
+        rows.append({
+            "Código da Emenda": f"{202400000000 + i}",
+            "Ano da Emenda": int(rng.integers(2014, 2026)),
+            "Tipo de Emenda": EMENDA_TYPES[2] if authors[author[i]].startswith("BANCADA") else rng.choice(EMENDA_TYPES[:2]),
+            "Nome do Autor da Emenda": authors[author[i]],
+            "Código Município IBGE": code,
+            "Município": municipality,
+            "UF": uf,
+            "Nome Função": rng.choice(FUNCTIONS),
+            "Valor Empenhado": brl(committed[i]),
+            "Valor Liquidado": brl(paid[i]),
+            "Valor Pago": brl(paid[i]),
+        })
+    emendas = pd.DataFrame(rows)
+    emendas.to_csv(FIXTURE_DIR / "emendas_parlamentares.csv", index=False, sep=";", encoding="latin-1")
+    return len(emendas)
+
+
+def main():
+    rng = np.random.default_rng(2024)
+    n_rows = 2400
+    n_deputies = 24
+
+    names = [f"DEPUTADO TESTE {i:02d}" for i in range(n_deputies)]
+    parties = np.array(["PT", "PL", "UNIÃO"])[np.arange(n_deputies) % 3]
+    ufs = np.array(["SP", "BA", "RJ", "MG"])[np.arange(n_deputies) % 4]
+    suppliers = [f"FORNECEDOR {i:02d} LTDA" for i in range(50)] + [f"PESSOA FISICA {i}" for i in range(10)]
+    documents = [make_cnpj(i) for i in range(50)] + [make_cpf(i) for i in range(10)]
+
+    # Deputy 23 spends little and is dropped by the activity filter
+    weights = np.ones(n_deputies)
+    weights[23] = 0.05
+    deputy = rng.choice(n_deputies, n_rows, p=weights / weights.sum())
+    supplier = np.minimum(rng.zipf(1.5, n_rows) - 1, len(suppliers) - 1)
+    values = np.round(rng.lognormal(6.6, 1.0, n_rows), 2)
+    values[rng.random(n_rows) < 0.08] = 1000.0                      # round values
+    values[rng.random(n_rows) < 0.01] *= 40                         # extreme transactions
+    values[rng.random(n_rows) < 0.01] = -np.round(rng.uniform(10, 200), 2)  # refunds
+
+    year = rng.choice([2023, 2024, 2025], n_rows)
+    month = rng.integers(1, 13, n_rows)
+    day = rng.integers(1, 29, n_rows)
+    issued = [f"{y}-{m:02d}-{d:02d}T00:00:00" for y, m, d in zip(year, month, day)]
+
+    document = np.array(documents, dtype=object)[supplier]
+    punctuated = rng.random(n_rows) < 0.15
+    document = np.array([
+        f"{c[:2]}.{c[2:5]}.{c[5:8]}/{c[8:12]}-{c[12:]}" if p and len(c) == 14 else c
+        for c, p in zip(document, punctuated)
+    ], dtype=object)
+    document[rng.random(n_rows) < 0.02] = ""
+
+    expenses = pd.DataFrame({
+        "txNomeParlamentar": np.array(names)[deputy],
+        "cpf": [f"{10000000000 + d}" for d in deputy],
+        "nuDeputadoId": 2000 + deputy,
+        "sgUF": ufs[deputy],
+        "sgPartido": parties[deputy],
+        "txtDescricao": rng.choice(CATEGORIES, n_rows),
+        "txtFornecedor": np.array(suppliers)[supplier],
+        "txtCNPJCPF": document,
+        "datEmissao": issued,
+        "vlrDocumento": values,
+        "vlrLiquido": values,
+        "numMes": month,
+        "numAno": year,
+        "ideDocumento": np.arange(n_rows) + 7000000,
+    })
+    expenses.loc[rng.random(n_rows) < 0.02, "datEmissao"] = ""
+    expenses.loc[rng.random(n_rows) < 0.01, "cpf"] = ""  # party leadership rows
+
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    expenses.to_csv(FIXTURE_DIR / "despesas_combined_2023_2025.csv", index=False)
+
+    reference = pd.DataFrame({
+        "cnpj": documents[:50],
+        "razao_social": [f"{name} (RAZAO)" for name in suppliers[:50]],
+        "cnae_principal": rng.choice(CNAES, 50),
+        "cnae_descricao": "Atividade de teste",
+        "uf": rng.choice(["SP", "DF"], 50),
+    })
+    reference.to_csv(FIXTURE_DIR / "cnae_reference.csv", index=False)
+    n_emendas = make_emendas(names)
+    print(f"Wrote {len(expenses):,} expense rows, {len(reference)} CNAE records and {n_emendas:,} emendas to {FIXTURE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Golden-output equivalence and performance budgets for scripts/prepare-data.py.
+
+The pipeline runs on the fixed inputs in fixtures/ (expenses, CNAE reference, spotlight
+spec) and every artifact is compared with golden/ (floats within tolerance, volatile
+timestamps ignored, unordered lists sorted). Per-stage wall time and traced peak memory (timed_stage records) must
+stay within budgets.json. A --preview run is checked against the full run (exact counts, totals inside their intervals).
+
+    python -m pytest tests/pipeline
+    PIPELINE_UPDATE_GOLDEN=1 python -m pytest tests/pipeline   # accept new outputs
+    PIPELINE_BUDGET_SCALE=3 python -m pytest tests/pipeline    # slower machines
+"""
+
+import importlib.util
+import json
+import math
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+HERE = Path(__file__).parent
+SCRIPT = HERE.parent.parent / "scripts" / "prepare-data.py"
+FIXTURE_DIR = HERE / "fixtures" / "processed"
+SPOTLIGHT_DIR = HERE / "fixtures" / "spotlights"
+GOLDEN_DIR = HERE / "golden"
+BUDGETS = json.loads((HERE / "budgets.json").read_text(encoding="utf-8"))
+
+REL_TOL = 1e-9
+ABS_TOL = 1e-6
+
+# Values that change on every run
+VOLATILE_KEYS = {"lastUpdated", "generated", "generated_at", "generation", "last_modified", "generatedAt"}
+# Lists whose order depends on row order rather than on the data
+UNORDERED_KEYS = {"supplierCnpjs"}
+
+UPDATE_GOLDEN = os.environ.get("PIPELINE_UPDATE_GOLDEN") == "1"
+BUDGET_SCALE = float(os.environ.get("PIPELINE_BUDGET_SCALE", "1"))
+
+
+def load_pipeline():
+    spec = importlib.util.spec_from_file_location("prepare_data_under_test", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_pipeline(output_dir, work_dir, *flags):
+    """Run prepare-data.py main() against the fixture; returns its stage metrics."""
+    pipeline = load_pipeline()
+    pipeline.DATA_DIR = FIXTURE_DIR
+    pipeline.OUTPUT_DIR = output_dir
+    pipeline.SNAPSHOT_DIR = work_dir / "snapshots"
+    pipeline.SPOTLIGHT_SPEC_DIR = SPOTLIGHT_DIR
+    pipeline.FRONTEND_THRESHOLDS_PATH = work_dir / "risk-thresholds.json"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    argv = sys.argv
+    sys.argv = ["prepare-data.py", "--no-snapshot", *flags]
+    try:
+        pipeline.main()
+    finally:
+        sys.argv = argv
+    return {record["stage"]: record for record in pipeline.STAGE_METRICS}
+
+
+def artifact_names(directory):
+    return sorted(str(path.relative_to(directory)) for path in directory.rglob("*.json"))
+
+
+def normalize(value, key=None):
+    """Drop volatile fields and sort unordered lists so outputs compare structurally."""
+    if isinstance(value, dict):
+        return {k: normalize(v, k) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        items = [normalize(v) for v in value]
+        if key in UNORDERED_KEYS:
+            items = sorted(items, key=lambda v: json.dumps(v, sort_keys=True))
+        return items
+    return value
+
+
+def differences(expected, actual, path="$", found=None, limit=20):
+    """Paths where actual differs from expected (floats compared with tolerance)."""
+    found = [] if found is None else found
+    if len(found) >= limit:
+        return found
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual)):
+            if key not in actual:
+                found.append(f"{path}.{key}: missing")
+            elif key not in expected:
+                found.append(f"{path}.{key}: unexpected")
+            else:
+                differences(expected[key], actual[key], f"{path}.{key}", found, limit)
+    elif isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            found.append(f"{path}: length {len(expected)} != {len(actual)}")
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            differences(e, a, f"{path}[{i}]", found, limit)
+    elif isinstance(expected, (int, float)) and isinstance(actual, (int, float)) \
+            and not isinstance(expected, bool) and not isinstance(actual, bool):
+        if not math.isclose(expected, actual, rel_tol=REL_TOL, abs_tol=ABS_TOL):
+            found.append(f"{path}: {expected!r} != {actual!r}")
+    elif expected != actual:
+        found.append(f"{path}: {expected!r} != {actual!r}")
+    return found
+
+
+@pytest.fixture(scope="module")
+def runs(tmp_path_factory):
+    """Two runs: a plain one (outputs, wall time) and a --profile one (peak memory)."""
+    work_dir = tmp_path_factory.mktemp("pipeline")
+    plain_dir = work_dir / "out"
+    plain = run_pipeline(plain_dir, work_dir)
+    profiled = run_pipeline(work_dir / "out-profiled", work_dir, "--profile")
+
+    if UPDATE_GOLDEN:
+        shutil.rmtree(GOLDEN_DIR, ignore_errors=True)
+        shutil.copytree(plain_dir, GOLDEN_DIR)
+    return {"dir": plain_dir, "profiled_dir": work_dir / "out-profiled", "wall": plain, "memory": profiled}
+
+
+def test_artifact_set_matches_golden(runs):
+    assert artifact_names(runs["dir"]) == artifact_names(GOLDEN_DIR)
+
+
+@pytest.mark.parametrize("name", artifact_names(GOLDEN_DIR) if GOLDEN_DIR.exists() else [])
+def test_artifact_matches_golden(runs, name):
+    expected = normalize(json.loads((GOLDEN_DIR / name).read_text(encoding="utf-8")))
+    actual = normalize(json.loads((runs["dir"] / name).read_text(encoding="utf-8")))
+    diff = differences(expected, actual)
+    assert not diff, f"{name} differs from golden:\n  " + "\n  ".join(diff)
+
+
+def test_runs_are_deterministic(runs):
+    for name in artifact_names(runs["dir"]):
+        first = normalize(json.loads((runs["dir"] / name).read_text(encoding="utf-8")))
+        second = normalize(json.loads((runs["profiled_dir"] / name).read_text(encoding="utf-8")))
+        assert not differences(first, second), f"{name} differs between two runs"
+
+
+def test_preview_estimates_full_run(runs, tmp_path):
+    """--preview writes next to the output dir; its counts are exact and its totals estimated."""
+    run_pipeline(tmp_path / "out", tmp_path, "--preview")
+    preview_dir = tmp_path / "out-preview"
+    full = json.loads((runs["dir"] / "aggregations.json").read_text(encoding="utf-8"))
+    preview = json.loads((preview_dir / "aggregations.json").read_text(encoding="utf-8"))
+    assert not any((tmp_path / "out").iterdir())  # the regular output dir is left alone
+    assert preview["meta"]["totalTransactions"] == full["meta"]["totalTransactions"]
+    assert preview["meta"]["preview"]["sampledTransactions"] < full["meta"]["totalTransactions"]
+    assert [m["transactionCount"] for m in preview["byMonth"]] == [m["transactionCount"] for m in full["byMonth"]]
+
+    full_deputies = {d["name"]: d for d in json.loads((runs["dir"] / "deputies.json").read_text(encoding="utf-8"))}
+    for d in json.loads((preview_dir / "deputies.json").read_text(encoding="utf-8")):
+        if d["name"] in full_deputies:
+            assert d["transactionCount"] == full_deputies[d["name"]]["transactionCount"]
+        low, high = d["preview"]["totalSpendingCI"]
+        assert low <= d["totalSpending"] <= high
+        low, high = d["preview"]["riskScoreRange"]
+        assert low <= d["riskScore"] <= high
+
+
+@pytest.mark.parametrize("stage", sorted(BUDGETS["wallMs"]))
+def test_stage_wall_time_budget(runs, stage):
+    assert stage in runs["wall"], f"stage {stage!r} was not recorded"
+    budget = BUDGETS["wallMs"][stage] * BUDGET_SCALE
+    assert runs["wall"][stage]["wallMs"] <= budget, \
+        f"{stage}: {runs['wall'][stage]['wallMs']:.0f} ms > budget {budget:.0f} ms"
+
+
+@pytest.mark.parametrize("stage", sorted(BUDGETS["peakMB"]))
+def test_stage_peak_memory_budget(runs, stage):
+    assert stage in runs["memory"], f"stage {stage!r} was not recorded"
+    budget = BUDGETS["peakMB"][stage] * BUDGET_SCALE
+    assert runs["memory"][stage]["peakMB"] <= budget, \
+        f"{stage}: {runs['memory'][stage]['peakMB']:.1f} MB > budget {budget:.1f} MB"
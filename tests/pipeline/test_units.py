@@ -0,0 +1,374 @@
+"""
+Focused checks of individual prepare-data.py building blocks, next to the golden harness.
+
+    python -m pytest tests/pipeline/test_units.py
+"""
+
+import gzip
+import json
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import test_golden
+from test_golden import load_pipeline, run_pipeline
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return load_pipeline()
+
+
+def test_rescore_refreshes_every_score_copy(pipeline, tmp_path):
+    """--rescore with new level cut-offs keeps fraud flags, ranks, manifest and preview ranges in step."""
+    output_dir = tmp_path / "out"
+    run_pipeline(output_dir, tmp_path)
+    run_pipeline(output_dir, tmp_path, "--preview")
+    levels = {"critico": 0.5, "alto": 0.3, "medio": 0.2, "baixo": 0.0}
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(json.dumps({"risk_level_thresholds": levels}), encoding="utf-8")
+    before = json.loads((output_dir / "deputies.json").read_text(encoding="utf-8"))
+
+    run_pipeline(output_dir, tmp_path, "--rescore", "--rules", str(rules_path))
+    run_pipeline(output_dir, tmp_path, "--rescore", "--preview", "--rules", str(rules_path))
+
+    def load(directory, name):
+        return json.loads((directory / name).read_text(encoding="utf-8"))
+
+    preview_dir = tmp_path / "out-preview"
+    for directory in (output_dir, preview_dir):
+        deputies = load(directory, "deputies.json")
+        for d in deputies:
+            expected = next(level for level in ("critico", "alto", "medio", "baixo") if d["riskScore"] >= levels[level])
+            assert d["riskLevel"] == expected.upper()
+
+        by_id = {d["id"]: d for d in deputies}
+        for flag in load(directory, "fraud-flags.json"):
+            deputy = by_id[flag["deputyId"]]
+            assert (flag["riskScore"], flag["riskLevel"]) == (deputy["riskScore"], deputy["riskLevel"])
+
+        distributions = load(directory, "distributions.json")
+        _, ranks = pipeline.deputy_metric_distributions(deputies, distributions["meta"]["bins"])
+        assert distributions["ranks"]["riskScore"] == ranks["riskScore"]
+
+        manifest = load(directory, "manifest.json")
+        assert manifest["methodology"]["risk_score"]["risk_level_thresholds"] == levels
+
+    for d in load(preview_dir, "deputies.json"):
+        low, high = d["preview"]["riskScoreRange"]
+        assert low <= d["riskScore"] <= high
+
+    # The lowered cut-offs must actually move someone, and only the full output feeds the frontend
+    after = load(output_dir, "deputies.json")
+    assert [d["riskLevel"] for d in after] != [d["riskLevel"] for d in before]
+    thresholds = json.loads((tmp_path / "risk-thresholds.json").read_text(encoding="utf-8"))
+    assert thresholds["risk_score"]["risk_level_thresholds"] == levels
+
+
+def test_rescore_matches_a_full_run_with_the_same_rules(pipeline, tmp_path):
+    """Benford significance, HHI bands and fraud flags follow --rules on both paths."""
+    rules = {
+        "benford_threshold": {
+            **pipeline.RISK_RULES["benford_threshold"], "chi2_critical_005": 4.0, "chi2_critical_001": 8.0,
+        },
+        "hhi_thresholds": {"low": 500, "moderate": 1000, "high": 1500, "very_high": 2000},
+    }
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(json.dumps(rules), encoding="utf-8")
+    full_dir, rescored_dir = tmp_path / "full", tmp_path / "rescored"
+    run_pipeline(full_dir, tmp_path, "--rules", str(rules_path))
+    run_pipeline(rescored_dir, tmp_path)
+    default = json.loads((rescored_dir / "deputies.json").read_text(encoding="utf-8"))
+    run_pipeline(rescored_dir, tmp_path, "--rescore", "--rules", str(rules_path))
+
+    def load(directory, name):
+        return json.loads((directory / name).read_text(encoding="utf-8"))
+
+    def results(deputies):
+        return [(d["id"], d["benford"]["pValue"], d["benford"]["significant"], d["hhi"]["level"], d["riskScore"])
+                for d in deputies]
+
+    full = load(full_dir, "deputies.json")
+    for d in full:
+        assert d["benford"]["significant"] == (d["benford"]["chi2"] > 4.0)
+        assert d["hhi"]["level"] == pipeline.hhi_level(d["hhi"]["value"], {"hhi_thresholds": rules["hhi_thresholds"]})
+    assert results(load(rescored_dir, "deputies.json")) == results(full)
+    assert results(full) != results(default)
+
+    def flags(directory):
+        return [(f["deputyId"], f["flags"], f["details"], f["riskLevel"]) for f in load(directory, "fraud-flags.json")]
+
+    assert flags(rescored_dir) == flags(full_dir)
+
+
+def test_partial_rule_overrides_keep_sibling_keys(pipeline, tmp_path):
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(json.dumps({"hhi_thresholds": {"moderate": 2000}}), encoding="utf-8")
+    rules = pipeline.load_risk_rules(rules_path)
+    assert rules["hhi_thresholds"] == {**pipeline.RISK_RULES["hhi_thresholds"], "moderate": 2000}
+    assert rules["signals"] == pipeline.RISK_RULES["signals"]
+
+    # The concentration red flag follows the moderate band instead of a copy of its value
+    signals = {s["id"]: s for s in pipeline.risk_methodology(rules)["risk_score"]["signals"]}
+    assert signals["hhi_above_moderate"]["above"] == 2000
+    frame = pd.DataFrame({s["field"]: [0.0] for s in rules["signals"]}).assign(hhi=[2200.0])
+    _, _, triggered = pipeline.apply_risk_rules(frame, rules)
+    assert triggered["hhi_above_moderate"].tolist() == [True]
+
+    rules_path.write_text(json.dumps({"hhi_thresholds": [], "signals": [{"id": "x", "above": "nope.key"}]}),
+                          encoding="utf-8")
+    with pytest.raises(ValueError, match=r"hhi_thresholds \(not an object\).*signals\[0\]\.field"):
+        pipeline.load_risk_rules(rules_path)
+
+
+def test_one_hhi_source_for_value_level_and_flags(pipeline, tmp_path, monkeypatch):
+    """An hhi_analysis.csv that disagrees with the data is only cross-checked, never published."""
+    fixture_dir = tmp_path / "processed"
+    shutil.copytree(test_golden.FIXTURE_DIR, fixture_dir)
+    names = pd.read_csv(fixture_dir / "despesas_combined_2023_2025.csv")["txNomeParlamentar"].dropna().unique()
+    pd.DataFrame({"Deputado": names, "HHI": 9999.0, "Nivel_Concentracao": "critico"}).to_csv(
+        fixture_dir / "hhi_analysis.csv", index=False
+    )
+    monkeypatch.setattr(test_golden, "FIXTURE_DIR", fixture_dir)
+    output_dir = tmp_path / "out"
+    run_pipeline(output_dir, tmp_path)
+
+    deputies = json.loads((output_dir / "deputies.json").read_text(encoding="utf-8"))
+    flags = {f["deputyId"]: f for f in json.loads((output_dir / "fraud-flags.json").read_text(encoding="utf-8"))}
+    for d in deputies:
+        hhi = d["hhi"]["value"]
+        assert hhi != 9999.0
+        assert d["hhi"]["level"] == pipeline.hhi_level(hhi)
+        assert flags[d["id"]]["details"]["hhiValue"] == pytest.approx(hhi, abs=0.01)
+
+
+def test_spotlight_without_a_window_covers_every_month(tmp_path, monkeypatch):
+    spec_dir = tmp_path / "spotlights"
+    shutil.copytree(test_golden.SPOTLIGHT_DIR, spec_dir)
+    spec_path = next(spec_dir.glob("*.json"))
+    spec = json.loads(spec_path.read_text(encoding="utf-8"))
+    spec_path.write_text(json.dumps({**spec, "window": None}), encoding="utf-8")
+    monkeypatch.setattr(test_golden, "SPOTLIGHT_DIR", spec_dir)
+    output_dir = tmp_path / "out"
+    run_pipeline(output_dir, tmp_path)
+
+    spotlight = json.loads((output_dir / "spotlights" / spec_path.name).read_text(encoding="utf-8"))
+    assert spotlight["window"] == {"from": None, "to": None}
+
+
+def test_quantile_sketch_error_within_relative_accuracy(pipeline):
+    rng = np.random.default_rng(7)
+    values = np.concatenate([rng.lognormal(5, 1.5, 20_000), -rng.lognormal(2, 1, 500), np.zeros(300)])
+    sketch = pipeline.quantile_sketch(values)
+    accuracy = sketch["relativeAccuracy"]
+    ordered = np.sort(values)
+    for q in (0.0, 0.01, 0.03, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0):
+        exact = ordered[int(np.floor(q * (len(values) - 1)))]
+        assert abs(pipeline.sketch_quantile(sketch, q) - exact) <= accuracy * abs(exact) + 1e-12, q
+
+
+def test_merged_sketches_equal_the_sketch_of_the_union(pipeline):
+    rng = np.random.default_rng(11)
+    parts = [rng.lognormal(4, 1, 3_000), rng.lognormal(7, 0.5, 1_000), np.array([0.0, -12.5, -0.3]), np.array([])]
+    merged = pipeline.merge_sketches(pipeline.quantile_sketch(part) for part in parts)
+    assert merged == pipeline.quantile_sketch(np.concatenate(parts))
+
+
+def test_robust_z_falls_back_when_mad_is_zero(pipeline):
+    """Mostly identical values (MAD = 0) use the mean absolute deviation; constant groups score 0."""
+    skewed = [100.0] * 9 + [120.0, 150.0, 5000.0]
+    constant = [80.0] * 12
+    spread = [float(v) for v in range(10, 130, 10)]
+    small = [1.0, 2.0, 900.0]
+    frames = [
+        pd.DataFrame({"txtDescricao": category, "numAno": 2024, "numMes": 1, "vlrLiquido": values})
+        for category, values in (("A", skewed), ("B", constant), ("C", spread), ("D", small))
+    ]
+    expenses = pd.concat(frames, ignore_index=True)
+    scores = pipeline.score_transaction_outliers(expenses)
+    category = expenses["txtDescricao"]
+
+    a = scores[category == "A"]
+    mean_ad = np.mean(np.abs(np.array(skewed) - 100.0))
+    assert a["robustZ"].to_numpy() == pytest.approx((np.array(skewed) - 100.0) / (1.253314 * mean_ad))
+    assert a["isOutlier"].tolist() == [False] * 11 + [True]
+
+    b = scores[category == "B"]
+    assert (b["robustZ"] == 0).all() and not b["isOutlier"].any()
+
+    c = scores[category == "C"]
+    median = np.median(spread)
+    mad = np.median(np.abs(np.array(spread) - median))
+    assert c["robustZ"].to_numpy() == pytest.approx(0.6745 * (np.array(spread) - median) / mad)
+
+    d = scores[category == "D"]
+    assert d["robustZ"].isna().all() and not d["isOutlier"].any()
+
+
+def test_missing_year_or_month_rows_are_left_out_of_month_ranges(pipeline):
+    expenses = pd.DataFrame({
+        "txNomeParlamentar": ["A", "A", "B", "B"],
+        "txtFornecedor": ["X", "X", "Y", "Y"],
+        "txtCNPJCPF": ["11222333000181", "11222333000181", "52998224725", "52998224725"],
+        "vlrLiquido": [10.0, 20.0, 30.0, 40.0],
+        "numAno": [2024, 2024, np.nan, 2024],
+        "numMes": [1, np.nan, 3, 2],
+    })
+    profile = pipeline.profile_expenses(expenses)
+    assert profile["checks"]["invalidMonths"] == 1
+    assert profile["completeness"]["months"] == ["2024-01", "2024-02"]
+    assert profile["completeness"]["transactions"] == [1, 1]
+
+    tagged, entities, _ = pipeline.resolve_suppliers(expenses)
+    profiles = pipeline.build_supplier_index(tagged, entities)["profiles"]
+    assert sorted(zip(profiles["firstMonth"], profiles["lastMonth"])) == [(202401, 202401), (202402, 202402)]
+
+
+def test_rows_without_category_or_month_are_not_pooled(pipeline):
+    """NaN keys must not form one shared group across categories and months."""
+    dated = pd.DataFrame({
+        "txtDescricao": "A", "numAno": 2024, "numMes": 1.0, "vlrLiquido": [100.0 + i for i in range(10)],
+    })
+    undated = pd.DataFrame({
+        "txtDescricao": ["C"] * 10 + [None] * 2,
+        "numAno": 2024,
+        "numMes": [np.nan] * 10 + [2.0, 3.0],
+        "vlrLiquido": [10.0, 12.0, 11.0, 9.0, 10.0, 11.0, 10.0, 12.0, 9.0, 10.0, 900.0, 950.0],
+    })
+    expenses = pd.concat([dated, undated], ignore_index=True)
+    scores = pipeline.score_transaction_outliers(expenses)
+
+    keyed = expenses["txtDescricao"].notna() & expenses["numMes"].notna()
+    assert scores.loc[keyed, "robustZ"].notna().all()
+    assert scores.loc[~keyed, ["groupMedian", "robustZ"]].isna().all().all()
+    assert not scores.loc[~keyed, "isOutlier"].any()
+
+
+def test_document_validity_checks_digits_and_lengths(pipeline):
+    documents = pd.Series([
+        "11222333000181",   # valid CNPJ
+        "11222333000182",   # wrong second check digit
+        "52998224725",      # valid CPF
+        "52998224735",      # wrong first check digit
+        "11111111111",      # repeated digits pass the arithmetic but are never issued
+        "00000000000000",
+        "1122233300018",    # 13 digits
+        "123",
+        "",
+        None,
+    ])
+    assert pipeline.document_validity(documents).tolist() == [
+        "cnpj", "invalidCnpj", "cpf", "invalidCpf", "invalidCpf", "invalidCnpj",
+        "invalidLength", "invalidLength", "empty", "empty",
+    ]
+
+
+def test_canonical_documents_strip_punctuation_and_restore_leading_zeros(pipeline):
+    raw = pd.Series([
+        "11.222.333/0001-81",
+        " 529.982.247-25 ",
+        "4252011000110",        # CNPJ 04.252.011/0001-10 that lost its leading zero
+        4252011000110.0,        # the same, read back from a float column
+        "11222333000181.0",
+        "1234567890123",        # 13 digits, but zero-padding does not give a valid CNPJ
+        "123",
+        "",
+        None,
+    ], dtype=object)
+    assert pipeline.canonical_documents(raw).tolist() == [
+        "11222333000181", "52998224725", "04252011000110", "04252011000110", "11222333000181",
+        "1234567890123", "123", "", "",
+    ]
+
+
+JSON_SAMPLE = {
+    "meta": {"name": "Câmara", "count": 3, "ratio": 0.1, "empty": {}, "none": None, "flag": True},
+    "rows": [{"id": i, "value": i * 1.5, "tags": ["a", "ç"] if i else []} for i in range(3)],
+    "byYear": {2023: [1, 2], "2024": []},
+    "text": "quote \" and \\ and\nnewline",
+}
+
+
+def _with_streams(sample):
+    """The sample with its lists (one level down) turned into generators."""
+    return {key: (item for item in value) if isinstance(value, list) else value for key, value in sample.items()}
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("streamed", [False, True])
+def test_iter_json_matches_json_dumps(pipeline, compact, streamed):
+    data = _with_streams(JSON_SAMPLE) if streamed else JSON_SAMPLE
+    expected = (
+        json.dumps(JSON_SAMPLE, ensure_ascii=False, separators=(",", ":")) if compact
+        else json.dumps(JSON_SAMPLE, ensure_ascii=False, indent=2)
+    )
+    assert "".join(pipeline.iter_json(data, compact)) == expected
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_iter_json_streams_top_level_and_empty_generators(pipeline, compact):
+    records = [{"id": i, "name": f"fornecedor {i}"} for i in range(5)]
+    dumps = (lambda d: json.dumps(d, ensure_ascii=False, separators=(",", ":"))) if compact \
+        else (lambda d: json.dumps(d, ensure_ascii=False, indent=2))
+    assert "".join(pipeline.iter_json((r for r in records), compact)) == dumps(records)
+    assert "".join(pipeline.iter_json(iter([]), compact)) == dumps([])
+    assert "".join(pipeline.iter_json({"rows": iter([])}, compact)) == dumps({"rows": []})
+
+
+@pytest.mark.parametrize("gzip_copy", [False, True])
+def test_artifact_writer_output_matches_json_dumps(pipeline, tmp_path, monkeypatch, gzip_copy):
+    """Small chunks force several flushes; the file and its .gz copy hold the json.dumps bytes."""
+    monkeypatch.setattr(pipeline, "STREAM_CHUNK_CHARS", 64)
+    records = [{"cnpj": f"{i:014d}", "name": f"Fornecedor {i} Ltda", "value": i / 7} for i in range(200)]
+    writer = pipeline.ArtifactWriter(tmp_path, gzip=gzip_copy)
+    writer.submit((r for r in records), "suppliers/streamed.json")
+    writer.submit(JSON_SAMPLE, "sample.json", compact=True)
+    writer.commit()
+
+    expected = {
+        "suppliers/streamed.json": json.dumps(records, ensure_ascii=False, indent=2).encode("utf-8"),
+        "sample.json": json.dumps(JSON_SAMPLE, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+    }
+    for name, content in expected.items():
+        assert (tmp_path / name).read_bytes() == content
+        gz_path = tmp_path / (name + ".gz")
+        if gzip_copy:
+            assert gzip.decompress(gz_path.read_bytes()) == content
+        else:
+            assert not gz_path.exists()
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_commit_removes_artifacts_the_new_manifest_no_longer_lists(pipeline, tmp_path):
+    def publish(artifacts, manifest=True):
+        writer = pipeline.ArtifactWriter(tmp_path, gzip=True)
+        for name in artifacts:
+            writer.submit({"name": name}, name)
+        if manifest:
+            writer.submit({"artifacts": sorted([*artifacts, "manifest.json"])}, "manifest.json")
+        writer.commit()
+
+    (tmp_path / "unlisted.json").write_text("{}", encoding="utf-8")
+    publish(["deputies.json", "suppliers/10.json", "suppliers/20.json"])
+    publish(["deputies.json", "suppliers/20.json"])
+    assert not (tmp_path / "suppliers" / "10.json").exists()
+    assert not (tmp_path / "suppliers" / "10.json.gz").exists()
+
+    # A partial generation without a manifest (as --rescore writes) removes nothing
+    publish(["deputies.json"], manifest=False)
+    for name in ("deputies.json", "suppliers/20.json", "suppliers/20.json.gz", "unlisted.json"):
+        assert (tmp_path / name).exists(), name
+
+
+def test_rescore_keeps_gzip_copies_in_step(tmp_path):
+    output_dir = tmp_path / "out"
+    run_pipeline(output_dir, tmp_path, "--gzip")
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(json.dumps({"risk_level_thresholds": {"alto": 0.3, "medio": 0.2}}), encoding="utf-8")
+    run_pipeline(output_dir, tmp_path, "--rescore", "--rules", str(rules_path))
+
+    for name in ("deputies.json", "fraud-flags.json", "distributions.json", "manifest.json"):
+        path = output_dir / name
+        assert gzip.decompress(path.with_name(name + ".gz").read_bytes()) == path.read_bytes(), name